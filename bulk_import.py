@@ -0,0 +1,254 @@
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, Optional
+
+from bson import json_util
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from query_executor import QueryCancelled
+
+
+DUPLICATE_KEY = 11000
+# Larger than any valid document (16MB of BSON), so a runaway buffer means a syntax error
+MAX_DOCUMENT_CHARS = 64 * 1024 * 1024
+
+
+def open_text(path: str):
+    """(text stream, raw binary file) for path; .gz files are decompressed on the fly"""
+    raw = open(path, 'rb')
+    stream = gzip.GzipFile(fileobj=raw) if path.endswith('.gz') else raw
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''), raw
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'csv' if name.lower().endswith('.csv') else 'json'
+
+
+def iter_json_documents(text, chunk_size: int = 1024 * 1024) -> Iterator[Dict]:
+    """Yield the documents of a JSON array, NDJSON or concatenated JSON stream.
+
+    Values are decoded one at a time from a sliding buffer, so memory is
+    bounded by the largest document rather than the file. Extended JSON
+    ($oid, $date, ...) is converted to BSON types.
+    """
+    decoder = json.JSONDecoder(object_hook=json_util.object_hook)
+    buffer = ''
+    pos = 0
+    eof = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,[]':
+            pos += 1
+
+        if pos >= len(buffer):
+            if eof:
+                return
+            buffer = text.read(chunk_size)
+            pos = 0
+            eof = not buffer
+            continue
+
+        try:
+            doc, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof or len(buffer) - pos > MAX_DOCUMENT_CHARS:
+                raise
+            # Document cut off at the end of the buffer; read more
+            chunk = text.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        if not isinstance(doc, dict):
+            raise ValueError(f"Expected a JSON object, got {type(doc).__name__}")
+        yield doc
+        pos = end
+
+
+def csv_value(text: str):
+    """Convert a CSV cell: empty -> None, numbers -> int/float, else the string"""
+    if text == '':
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def iter_csv_documents(text) -> Iterator[Dict]:
+    for row in csv.DictReader(text):
+        yield {key: csv_value(value) for key, value in row.items() if key is not None}
+
+
+class BulkImporter:
+    """Streams a JSON/NDJSON/CSV file into a collection with parallel unordered bulk writes.
+
+    The file is parsed on the calling thread and cut into batches that run
+    on a small pool, with at most `window` batches in flight. A checkpoint
+    file next to the source records how many leading records are known to
+    be written; after a failure or a stop, the next run skips them.
+    Re-sent documents that already exist are counted as duplicates; rows
+    without an _id in the file get a fresh one, so those can be written
+    twice if a run stops mid-batch.
+    """
+
+    PROGRESS_INTERVAL = 0.25
+
+    def __init__(self, coll, path: str, file_format: Optional[str] = None, batch_size: int = 1000,
+                 workers: int = 4, window: int = 8):
+        self.coll = coll
+        self.path = path
+        self.file_format = file_format or detect_format(path)
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.window = max(self.workers, window)
+        self.checkpoint_path = path + '.import-checkpoint.json'
+
+        self.total_bytes = os.path.getsize(path)
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.committed = 0
+
+    def load_checkpoint(self) -> int:
+        """Records already imported by an earlier run of this file into this collection, or 0"""
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        stat = os.stat(self.path)
+        if (checkpoint.get('size') != stat.st_size or checkpoint.get('mtime') != stat.st_mtime
+                or checkpoint.get('namespace') != self.namespace):
+            return 0
+        return int(checkpoint.get('records', 0))
+
+    @property
+    def namespace(self) -> str:
+        return f"{self.coll.database.name}.{self.coll.name}"
+
+    def save_checkpoint(self):
+        stat = os.stat(self.path)
+        with open(self.checkpoint_path, 'w', encoding='utf-8') as f:
+            json.dump({'namespace': self.namespace, 'size': stat.st_size, 'mtime': stat.st_mtime,
+                       'records': self.committed}, f)
+
+    def clear_checkpoint(self):
+        try:
+            os.remove(self.checkpoint_path)
+        except OSError:
+            pass
+
+    def write_batch(self, docs):
+        try:
+            result = self.coll.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
+            return result.inserted_count, 0
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            other = [error for error in errors if error.get('code') != DUPLICATE_KEY]
+            if other:
+                raise
+            return e.details.get('nInserted', 0), len(errors)
+
+    def run(self, job=None, resume: bool = True) -> Dict:
+        skip = self.load_checkpoint() if resume else 0
+        self.committed = skip
+        start = time.time()
+        last_report = 0.0
+
+        text, raw = open_text(self.path)
+        documents = iter_csv_documents(text) if self.file_format == 'csv' else iter_json_documents(text)
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='import')
+        # future -> (first record, record count); batches finish out of order
+        pending = {}
+        finished = {}
+        error = None
+
+        def collect(done):
+            nonlocal error
+            for future in done:
+                first, count = pending.pop(future)
+                try:
+                    inserted, duplicates = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                self.inserted += inserted
+                self.duplicates += duplicates
+                finished[first] = count
+            # Advance the checkpoint over the contiguous run of finished batches
+            while self.committed in finished:
+                self.committed += finished.pop(self.committed)
+
+        def report(force=False):
+            nonlocal last_report
+            now = time.time()
+            if job is None or (not force and now - last_report < self.PROGRESS_INTERVAL):
+                return
+            last_report = now
+            elapsed = max(now - start, 1e-6)
+            job.report_progress({
+                'read': self.read, 'inserted': self.inserted, 'duplicates': self.duplicates,
+                'bytes': raw.tell(), 'total_bytes': self.total_bytes,
+                'docs_per_sec': self.inserted / elapsed
+            })
+
+        try:
+            batch = []
+            batch_first = skip
+            for doc in documents:
+                self.read += 1
+                if job is not None:
+                    job.check_cancelled()
+                if self.read <= skip:
+                    continue
+
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    if len(pending) >= self.window:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                    if error is not None:
+                        break
+                    pending[pool.submit(self.write_batch, batch)] = (batch_first, len(batch))
+                    batch_first += len(batch)
+                    batch = []
+                    report()
+
+            if batch and error is None and not (job is not None and job.cancelled):
+                pending[pool.submit(self.write_batch, batch)] = (batch_first, len(batch))
+            collect(wait(pending).done)
+            report(force=True)
+        except BaseException:
+            collect(wait(pending).done)
+            self.save_checkpoint()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            text.close()
+
+        if error is not None:
+            self.save_checkpoint()
+            raise error
+        if job is not None and job.cancelled:
+            self.save_checkpoint()
+            raise QueryCancelled()
+
+        self.clear_checkpoint()
+        elapsed = time.time() - start
+        return {
+            'read': self.read, 'skipped': skip, 'inserted': self.inserted, 'duplicates': self.duplicates,
+            'seconds': elapsed, 'docs_per_sec': self.inserted / max(elapsed, 1e-6)
+        }
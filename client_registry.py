@@ -0,0 +1,158 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+import redis
+from pymongo import MongoClient, monitoring
+
+from command_log import InstrumentedConnectionPool, instrumented_connection_class
+
+
+# Pool settings a connection profile may carry, with the values used when it does not
+MONGO_POOL_DEFAULTS = {
+    'max_pool_size': 100,
+    'min_pool_size': 0,
+    'max_idle_time_ms': 0,
+    'compressors': '',
+}
+REDIS_POOL_DEFAULTS = {
+    'max_connections': 50,
+    'socket_keepalive': True,
+}
+
+
+def pool_options(profile: Optional[Dict], defaults: Dict) -> Dict:
+    """The pool settings of profile, falling back to defaults for missing ones"""
+    profile = profile or {}
+    return {name: profile.get(name, default) for name, default in defaults.items()}
+
+
+class UsageListener(monitoring.CommandListener):
+    """Marks a registry entry as used whenever its MongoClient starts a command"""
+
+    def __init__(self, entry: Dict):
+        self.entry = entry
+
+    def started(self, event):
+        self.entry['last_used'] = time.time()
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class ClientRegistry:
+    """Keeps one warm MongoClient / redis.Redis per connection profile.
+
+    Connecting again with the same settings returns the existing client
+    and its pooled connections. A client is closed when its profile is
+    reconnected with different settings, when it has not run a command
+    for idle_timeout seconds, or when the registry is closed. The client
+    handed out last for each backend is the one the application works
+    with, so it is never closed for being idle.
+    """
+
+    def __init__(self, command_log=None, mongo_listeners: Optional[List] = None, idle_timeout: float = 600):
+        self.command_log = command_log
+        self.mongo_listeners = mongo_listeners or []
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # (backend, key) -> {'settings', 'client', 'last_used'}
+        self._clients: Dict[tuple, Dict] = {}
+        # backend -> (backend, key) of the client handed out last
+        self._active: Dict[str, tuple] = {}
+
+    def mongo_client(self, key: str, uri: str, options: Optional[Dict] = None) -> MongoClient:
+        options = pool_options(options, MONGO_POOL_DEFAULTS)
+        settings = (uri, tuple(sorted(options.items())))
+
+        def create(entry):
+            kwargs = {
+                'serverSelectionTimeoutMS': 5000,
+                'event_listeners': self.mongo_listeners + [UsageListener(entry)],
+                'maxPoolSize': options['max_pool_size'],
+                'minPoolSize': options['min_pool_size'],
+            }
+            if options['max_idle_time_ms']:
+                kwargs['maxIdleTimeMS'] = options['max_idle_time_ms']
+            if options['compressors']:
+                kwargs['compressors'] = options['compressors']
+            return MongoClient(uri, **kwargs)
+
+        return self._get(('mongo', key), settings, create)
+
+    def redis_client(self, key: str, host: str, port: int, password: Optional[str], db: int,
+                     options: Optional[Dict] = None) -> redis.Redis:
+        options = pool_options(options, REDIS_POOL_DEFAULTS)
+        settings = (host, port, password, db, tuple(sorted(options.items())))
+
+        def create(entry):
+            pool = InstrumentedConnectionPool(
+                connection_class=instrumented_connection_class(self.command_log),
+                max_connections=options['max_connections'],
+                host=host,
+                port=port,
+                password=password,
+                db=db,
+                decode_responses=True,
+                socket_connect_timeout=5,
+                socket_keepalive=options['socket_keepalive']
+            )
+            pool.on_checkout = lambda: entry.update(last_used=time.time())
+            return redis.Redis(connection_pool=pool)
+
+        return self._get(('redis', key), settings, create)
+
+    def _get(self, name: tuple, settings: tuple, create):
+        now = time.time()
+        stale = []
+        with self._lock:
+            self._active[name[0]] = name
+            active = set(self._active.values())
+            for other, entry in list(self._clients.items()):
+                if other not in active and now - entry['last_used'] > self.idle_timeout:
+                    stale.append(self._clients.pop(other)['client'])
+
+            entry = self._clients.get(name)
+            if entry is not None and entry['settings'] != settings:
+                stale.append(self._clients.pop(name)['client'])
+                entry = None
+            if entry is None:
+                entry = {'settings': settings, 'last_used': now}
+                entry['client'] = create(entry)
+                self._clients[name] = entry
+            entry['last_used'] = now
+            client = entry['client']
+
+        for old in stale:
+            self._close(old)
+        return client
+
+    def discard(self, backend: str, key: str):
+        """Close the client of a profile, e.g. after it failed to connect"""
+        with self._lock:
+            entry = self._clients.pop((backend, key), None)
+            if self._active.get(backend) == (backend, key):
+                del self._active[backend]
+        if entry is not None:
+            self._close(entry['client'])
+
+    def close(self):
+        with self._lock:
+            clients = [entry['client'] for entry in self._clients.values()]
+            self._clients.clear()
+            self._active.clear()
+        for client in clients:
+            self._close(client)
+
+    @staticmethod
+    def _close(client):
+        try:
+            if isinstance(client, redis.Redis):
+                client.connection_pool.disconnect()
+            else:
+                client.close()
+        except Exception:
+            pass
@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from bson import Decimal128, Int64, ObjectId, json_util
+from pymongo.errors import OperationFailure, PyMongoError
+
+from export_stream import NdjsonWriter, open_output
+from query_executor import QueryCancelled
+from result_serializer import RAW_CODEC_OPTIONS
+
+
+def split_points(coll, key: str, partitions: int, sample_size: int = 10000) -> List:
+    """Up to partitions - 1 ascending boundary values of key.
+
+    splitVector walks the key's index without touching documents; where it
+    is unavailable (mongos, missing privileges) the boundaries come from
+    $bucketAuto over a random sample of the key.
+    """
+    if partitions <= 1:
+        return []
+
+    try:
+        stats = coll.database.command('collStats', coll.name)
+        chunk_bytes = max(int(stats.get('size', 0) / partitions), 1024 * 1024)
+        result = coll.database.command(
+            'splitVector', f"{coll.database.name}.{coll.name}",
+            keyPattern={key: 1}, maxChunkSizeBytes=chunk_bytes
+        )
+        keys = [point[key] for point in result.get('splitKeys', [])]
+        if keys:
+            # n split keys make at most n + 1 parts
+            parts = min(partitions, len(keys) + 1)
+            return dedupe([keys[i * len(keys) // parts] for i in range(1, parts)])
+    except (OperationFailure, TypeError):
+        pass
+
+    buckets = coll.aggregate([
+        {'$sample': {'size': sample_size}},
+        {'$bucketAuto': {'groupBy': f"${key}", 'buckets': partitions}}
+    ], allowDiskUse=True)
+    return dedupe([bucket['_id']['min'] for bucket in buckets][1:])
+
+
+def dedupe(points: List) -> List:
+    """Drop repeated boundaries; equal neighbours would make empty parts"""
+    unique = []
+    for point in points:
+        if not unique or unique[-1] != point:
+            unique.append(point)
+    return unique
+
+
+def type_bracket(value) -> Optional[str]:
+    """$type alias of the comparison bracket a split point belongs to, if ranges can be built on it"""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, (int, float, Int64, Decimal128)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, ObjectId):
+        return 'objectId'
+    if isinstance(value, datetime):
+        return 'date'
+    return None
+
+
+def partition_filters(key: str, points: List) -> List[Dict]:
+    """Range filters [-inf, p1), [p1, p2), ..., [pn, +inf) on key, plus one part for everything else.
+
+    $lt/$gte only match values of the bounds' type bracket, so the ranges
+    are built from the points of one bracket (that of the first point) and
+    a final part takes the documents whose key has any other type, is null
+    or is missing. Together the parts cover every document exactly once,
+    provided the key is not an array (see CollectionDumper.check_index).
+    """
+    bracket = type_bracket(points[0]) if points else None
+    points = [point for point in points if type_bracket(point) == bracket] if bracket else []
+    if not points:
+        return [{}]
+
+    filters = [{key: {'$lt': points[0]}}]
+    for low, high in zip(points, points[1:]):
+        filters.append({key: {'$gte': low, '$lt': high}})
+    filters.append({key: {'$gte': points[-1]}})
+    filters.append({key: {'$not': {'$type': bracket}}})
+    return filters
+
+
+def has_multikey_stage(stage) -> bool:
+    if isinstance(stage, dict):
+        if stage.get('isMultiKey'):
+            return True
+        return any(has_multikey_stage(value) for value in stage.values())
+    if isinstance(stage, list):
+        return any(has_multikey_stage(value) for value in stage)
+    return False
+
+
+class CollectionDumper:
+    """Dumps a whole collection as compressed part files read concurrently.
+
+    The collection is split into ranges of an indexed key (by default
+    _id); each range is read by its own worker, over its own pooled
+    connection, into its own gzip file. A manifest.json next to the parts
+    lists every part with its filter and document count. The "bson" format
+    writes raw documents (readable by mongorestore / bsondump), "ndjson"
+    writes relaxed Extended JSON lines.
+    """
+
+    PROGRESS_INTERVAL = 0.25
+
+    def __init__(self, coll, directory: str, key: str = '_id', workers: int = 4,
+                 partitions: Optional[int] = None, file_format: str = 'bson', batch_size: int = 1000):
+        self.coll = coll.with_options(codec_options=RAW_CODEC_OPTIONS)
+        self.directory = directory
+        self.key = key
+        self.workers = max(1, workers)
+        self.partitions = partitions or self.workers * 4
+        self.file_format = file_format
+        self.batch_size = batch_size
+
+        self.hint = [(key, 1)]
+        self.note = None
+        self.documents = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def check_index(self):
+        """Find the index the range scans are hinted to.
+
+        An array (multikey) key would put a document in the range of each
+        of its elements and dump it more than once, so such keys are
+        replaced by _id.
+        """
+        if self.key == '_id':
+            return
+        for index in self.coll.list_indexes():
+            if next(iter(index['key']), None) == self.key:
+                self.hint = list(index['key'].items())
+                break
+        else:
+            raise ValueError(f"{self.key} must be the first field of an index to split on it")
+
+        plan = self.coll.database[self.coll.name].find({}, hint=self.hint).limit(1).explain()
+        if has_multikey_stage(plan.get('queryPlanner', {}).get('winningPlan', {})):
+            self.note = f"{self.key} holds arrays (multikey index); the collection was split on _id instead"
+            self.key = '_id'
+            self.hint = [('_id', 1)]
+
+    def dump_partition(self, index: int, query: Dict, job=None) -> Dict:
+        extension = 'bson' if self.file_format == 'bson' else 'ndjson'
+        filename = f"{self.coll.name}.part-{index:04d}.{extension}.gz"
+        path = os.path.join(self.directory, filename)
+        start = time.time()
+        count = 0
+
+        cursor = self.coll.find(query, hint=self.hint, batch_size=self.batch_size,
+                                comment=job.comment if job is not None else None)
+        out = open_output(path, 'gzip')
+        writer = NdjsonWriter(out) if self.file_format == 'ndjson' else None
+        try:
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    if self._stop.is_set() or (job is not None and job.cancelled):
+                        raise QueryCancelled()
+                    self.write(out, writer, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.write(out, writer, batch)
+                count += len(batch)
+        finally:
+            cursor.close()
+            out.close()
+
+        return {
+            'index': index, 'file': filename, 'filter': json.loads(json_util.dumps(query)),
+            'documents': count, 'bytes': os.path.getsize(path), 'seconds': round(time.time() - start, 3)
+        }
+
+    def write(self, out, writer, batch):
+        if writer is not None:
+            writer.write(batch)
+        else:
+            out.write(b''.join(doc.raw for doc in batch))
+        with self._lock:
+            self.documents += len(batch)
+
+    def run(self, job=None) -> Dict:
+        self.check_index()
+        os.makedirs(self.directory, exist_ok=True)
+        start = time.time()
+        try:
+            estimated = self.coll.estimated_document_count()
+        except PyMongoError:
+            estimated = None
+
+        filters = partition_filters(self.key, split_points(self.coll, self.key, self.partitions))
+        if job is not None:
+            job.report_progress({'documents': 0, 'total': estimated, 'parts_done': 0, 'parts': len(filters),
+                                 'docs_per_sec': 0})
+
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='dump')
+        futures = {pool.submit(self.dump_partition, i, query, job): i for i, query in enumerate(filters)}
+        parts = []
+        try:
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=self.PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    parts.append(future.result())
+                if job is not None:
+                    job.check_cancelled()
+                    elapsed = max(time.time() - start, 1e-6)
+                    job.report_progress({'documents': self.documents, 'total': estimated,
+                                         'parts_done': len(parts), 'parts': len(filters),
+                                         'docs_per_sec': self.documents / elapsed})
+        except BaseException:
+            # Stop the other partitions; their part files are left incomplete
+            self._stop.set()
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+        if job is not None and job.cancelled:
+            raise QueryCancelled()
+
+        parts.sort(key=lambda part: part['index'])
+        elapsed = time.time() - start
+        manifest = {
+            'database': self.coll.database.name,
+            'collection': self.coll.name,
+            'key': self.key,
+            'note': self.note,
+            'format': self.file_format,
+            'compression': 'gzip',
+            'created': datetime.now().isoformat(),
+            'estimated_document_count': estimated,
+            'documents': sum(part['documents'] for part in parts),
+            'bytes': sum(part['bytes'] for part in parts),
+            'seconds': round(elapsed, 3),
+            'workers': self.workers,
+            'parts': parts
+        }
+        with open(os.path.join(self.directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        manifest['docs_per_sec'] = manifest['documents'] / max(elapsed, 1e-6)
+        return manifest
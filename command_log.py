@@ -0,0 +1,269 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import bson
+import redis
+from pymongo import monitoring
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+HISTOGRAM_BOUNDS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = math.ceil(p / 100.0 * len(sorted_values))
+    return sorted_values[min(max(rank - 1, 0), len(sorted_values) - 1)]
+
+
+def histogram(durations: List[float]) -> List[int]:
+    counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+    for value in durations:
+        for i, bound in enumerate(HISTOGRAM_BOUNDS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return counts
+
+
+def reply_size(value) -> int:
+    """Approximate size in bytes of a decoded Redis reply"""
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, (list, tuple, set)):
+        return sum(reply_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(reply_size(k) + reply_size(v) for k, v in value.items())
+    return 8
+
+
+class CommandLog:
+    """Bounded ring buffer of every command sent to MongoDB or Redis.
+
+    Each entry records the backend, command name, target (database or
+    Redis db), latency, reply size, time spent waiting for a pooled
+    connection and whether the command failed.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self._lock = threading.Lock()
+        self.entries = deque(maxlen=capacity)
+
+    def resize(self, capacity: int):
+        with self._lock:
+            self.entries = deque(self.entries, maxlen=max(capacity, 1))
+
+    def record(self, backend: str, command: str, target, duration_ms: float,
+               reply_bytes: Optional[int] = None, pool_wait_ms: Optional[float] = None,
+               error: Optional[str] = None):
+        entry = {
+            'time': time.time(), 'backend': backend, 'command': command, 'target': target,
+            'duration_ms': duration_ms, 'reply_bytes': reply_bytes,
+            'pool_wait_ms': pool_wait_ms, 'error': error
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return list(self.entries)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> List[Dict]:
+        """Per (backend, command) count, errors, p50/p95/p99/max latency, mean reply size and pool wait"""
+        groups: Dict[tuple, List[Dict]] = {}
+        for entry in self.snapshot():
+            groups.setdefault((entry['backend'], entry['command']), []).append(entry)
+
+        stats = []
+        for (backend, command), entries in sorted(groups.items()):
+            durations = sorted(entry['duration_ms'] for entry in entries)
+            sizes = [entry['reply_bytes'] for entry in entries if entry['reply_bytes'] is not None]
+            waits = [entry['pool_wait_ms'] for entry in entries if entry['pool_wait_ms'] is not None]
+            stats.append({
+                'backend': backend, 'command': command, 'count': len(entries),
+                'errors': sum(1 for entry in entries if entry['error']),
+                'p50': percentile(durations, 50), 'p95': percentile(durations, 95),
+                'p99': percentile(durations, 99), 'max': durations[-1],
+                'reply_bytes': sum(sizes) / len(sizes) if sizes else None,
+                'pool_wait_ms': sum(waits) / len(waits) if waits else None,
+                'histogram': histogram(durations)
+            })
+        return stats
+
+    def dump(self, path: str) -> int:
+        """Write the buffered entries to path as NDJSON; returns the number written"""
+        entries = self.snapshot()
+        with open(path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                line = dict(entry, time=datetime.fromtimestamp(entry['time']).isoformat())
+                f.write(json.dumps(line, ensure_ascii=False, default=str) + '\n')
+        return len(entries)
+
+
+class MongoCommandMonitor(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Feeds a CommandLog from pymongo command and connection pool (CMAP) events.
+
+    Checkout and command events for one operation fire on the same thread,
+    so the pool wait measured at checkout is attached to the next command
+    the thread starts.
+    """
+
+    def __init__(self, log: CommandLog):
+        self.log = log
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._waits: Dict[tuple, Optional[float]] = {}
+
+    # Command events
+
+    def started(self, event):
+        wait = getattr(self._local, 'pool_wait', None)
+        self._local.pool_wait = None
+        with self._lock:
+            self._waits[(event.connection_id, event.request_id)] = wait
+
+    def succeeded(self, event):
+        try:
+            size = len(bson.encode(event.reply))
+        except Exception:
+            size = None
+        self._record(event, size, None)
+
+    def failed(self, event):
+        self._record(event, None, str(event.failure.get('errmsg', event.failure))
+                     if isinstance(event.failure, dict) else str(event.failure))
+
+    def _record(self, event, size, error):
+        with self._lock:
+            wait = self._waits.pop((event.connection_id, event.request_id), None)
+        self.log.record('mongo', event.command_name, event.database_name,
+                        event.duration_micros / 1000.0, size, wait, error)
+
+    # Pool events
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_start = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        start = getattr(self._local, 'checkout_start', None)
+        if start is not None:
+            self._local.pool_wait = (time.perf_counter() - start) * 1000
+            self._local.checkout_start = None
+
+    def connection_check_out_failed(self, event):
+        self._local.checkout_start = None
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+class InstrumentedConnectionMixin:
+    """redis-py connection that logs each command from when it is sent until its reply is read.
+
+    Replies arrive in the order commands were sent, so a FIFO of pending
+    commands also covers pipelines and MULTI/EXEC.
+    """
+
+    command_log: Optional[CommandLog] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = deque()
+        self.pool_wait_ms = None
+
+    def _push(self, args):
+        name = args[0] if args else '?'
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', 'replace')
+        # Multi-word commands such as "CLIENT SETNAME" arrive as one string
+        name = str(name).split(' ')[0].upper()
+        wait, self.pool_wait_ms = self.pool_wait_ms, None
+        self._pending.append((name, time.perf_counter(), wait))
+
+    def send_command(self, *args, **kwargs):
+        self._push(args)
+        return super().send_command(*args, **kwargs)
+
+    def pack_commands(self, commands):
+        for args in commands:
+            self._push(args)
+        return super().pack_commands(commands)
+
+    def read_response(self, *args, **kwargs):
+        pending = self._pending.popleft() if self._pending else None
+        try:
+            response = super().read_response(*args, **kwargs)
+        except Exception as e:
+            if pending is not None and self.command_log is not None:
+                name, start, wait = pending
+                self.command_log.record('redis', name, self.db, (time.perf_counter() - start) * 1000,
+                                        None, wait, str(e))
+            raise
+        if pending is not None and self.command_log is not None:
+            name, start, wait = pending
+            error = str(response) if isinstance(response, redis.ResponseError) else None
+            self.command_log.record('redis', name, self.db, (time.perf_counter() - start) * 1000,
+                                    reply_size(response), wait, error)
+        return response
+
+    def disconnect(self, *args, **kwargs):
+        self._pending.clear()
+        return super().disconnect(*args, **kwargs)
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """Bounded connection pool that times get_connection and hands the wait to the connection.
+
+    When all max_connections are in use, callers wait for one to be
+    returned instead of failing, and that wait is what gets logged.
+    on_checkout, if set, is called for every connection handed out.
+    """
+
+    on_checkout = None
+
+    def get_connection(self, command_name, *keys, **options):
+        if self.on_checkout is not None:
+            self.on_checkout()
+        start = time.perf_counter()
+        connection = super().get_connection(command_name, *keys, **options)
+        connection.pool_wait_ms = (time.perf_counter() - start) * 1000
+        return connection
+
+
+def instrumented_connection_class(log: CommandLog, ssl: bool = False):
+    base = redis.SSLConnection if ssl else redis.Connection
+    return type(f"Instrumented{base.__name__}", (InstrumentedConnectionMixin, base), {'command_log': log})
@@ -38,7 +38,24 @@ class ConfigManager:
                 'auto_refresh': False,
                 'refresh_interval': 30,
                 'max_history': 50,
-                'page_size': 100
+                'page_size': 100,
+                'cache_max_mb': 64,
+                'cache_ttl': 300,
+                'schema_sample_size': 1000,
+                'import_batch_size': 1000,
+                'import_workers': 4,
+                'import_window': 8,
+                'dump_workers': 4,
+                'command_log_size': 10000,
+                'redis_scan_count': 1000,
+                'redis_page_size': 500,
+                'redis_metadata_batch': 100,
+                'redis_delimiter': ':',
+                'redis_memory_sample_percent': 100,
+                'redis_memory_samples': 5,
+                'redis_memory_max_ops': 5000,
+                'redis_value_page_size': 100,
+                'redis_value_string_window': 65536
             },
             'last_connection': {
                 'mongo': None,
@@ -56,7 +73,9 @@ class ConfigManager:
 
     # MongoDB Profiles
     def add_mongo_profile(self, name: str, host: str, port: int,
-                         username: str = '', password: str = '', database: str = ''):
+                         username: str = '', password: str = '', database: str = '',
+                         max_pool_size: int = 100, min_pool_size: int = 0,
+                         max_idle_time_ms: int = 0, compressors: str = ''):
         """Add MongoDB connection profile"""
         profile = {
             'name': name,
@@ -65,6 +84,10 @@ class ConfigManager:
             'username': username,
             'password': password,
             'database': database,
+            'max_pool_size': max_pool_size,
+            'min_pool_size': min_pool_size,
+            'max_idle_time_ms': max_idle_time_ms,
+            'compressors': compressors,
             'created_at': datetime.now().isoformat()
         }
 
@@ -92,7 +115,8 @@ class ConfigManager:
 
     # Redis Profiles
     def add_redis_profile(self, name: str, host: str, port: int,
-                         password: str = '', db: int = 0):
+                         password: str = '', db: int = 0,
+                         max_connections: int = 50, socket_keepalive: bool = True):
         """Add Redis connection profile"""
         profile = {
             'name': name,
@@ -100,6 +124,8 @@ class ConfigManager:
             'port': port,
             'password': password,
             'db': db,
+            'max_connections': max_connections,
+            'socket_keepalive': socket_keepalive,
             'created_at': datetime.now().isoformat()
         }
 
@@ -127,7 +153,8 @@ class ConfigManager:
 
     # Query History
     def add_to_history(self, db_type: str, query: str, database: str = '',
-                      collection: str = '', execution_time: float = 0):
+                      collection: str = '', execution_time: float = 0,
+                      options: Optional[Dict] = None, timings: Optional[Dict] = None):
         """Add query to history"""
         history_item = {
             'query': query,
@@ -136,6 +163,10 @@ class ConfigManager:
             'execution_time': execution_time,
             'timestamp': datetime.now().isoformat()
         }
+        if options:
+            history_item['options'] = options
+        if timings:
+            history_item['timings'] = timings
 
         if db_type not in self.config['query_history']:
             self.config['query_history'][db_type] = []
@@ -160,7 +191,8 @@ class ConfigManager:
 
     # Favorites
     def add_favorite(self, db_type: str, name: str, query: str,
-                    database: str = '', collection: str = ''):
+                    database: str = '', collection: str = '',
+                    options: Optional[Dict] = None):
         """Add query to favorites"""
         favorite = {
             'name': name,
@@ -169,6 +201,8 @@ class ConfigManager:
             'collection': collection,
             'created_at': datetime.now().isoformat()
         }
+        if options:
+            favorite['options'] = options
 
         if db_type not in self.config['favorites']:
             self.config['favorites'][db_type] = []
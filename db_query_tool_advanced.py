@@ -5,15 +5,101 @@ from pymongo.errors import ConnectionFailure, OperationFailure
 import redis
 import json
 import csv
+import os
 from collections import defaultdict
 from datetime import datetime
 from config_manager import ConfigManager
+from query_executor import QueryExecutor, QueryCancelled, make_comment
+from query_timing import CommandTimer, QueryTimings, format_timings
+from command_log import CommandLog, HISTOGRAM_BOUNDS, MongoCommandMonitor
+from client_registry import ClientRegistry, MONGO_POOL_DEFAULTS, REDIS_POOL_DEFAULTS, pool_options
+from mongo_pager import KeysetPager
+from mongo_metadata import MongoMetadataLoader
+from metadata_cache import MetadataCache
+from result_buffer import ColumnarResultBuffer
+from result_serializer import RAW_CODEC_OPTIONS, ResultSerializer, to_extended_json
+from explain_plan import parse_explain, run_explain
+from index_advisor import advise
+from pipeline_preview import preview_pipeline, stage_operator
+from result_cache import ResultCache
+from bulk_import import BulkImporter
+from export_stream import export_cursor, query_cursor
+from collection_dump import CollectionDumper
+from schema_analyzer import analyze_collection
+from redis_browser import KEY_TYPES, KeyScanner, fetch_key_metadata, format_bytes, format_ttl
+from redis_namespace import KeyNamespace, ordered_entries, sort_rank
+from redis_memory import MemoryAnalyzer, export_report
+from redis_value import ValuePager, save_window
 import time
 import re
+from collections.abc import Mapping
+from functools import lru_cache
+
+
+HIGHLIGHT_TAGS = ('string', 'number', 'boolean', 'null', 'key', 'brace')
+
+JSON_TOKEN_RE = re.compile(
+    r'(?P<key>"(?:[^"\\]|\\.)*"(?=\s*:))'
+    r'|(?P<string>"(?:[^"\\]|\\.)*")'
+    r'|(?P<number>-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b)'
+    r'|(?P<boolean>\b(?:true|false)\b)'
+    r'|(?P<null>\bnull\b)'
+)
+
+
+@lru_cache(maxsize=1)
+def get_json_lexer():
+    """Shared pygments JSON lexer, or None when pygments is not installed"""
+    try:
+        from pygments.lexers import JsonLexer
+    except ImportError:
+        return None
+    return JsonLexer()
+
+
+@lru_cache(maxsize=4096)
+def lex_json_line(line):
+    """Return (tag, start, end) spans for one line of JSON.
+
+    Lines repeat a lot in formatted results ("  },", "  \"_id\": ..."), so
+    the spans are cached per line text.
+    """
+    lexer = get_json_lexer()
+    if lexer is None:
+        return tuple((m.lastgroup, m.start(), m.end()) for m in JSON_TOKEN_RE.finditer(line))
+
+    from pygments.token import Keyword, Name, Number, Punctuation, String
+
+    spans = []
+    for start, token_type, value in lexer.get_tokens_unprocessed(line):
+        if token_type in Name.Tag:
+            tag = 'key'
+        elif token_type in String:
+            tag = 'string'
+        elif token_type in Number:
+            tag = 'number'
+        elif token_type in Keyword.Constant:
+            tag = 'null' if value == 'null' else 'boolean'
+        elif token_type in Punctuation and value in '{}[]':
+            tag = 'brace'
+        else:
+            continue
+        spans.append((tag, start, start + len(value)))
+    return tuple(spans)
 
 
 class JsonHighlightText(scrolledtext.ScrolledText):
-    """Text widget with JSON syntax highlighting"""
+    """Text widget with JSON syntax highlighting.
+
+    Highlighting works line by line: typing only re-lexes the lines that
+    changed, keystrokes are coalesced by a debounce timer, and buffers longer
+    than LAZY_LINE_THRESHOLD are colorized only for the lines in view.
+    """
+
+    DEBOUNCE_MS = 150
+    SCROLL_DEBOUNCE_MS = 30
+    LAZY_LINE_THRESHOLD = 2000
+    TAG_BATCH = 1000
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -26,40 +112,359 @@ class JsonHighlightText(scrolledtext.ScrolledText):
         self.tag_config('key', foreground='#a31515')
         self.tag_config('brace', foreground='#000000')
 
+        self._line_count = 1
+        self._dirty = None
+        self._highlight_job = None
+        self._viewport_job = None
+        self._lazy = False
+        self._highlighted_lines = set()
+
+        self.configure(yscrollcommand=self._on_yscroll)
+
     def highlight(self):
-        """Apply JSON syntax highlighting"""
-        content = self.get('1.0', 'end-1c')
-
-        # Remove all tags
-        for tag in ('string', 'number', 'boolean', 'null', 'key', 'brace'):
-            self.tag_remove(tag, '1.0', 'end')
-
-        # String pattern
-        for match in re.finditer(r'"([^"\\]|\\.)*"', content):
-            start = f"1.0+{match.start()}c"
-            end = f"1.0+{match.end()}c"
-            # Check if it's a key (followed by :)
-            next_char_idx = match.end()
-            is_key = next_char_idx < len(content) and content[next_char_idx:].lstrip().startswith(':')
-            self.tag_add('key' if is_key else 'string', start, end)
-
-        # Number pattern
-        for match in re.finditer(r'\b-?\d+\.?\d*\b', content):
-            start = f"1.0+{match.start()}c"
-            end = f"1.0+{match.end()}c"
-            self.tag_add('number', start, end)
-
-        # Boolean pattern
-        for match in re.finditer(r'\b(true|false)\b', content):
-            start = f"1.0+{match.start()}c"
-            end = f"1.0+{match.end()}c"
-            self.tag_add('boolean', start, end)
-
-        # Null pattern
-        for match in re.finditer(r'\bnull\b', content):
-            start = f"1.0+{match.start()}c"
-            end = f"1.0+{match.end()}c"
-            self.tag_add('null', start, end)
+        """Apply JSON syntax highlighting to the whole buffer (lazily if it is large)"""
+        if self._highlight_job:
+            self.after_cancel(self._highlight_job)
+            self._highlight_job = None
+        self._dirty = None
+
+        self._line_count = self.line_count()
+        self._lazy = self._line_count > self.LAZY_LINE_THRESHOLD
+        self._highlighted_lines.clear()
+
+        if self._lazy:
+            for tag in HIGHLIGHT_TAGS:
+                self.tag_remove(tag, '1.0', 'end')
+            self.highlight_viewport()
+        else:
+            self.highlight_lines(1, self._line_count)
+
+    def line_count(self):
+        return int(self.index('end-1c').split('.')[0])
+
+    def highlight_lines(self, first, last):
+        """Re-lex lines first..last and apply tags in one batched call per tag"""
+        for tag in HIGHLIGHT_TAGS:
+            self.tag_remove(tag, f'{first}.0', f'{last}.end')
+
+        ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+        lines = self.get(f'{first}.0', f'{last}.end').split('\n')
+        for lineno, line in enumerate(lines, start=first):
+            for tag, start, end in lex_json_line(line):
+                ranges[tag].append(f'{lineno}.{start}')
+                ranges[tag].append(f'{lineno}.{end}')
+
+        for tag, indices in ranges.items():
+            for i in range(0, len(indices), self.TAG_BATCH * 2):
+                self.tag_add(tag, *indices[i:i + self.TAG_BATCH * 2])
+
+    def highlight_viewport(self):
+        """Highlight the visible lines that have not been highlighted yet"""
+        self._viewport_job = None
+        first = int(self.index('@0,0').split('.')[0])
+        last = int(self.index(f'@0,{self.winfo_height()}').split('.')[0])
+
+        start = None
+        for lineno in range(first, last + 2):
+            pending = lineno <= last and lineno not in self._highlighted_lines
+            if pending and start is None:
+                start = lineno
+            elif not pending and start is not None:
+                self.highlight_lines(start, lineno - 1)
+                start = None
+        self._highlighted_lines.update(range(first, last + 1))
+
+    def on_key_release(self, event=None):
+        """Mark the edited lines dirty and re-highlight them after a pause in typing"""
+        line = int(self.index('insert').split('.')[0])
+        total = self.line_count()
+        delta = total - self._line_count
+        self._line_count = total
+
+        first = max(1, line - max(delta, 0))
+        if self._dirty:
+            first = min(first, self._dirty[0])
+            line = max(line, self._dirty[1])
+        self._dirty = (first, line)
+
+        if delta and self._lazy:
+            # Line numbers shifted, so the viewport bookkeeping is stale
+            self._highlighted_lines.clear()
+
+        self.schedule_highlight()
+
+    def schedule_highlight(self):
+        """Debounce highlighting of the dirty lines"""
+        if self._highlight_job:
+            self.after_cancel(self._highlight_job)
+        self._highlight_job = self.after(self.DEBOUNCE_MS, self._flush_highlight)
+
+    def _flush_highlight(self):
+        self._highlight_job = None
+        if self._dirty:
+            first, last = self._dirty
+            self._dirty = None
+            self.highlight_lines(first, min(last, self.line_count()))
+        if self._lazy:
+            self.highlight_viewport()
+
+    def _on_yscroll(self, first, last):
+        self.vbar.set(first, last)
+        if self._lazy and not self._viewport_job:
+            self._viewport_job = self.after(self.SCROLL_DEBOUNCE_MS, self.highlight_viewport)
+
+
+class VirtualTableView(ttk.Frame):
+    """Table view that renders only the visible window of a ColumnarResultBuffer"""
+
+    VISIBLE_COLUMNS = 10
+    COLUMN_WIDTH = 140
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.buffer = ColumnarResultBuffer()
+        self.first_row = 0
+        self.first_col = 0
+        self.visible_rows = 20
+        self.shown_columns = ()
+
+        self.tree = ttk.Treeview(self, show='headings', selectmode='browse')
+        self.vbar = ttk.Scrollbar(self, orient='vertical', command=self.on_vscroll)
+        self.hbar = ttk.Scrollbar(self, orient='horizontal', command=self.on_hscroll)
+
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.vbar.grid(row=0, column=1, sticky='ns')
+        self.hbar.grid(row=1, column=0, sticky='ew')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.info_label = ttk.Label(self, text="")
+        self.info_label.grid(row=2, column=0, columnspan=2, sticky='w')
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_rows(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_rows(3))
+        self.tree.bind('<Shift-MouseWheel>', lambda e: self.scroll_columns(-1 if e.delta > 0 else 1))
+
+    def set_buffer(self, buffer):
+        """Show a new result buffer"""
+        self.buffer = buffer
+        self.first_row = 0
+        self.first_col = 0
+        self.render()
+
+    def on_resize(self, event):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # Leave room for the heading row
+        rows = max(1, event.height // row_height - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_vscroll(self, *args):
+        total = len(self.buffer)
+        if args[0] == 'moveto':
+            self.first_row = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.first_row += int(args[1]) * step
+        self.render()
+
+    def on_hscroll(self, *args):
+        total = len(self.buffer.columns)
+        if args[0] == 'moveto':
+            self.first_col = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.VISIBLE_COLUMNS if args[2] == 'pages' else 1
+            self.first_col += int(args[1]) * step
+        self.render()
+
+    def scroll_rows(self, delta):
+        self.first_row += delta
+        self.render()
+
+    def scroll_columns(self, delta):
+        self.first_col += delta
+        self.render()
+
+    def sort_by(self, column):
+        """Sort the buffer in memory by column, toggling the direction"""
+        descending = self.buffer.sort_column == column and not self.buffer.sort_descending
+        self.buffer.sort(column, descending)
+        self.first_row = 0
+        self.shown_columns = ()
+        self.render()
+
+    def render(self):
+        """Fill the Treeview with only the visible rows and columns"""
+        total_rows = len(self.buffer)
+        total_cols = len(self.buffer.columns)
+        self.first_row = max(0, min(self.first_row, total_rows - self.visible_rows))
+        self.first_col = max(0, min(self.first_col, total_cols - self.VISIBLE_COLUMNS))
+
+        columns = tuple(self.buffer.columns[self.first_col:self.first_col + self.VISIBLE_COLUMNS])
+        if columns != self.shown_columns:
+            self.tree.delete(*self.tree.get_children())
+            self.tree.configure(columns=columns)
+            for col in columns:
+                heading = col
+                if col == self.buffer.sort_column:
+                    heading += ' ▼' if self.buffer.sort_descending else ' ▲'
+                self.tree.heading(col, text=heading, command=lambda c=col: self.sort_by(c))
+                self.tree.column(col, width=self.COLUMN_WIDTH, stretch=False)
+            self.shown_columns = columns
+
+        # Reuse the row items and only swap their values
+        items = self.tree.get_children()
+        last_row = min(total_rows, self.first_row + self.visible_rows)
+        needed = last_row - self.first_row
+        if len(items) > needed:
+            self.tree.delete(*items[needed:])
+            items = items[:needed]
+        for offset in range(needed):
+            values = self.buffer.row_values(self.first_row + offset, list(columns))
+            if offset < len(items):
+                self.tree.item(items[offset], values=values)
+            else:
+                self.tree.insert('', 'end', values=values)
+
+        if total_rows:
+            self.vbar.set(self.first_row / total_rows, last_row / total_rows)
+            self.info_label.config(text=f"Rows {self.first_row + 1}-{last_row} of {total_rows} | "
+                                        f"Columns {self.first_col + 1}-{self.first_col + len(columns)} of {total_cols}")
+        else:
+            self.vbar.set(0, 1)
+            self.info_label.config(text="")
+
+        if total_cols:
+            self.hbar.set(self.first_col / total_cols, (self.first_col + len(columns)) / total_cols)
+        else:
+            self.hbar.set(0, 1)
+
+
+class DocumentTreeView(ttk.Frame):
+    """Collapsible result viewer that only builds rows for nodes the user opens.
+
+    Documents start collapsed; their fields are inserted when a node is
+    expanded, and long lists of children are added CHUNK_SIZE at a time
+    through a "more" row, so the first rows appear regardless of result size.
+    """
+
+    CHUNK_SIZE = 200
+    MAX_VALUE_LENGTH = 200
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.containers = {}
+        self.more_rows = {}
+
+        self.tree = ttk.Treeview(self, columns=('value', 'type'), show='tree headings', selectmode='browse')
+        vbar = ttk.Scrollbar(self, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=vbar.set)
+
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        vbar.grid(row=0, column=1, sticky='ns')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.heading('#0', text='Key')
+        self.tree.heading('value', text='Value')
+        self.tree.heading('type', text='Type')
+        self.tree.column('#0', width=220)
+        self.tree.column('value', width=400)
+        self.tree.column('type', width=90, stretch=False)
+        self.tree.tag_configure('more', foreground='#0451a5')
+
+        self.tree.bind('<<TreeviewOpen>>', self.on_open)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+
+    def set_documents(self, documents):
+        """Show documents as collapsed top-level rows"""
+        self.tree.delete(*self.tree.get_children())
+        self.containers.clear()
+        self.more_rows.clear()
+        self.insert_children('', documents, 0, top_level=True)
+
+    def insert_children(self, parent, container, start, top_level=False):
+        """Insert one chunk of container's entries under parent"""
+        keys = list(container) if isinstance(container, Mapping) else None
+        end = min(len(container), start + self.CHUNK_SIZE)
+
+        for i in range(start, end):
+            key = keys[i] if keys is not None else i
+            value = container[key]
+            if top_level and isinstance(value, Mapping) and '_id' in value:
+                text = f"[{i}] _id: {value['_id']}"
+            else:
+                text = str(key) if keys is not None else f"[{key}]"
+            self.insert_node(parent, text, value)
+
+        if end < len(container):
+            more = self.tree.insert(parent, 'end', text=f"… {len(container) - end} more",
+                                    tags=('more',))
+            self.more_rows[more] = (parent, container, end, top_level)
+
+    def insert_node(self, parent, text, value):
+        node = self.tree.insert(parent, 'end', text=text,
+                                values=(self.summarize(value), self.type_name(value)))
+        if isinstance(value, (Mapping, list)) and value:
+            # Placeholder child so the node gets an expand arrow
+            self.tree.insert(node, 'end', text='')
+            self.containers[node] = value
+
+    def on_open(self, event):
+        node = self.tree.focus()
+        container = self.containers.pop(node, None)
+        if container is not None:
+            self.tree.delete(*self.tree.get_children(node))
+            self.insert_children(node, container, 0)
+
+    def on_select(self, event):
+        selected = self.tree.selection()
+        if selected and selected[0] in self.more_rows:
+            more = selected[0]
+            parent, container, start, top_level = self.more_rows.pop(more)
+            self.tree.delete(more)
+            self.insert_children(parent, container, start, top_level)
+
+    def summarize(self, value):
+        if isinstance(value, Mapping):
+            return f"{{ {len(value)} fields }}"
+        if isinstance(value, list):
+            return f"[ {len(value)} elements ]"
+        if value is None:
+            return 'null'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, str):
+            text = json.dumps(value, ensure_ascii=False)
+        else:
+            text = str(value)
+        if len(text) > self.MAX_VALUE_LENGTH:
+            text = text[:self.MAX_VALUE_LENGTH] + '...'
+        return text.replace('\n', ' ')
+
+    @staticmethod
+    def type_name(value):
+        if isinstance(value, Mapping):
+            return 'Object'
+        if isinstance(value, list):
+            return 'Array'
+        if value is None:
+            return 'Null'
+        if isinstance(value, bool):
+            return 'Boolean'
+        if isinstance(value, int):
+            return 'Int'
+        if isinstance(value, float):
+            return 'Double'
+        if isinstance(value, str):
+            return 'String'
+        return type(value).__name__
 
 
 class MongoDocumentEditor(tk.Toplevel):
@@ -122,12 +527,15 @@ class MongoDocumentEditor(tk.Toplevel):
 class RedisValueEditor(tk.Toplevel):
     """Dialog for editing Redis values"""
 
-    def __init__(self, parent, key='', value='', value_type='string'):
+    def __init__(self, parent, key='', value='', value_type='string', note=''):
         super().__init__(parent)
         self.title(f"Edit Redis Value ({value_type})")
-        self.geometry("600x400")
+        self.geometry("600x420")
         self.result = None
 
+        if note:
+            ttk.Label(self, text=note, foreground='gray').pack(anchor='w', padx=10, pady=(5, 0))
+
         # Key
         ttk.Label(self, text="Key:").pack(anchor='w', padx=10, pady=5)
         self.key_entry = ttk.Entry(self, width=70)
@@ -284,7 +692,7 @@ class ProfileEditDialog(tk.Toplevel):
         self.config_manager = config_manager
         self.db_type = db_type
         self.title("Add Profile" if not profile else "Edit Profile")
-        self.geometry("400x400")
+        self.geometry("420x560")
 
         # Form
         form_frame = ttk.Frame(self, padding=10)
@@ -330,6 +738,31 @@ class ProfileEditDialog(tk.Toplevel):
             self.database_entry = ttk.Entry(form_frame, width=30)
             self.database_entry.grid(row=row, column=1, sticky='ew', pady=5)
             row += 1
+
+            # Connection pool
+            ttk.Label(form_frame, text="Max Pool Size (0 = no limit):").grid(row=row, column=0, sticky='w', pady=5)
+            self.max_pool_size_entry = ttk.Entry(form_frame, width=30)
+            self.max_pool_size_entry.insert(0, str(MONGO_POOL_DEFAULTS['max_pool_size']))
+            self.max_pool_size_entry.grid(row=row, column=1, sticky='ew', pady=5)
+            row += 1
+
+            ttk.Label(form_frame, text="Min Pool Size:").grid(row=row, column=0, sticky='w', pady=5)
+            self.min_pool_size_entry = ttk.Entry(form_frame, width=30)
+            self.min_pool_size_entry.insert(0, str(MONGO_POOL_DEFAULTS['min_pool_size']))
+            self.min_pool_size_entry.grid(row=row, column=1, sticky='ew', pady=5)
+            row += 1
+
+            ttk.Label(form_frame, text="Max Idle Time (ms, 0 = none):").grid(row=row, column=0, sticky='w', pady=5)
+            self.max_idle_time_entry = ttk.Entry(form_frame, width=30)
+            self.max_idle_time_entry.insert(0, str(MONGO_POOL_DEFAULTS['max_idle_time_ms']))
+            self.max_idle_time_entry.grid(row=row, column=1, sticky='ew', pady=5)
+            row += 1
+
+            ttk.Label(form_frame, text="Compressors:").grid(row=row, column=0, sticky='w', pady=5)
+            self.compressors_var = tk.StringVar(value=MONGO_POOL_DEFAULTS['compressors'])
+            ttk.Combobox(form_frame, textvariable=self.compressors_var, width=28,
+                         values=['', 'zstd', 'snappy', 'zlib', 'zstd,snappy,zlib']).grid(row=row, column=1, sticky='ew', pady=5)
+            row += 1
         else:
             # Password
             ttk.Label(form_frame, text="Password:").grid(row=row, column=0, sticky='w', pady=5)
@@ -344,6 +777,18 @@ class ProfileEditDialog(tk.Toplevel):
             self.db_entry.grid(row=row, column=1, sticky='ew', pady=5)
             row += 1
 
+            # Connection pool
+            ttk.Label(form_frame, text="Max Connections:").grid(row=row, column=0, sticky='w', pady=5)
+            self.max_connections_entry = ttk.Entry(form_frame, width=30)
+            self.max_connections_entry.insert(0, str(REDIS_POOL_DEFAULTS['max_connections']))
+            self.max_connections_entry.grid(row=row, column=1, sticky='ew', pady=5)
+            row += 1
+
+            ttk.Label(form_frame, text="Socket Keepalive:").grid(row=row, column=0, sticky='w', pady=5)
+            self.socket_keepalive_var = tk.BooleanVar(value=REDIS_POOL_DEFAULTS['socket_keepalive'])
+            ttk.Checkbutton(form_frame, variable=self.socket_keepalive_var).grid(row=row, column=1, sticky='w', pady=5)
+            row += 1
+
         form_frame.columnconfigure(1, weight=1)
 
         # Buttons
@@ -377,13 +822,25 @@ class ProfileEditDialog(tk.Toplevel):
             password = self.password_entry.get()
             database = self.database_entry.get().strip()
 
+            try:
+                max_pool_size = int(self.max_pool_size_entry.get().strip())
+                min_pool_size = int(self.min_pool_size_entry.get().strip())
+                max_idle_time_ms = int(self.max_idle_time_entry.get().strip())
+            except ValueError:
+                messagebox.showerror("Error", "Pool sizes and idle time must be numbers")
+                return
+
             self.config_manager.add_mongo_profile(
                 name=name,
                 host=host,
                 port=port,
                 username=username,
                 password=password,
-                database=database
+                database=database,
+                max_pool_size=max_pool_size,
+                min_pool_size=min_pool_size,
+                max_idle_time_ms=max_idle_time_ms,
+                compressors=self.compressors_var.get().replace(' ', '')
             )
         else:
             password = self.password_entry.get()
@@ -391,8 +848,9 @@ class ProfileEditDialog(tk.Toplevel):
 
             try:
                 db = int(db_str)
+                max_connections = int(self.max_connections_entry.get().strip())
             except ValueError:
-                messagebox.showerror("Error", "DB must be a number")
+                messagebox.showerror("Error", "DB and max connections must be numbers")
                 return
 
             self.config_manager.add_redis_profile(
@@ -400,7 +858,9 @@ class ProfileEditDialog(tk.Toplevel):
                 host=host,
                 port=port,
                 password=password,
-                db=db
+                db=db,
+                max_connections=max_connections,
+                socket_keepalive=self.socket_keepalive_var.get()
             )
 
         messagebox.showinfo("Success", "Profile saved successfully")
@@ -408,6 +868,9 @@ class ProfileEditDialog(tk.Toplevel):
 
 
 class DatabaseQueryTool:
+    # Rows rendered per expanded Redis key prefix (and per "... more" click)
+    REDIS_WINDOW = 500
+
     def __init__(self, root):
         self.root = root
         self.root.title("MongoDB & Redis Query Tool - Advanced")
@@ -417,10 +880,30 @@ class DatabaseQueryTool:
         self.redis_client = None
         self.config_manager = ConfigManager()
         self.auto_refresh_job = None
+        self.query_executor = QueryExecutor(self.root, on_error=self.show_background_error)
+        # Browser metadata loads on its own workers so it never queues behind queries
+        self.metadata_executor = QueryExecutor(self.root, on_error=self.show_background_error)
+        self.mongo_metadata = MongoMetadataLoader()
+        # Kept next to the config file rather than in whatever directory the tool was started from
+        self.metadata_cache = MetadataCache(os.path.join(
+            os.path.dirname(os.path.abspath(self.config_manager.config_file)), 'metadata_cache.db'))
+        self.result_serializer = ResultSerializer()
+        self.result_cache = ResultCache(
+            max_bytes=self.config_manager.get_setting('cache_max_mb', 64) * 1024 * 1024,
+            ttl=self.config_manager.get_setting('cache_ttl', 300)
+        )
+        self.mongo_cache_profile = ''
+        self.command_timer = CommandTimer()
+        self.command_log = CommandLog(self.config_manager.get_setting('command_log_size', 10000))
+        self.command_monitor = MongoCommandMonitor(self.command_log)
+        self.client_registry = ClientRegistry(self.command_log, [self.command_timer, self.command_monitor])
+        self.redis_cache_profile = ''
 
         self.setup_ui()
         self.apply_theme()
 
+        self.root.protocol('WM_DELETE_WINDOW', self.on_close)
+
     def setup_ui(self):
         # Menu bar
         self.setup_menu()
@@ -451,10 +934,11 @@ class DatabaseQueryTool:
         # File menu
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
-        file_menu.add_command(label="Export Results...", command=self.export_results)
+        file_menu.add_command(label="Export Query...", command=self.export_results)
         file_menu.add_command(label="Import Data...", command=self.import_data)
+        file_menu.add_command(label="Dump Collection...", command=self.dump_collection)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
 
         # Connection menu
         conn_menu = tk.Menu(menubar, tearoff=0)
@@ -467,12 +951,17 @@ class DatabaseQueryTool:
         menubar.add_cascade(label="View", menu=view_menu)
         view_menu.add_command(label="Toggle Theme", command=self.toggle_theme)
         view_menu.add_command(label="Clear Results", command=self.clear_results)
+        view_menu.add_command(label="Clear Result Cache", command=self.clear_result_cache)
+        view_menu.add_command(label="Clear Browser Cache", command=self.clear_metadata_cache)
+        view_menu.add_separator()
+        view_menu.add_command(label="Command Log...", command=self.show_command_log)
 
         # Tools menu
         tools_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Query History...", command=self.show_history)
         tools_menu.add_command(label="Favorites...", command=self.show_favorites)
+        tools_menu.add_command(label="Redis Memory Analysis...", command=self.show_redis_memory)
         tools_menu.add_separator()
         tools_menu.add_command(label="Settings...", command=self.show_settings)
 
@@ -545,6 +1034,8 @@ class DatabaseQueryTool:
         self.mongo_tree.heading('#0', text='Databases & Collections')
         self.mongo_tree.bind('<<TreeviewSelect>>', self.on_mongo_tree_select)
         self.mongo_tree.bind('<Double-1>', self.on_mongo_tree_double_click)
+        self.mongo_tree.bind('<<TreeviewOpen>>', self.on_mongo_tree_open)
+        self.mongo_tree_nodes = {}
 
         # Right panel - Query and Results with tabs
         right_frame = ttk.Frame(paned)
@@ -584,9 +1075,11 @@ class DatabaseQueryTool:
         coll_entry = ttk.Entry(ctrl_frame, width=20)
         coll_entry.grid(row=0, column=3, padx=5)
 
-        ttk.Button(ctrl_frame, text="Schema", command=lambda: self.show_mongo_schema(db_entry, coll_entry, result_text)).grid(row=0, column=4, padx=5)
-        ttk.Button(ctrl_frame, text="Indexes", command=lambda: self.show_mongo_indexes(db_entry, coll_entry, result_text)).grid(row=0, column=5, padx=5)
-        ttk.Button(ctrl_frame, text="Stats", command=lambda: self.show_mongo_stats(db_entry, coll_entry, result_text)).grid(row=0, column=6, padx=5)
+        ttk.Button(ctrl_frame, text="Schema", command=lambda: self.show_mongo_schema(tab_data)).grid(row=0, column=4, padx=5)
+        ttk.Button(ctrl_frame, text="Indexes", command=lambda: self.show_mongo_indexes(tab_data)).grid(row=0, column=5, padx=5)
+        ttk.Button(ctrl_frame, text="Stats", command=lambda: self.show_mongo_stats(tab_data)).grid(row=0, column=6, padx=5)
+        ttk.Button(ctrl_frame, text="Explain", command=lambda: self.explain_mongo_query_tab(tab_data)).grid(row=0, column=7, padx=5)
+        ttk.Button(ctrl_frame, text="Index Advisor", command=lambda: self.show_mongo_index_advice(tab_data)).grid(row=0, column=8, padx=5)
 
         # Query type selector
         query_type_frame = ttk.Frame(tab_frame)
@@ -597,35 +1090,75 @@ class DatabaseQueryTool:
         ttk.Radiobutton(query_type_frame, text="Find", variable=query_type_var, value="find").pack(side='left', padx=5)
         ttk.Radiobutton(query_type_frame, text="Aggregate", variable=query_type_var, value="aggregate").pack(side='left', padx=5)
         ttk.Radiobutton(query_type_frame, text="Count", variable=query_type_var, value="count").pack(side='left', padx=5)
+        ttk.Button(query_type_frame, text="Pipeline Builder...",
+                   command=lambda: self.open_pipeline_builder(tab_data)).pack(side='left', padx=10)
 
         # Query input
         ttk.Label(tab_frame, text="Query (JSON):").pack(anchor='w', padx=5, pady=5)
         query_text = JsonHighlightText(tab_frame, width=60, height=8)
         query_text.insert('1.0', '{}')
         query_text.pack(fill='x', padx=5, pady=5)
-        query_text.bind('<KeyRelease>', lambda e: query_text.highlight())
+        query_text.bind('<KeyRelease>', query_text.on_key_release)
+
+        # Find options
+        find_opt_frame = ttk.Frame(tab_frame)
+        find_opt_frame.pack(fill='x', pady=5)
+
+        ttk.Label(find_opt_frame, text="Projection:").pack(side='left', padx=5)
+        projection_entry = ttk.Entry(find_opt_frame, width=25)
+        projection_entry.pack(side='left', padx=5)
+
+        ttk.Label(find_opt_frame, text="Sort:").pack(side='left', padx=5)
+        sort_entry = ttk.Entry(find_opt_frame, width=20)
+        sort_entry.pack(side='left', padx=5)
+
+        ttk.Label(find_opt_frame, text="Hint:").pack(side='left', padx=5)
+        hint_entry = ttk.Entry(find_opt_frame, width=15)
+        hint_entry.pack(side='left', padx=5)
+
+        ttk.Label(find_opt_frame, text="Collation:").pack(side='left', padx=5)
+        collation_entry = ttk.Entry(find_opt_frame, width=20)
+        collation_entry.pack(side='left', padx=5)
+
+        ttk.Label(find_opt_frame, text="Max Time (ms):").pack(side='left', padx=5)
+        max_time_entry = ttk.Entry(find_opt_frame, width=8)
+        max_time_entry.pack(side='left', padx=5)
 
         # Options
         opt_frame = ttk.Frame(tab_frame)
         opt_frame.pack(fill='x', pady=5)
 
-        ttk.Label(opt_frame, text="Limit:").pack(side='left', padx=5)
-        limit_entry = ttk.Entry(opt_frame, width=10)
-        limit_entry.insert(0, "100")
-        limit_entry.pack(side='left', padx=5)
+        ttk.Label(opt_frame, text="Page Size:").pack(side='left', padx=5)
+        page_size_entry = ttk.Entry(opt_frame, width=8)
+        page_size_entry.insert(0, str(self.config_manager.get_setting('page_size', 100)))
+        page_size_entry.pack(side='left', padx=5)
+
+        ttk.Label(opt_frame, text="Batch Size:").pack(side='left', padx=5)
+        batch_size_entry = ttk.Entry(opt_frame, width=8)
+        batch_size_entry.insert(0, "100")
+        batch_size_entry.pack(side='left', padx=5)
+
+        ttk.Button(opt_frame, text="Execute", command=lambda: self.execute_mongo_query_tab(tab_data)).pack(side='left', padx=10)
+
+        stop_btn = ttk.Button(opt_frame, text="Stop", state='disabled',
+                              command=lambda: self.stop_mongo_query_tab(tab_data))
+        stop_btn.pack(side='left', padx=5)
+
+        prev_btn = ttk.Button(opt_frame, text="◀ Prev", state='disabled', width=7,
+                              command=lambda: self.page_mongo_query_tab(tab_data, -1))
+        prev_btn.pack(side='left', padx=2)
 
-        ttk.Label(opt_frame, text="Skip:").pack(side='left', padx=5)
-        skip_entry = ttk.Entry(opt_frame, width=10)
-        skip_entry.insert(0, "0")
-        skip_entry.pack(side='left', padx=5)
+        page_label = ttk.Label(opt_frame, text="")
+        page_label.pack(side='left', padx=2)
 
-        ttk.Button(opt_frame, text="Execute", command=lambda: self.execute_mongo_query_tab(
-            db_entry, coll_entry, query_text, query_type_var, limit_entry, skip_entry, result_text, time_label
-        )).pack(side='left', padx=10)
+        next_btn = ttk.Button(opt_frame, text="Next ▶", state='disabled', width=7,
+                              command=lambda: self.page_mongo_query_tab(tab_data, 1))
+        next_btn.pack(side='left', padx=2)
 
-        ttk.Button(opt_frame, text="Add to Favorites", command=lambda: self.add_mongo_favorite(
-            db_entry, coll_entry, query_text
-        )).pack(side='left', padx=5)
+        ttk.Button(opt_frame, text="Add to Favorites", command=lambda: self.add_mongo_favorite(tab_data)).pack(side='left', padx=5)
+
+        use_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(opt_frame, text="Use Cache", variable=use_cache_var).pack(side='left', padx=5)
 
         time_label = ttk.Label(opt_frame, text="")
         time_label.pack(side='right', padx=5)
@@ -640,18 +1173,24 @@ class DatabaseQueryTool:
         view_mode_frame = ttk.Frame(result_frame)
         view_mode_frame.pack(fill='x', pady=2)
 
-        view_mode_var = tk.StringVar(value="json")
+        timing_label = ttk.Label(view_mode_frame, text="", foreground='gray')
+        timing_label.pack(side='right', padx=5)
+
+        view_mode_var = tk.StringVar(value="tree")
+        ttk.Radiobutton(view_mode_frame, text="Tree View", variable=view_mode_var, value="tree",
+                       command=lambda: self.switch_result_view(tab_data)).pack(side='left', padx=5)
         ttk.Radiobutton(view_mode_frame, text="JSON View", variable=view_mode_var, value="json",
-                       command=lambda: self.switch_result_view(result_text, table_frame, view_mode_var)).pack(side='left', padx=5)
+                       command=lambda: self.switch_result_view(tab_data)).pack(side='left', padx=5)
         ttk.Radiobutton(view_mode_frame, text="Table View", variable=view_mode_var, value="table",
-                       command=lambda: self.switch_result_view(result_text, table_frame, view_mode_var)).pack(side='left', padx=5)
+                       command=lambda: self.switch_result_view(tab_data)).pack(side='left', padx=5)
 
-        # JSON result view
-        result_text = JsonHighlightText(result_frame, width=80, height=20)
-        result_text.pack(fill='both', expand=True)
+        # Tree result view
+        tree_view = DocumentTreeView(result_frame)
+        tree_view.pack(fill='both', expand=True)
 
-        # Table view (hidden by default)
-        table_frame = ttk.Frame(result_frame)
+        # JSON and table views (hidden by default)
+        result_text = JsonHighlightText(result_frame, width=80, height=20)
+        table_frame = VirtualTableView(result_frame)
 
         # Store references
         tab_data = {
@@ -660,12 +1199,29 @@ class DatabaseQueryTool:
             'coll_entry': coll_entry,
             'query_text': query_text,
             'query_type_var': query_type_var,
-            'limit_entry': limit_entry,
-            'skip_entry': skip_entry,
+            'page_size_entry': page_size_entry,
+            'use_cache_var': use_cache_var,
+            'batch_size_entry': batch_size_entry,
+            'projection_entry': projection_entry,
+            'sort_entry': sort_entry,
+            'hint_entry': hint_entry,
+            'collation_entry': collation_entry,
+            'max_time_entry': max_time_entry,
             'result_text': result_text,
             'time_label': time_label,
+            'timing_label': timing_label,
+            'timings': None,
+            'stop_btn': stop_btn,
+            'prev_btn': prev_btn,
+            'next_btn': next_btn,
+            'page_label': page_label,
+            'pager': None,
+            'comment': None,
             'view_mode_var': view_mode_var,
-            'table_frame': table_frame
+            'tree_view': tree_view,
+            'table_frame': table_frame,
+            'results': None,
+            'rendered_views': set()
         }
 
         self.mongo_query_tabs.append(tab_data)
@@ -682,91 +1238,416 @@ class DatabaseQueryTool:
         current_tab = self.mongo_query_notebook.select()
         current_index = self.mongo_query_notebook.index(current_tab)
 
+        closed_tab = self.mongo_query_tabs[current_index]
+        self.query_executor.cancel(closed_tab['frame'])
+        if closed_tab['pager']:
+            closed_tab['pager'].close()
+
         self.mongo_query_notebook.forget(current_tab)
         del self.mongo_query_tabs[current_index]
 
-    def switch_result_view(self, result_text, table_frame, view_mode_var):
-        """Switch between JSON and Table view"""
-        mode = view_mode_var.get()
+    def switch_result_view(self, tab):
+        """Switch between Tree, JSON and Table view"""
+        mode = tab['view_mode_var'].get()
+        views = {'tree': tab['tree_view'], 'json': tab['result_text'], 'table': tab['table_frame']}
+
+        for name, widget in views.items():
+            if name != mode:
+                widget.pack_forget()
+        views[mode].pack(fill='both', expand=True)
+
+        self.render_result_view(tab)
+
+    def render_result_view(self, tab, timings=None):
+        """Render the tab's results into the selected view if it is out of date"""
+        mode = tab['view_mode_var'].get()
+        if mode in tab['rendered_views']:
+            return
+        results = tab['results'] or []
 
-        if mode == "json":
-            table_frame.pack_forget()
-            result_text.pack(fill='both', expand=True)
+        if mode == 'tree':
+            tab['tree_view'].set_documents(results)
+        elif mode == 'json':
+            self.render_json_view(tab, results, timings)
         else:
-            result_text.pack_forget()
-            table_frame.pack(fill='both', expand=True)
+            start = time.perf_counter()
+            buffer = ColumnarResultBuffer.from_documents(results)
+            if timings:
+                timings.add('decode', time.perf_counter() - start)
+            tab['table_frame'].set_buffer(buffer)
+
+        tab['rendered_views'].add(mode)
+
+    def render_json_view(self, tab, results, timings=None):
+        """Serialize results to Extended JSON on the executor, then fill the JSON view"""
+        result_text = tab['result_text']
+        result_text.delete('1.0', 'end')
+        result_text.insert('1.0', "Formatting results...")
+
+        def serialize(job):
+            start = time.perf_counter()
+            result_json = self.result_serializer.serialize(results)
+            if timings:
+                timings.add('serialize', time.perf_counter() - start)
+            return result_json
+
+        def on_done(result_json):
+            if tab['results'] is not results:
+                return
+            start = time.perf_counter()
+            result_text.delete('1.0', 'end')
+            result_text.insert('1.0', result_json)
+            result_text.highlight()
+            if timings and tab['timings'] is timings:
+                timings.add('render', time.perf_counter() - start)
+                tab['timing_label'].config(text=timings.summary())
+
+        def on_error(error):
+            tab['rendered_views'].discard('json')
+            result_text.delete('1.0', 'end')
+            result_text.insert('1.0', f"Error: {str(error)}")
+
+        def on_cancel():
+            tab['rendered_views'].discard('json')
 
-    def execute_mongo_query_tab(self, db_entry, coll_entry, query_text, query_type_var,
-                                limit_entry, skip_entry, result_text, time_label):
-        """Execute MongoDB query from tab"""
+        self.query_executor.submit((tab['frame'], 'json'), serialize, on_done, on_error, on_cancel)
+
+    def show_text_result(self, tab, text):
+        """Show a text report (schema, indexes, stats) in the tab's JSON view"""
+        tab['results'] = None
+        tab['rendered_views'] = {'json'}
+        tab['view_mode_var'].set('json')
+        self.switch_result_view(tab)
+
+        result_text = tab['result_text']
+        result_text.delete('1.0', 'end')
+        result_text.insert('1.0', text)
+        result_text.highlight()
+
+    def execute_mongo_query_tab(self, tab):
+        """Execute MongoDB query from tab on the background executor"""
         if not self.mongo_client:
             messagebox.showerror("Error", "Please connect to MongoDB first!")
             return
 
-        database = db_entry.get().strip()
-        collection = coll_entry.get().strip()
-        query_str = query_text.get('1.0', 'end-1c')
-        query_type = query_type_var.get()
+        database = tab['db_entry'].get().strip()
+        collection = tab['coll_entry'].get().strip()
+        query_str = tab['query_text'].get('1.0', 'end-1c')
+        query_type = tab['query_type_var'].get()
 
         if not database or not collection:
             messagebox.showerror("Error", "Please specify database and collection!")
             return
 
         try:
-            limit = int(limit_entry.get())
-            skip = int(skip_entry.get())
+            page_size = int(tab['page_size_entry'].get())
         except ValueError:
-            messagebox.showerror("Error", "Limit and Skip must be numbers")
+            messagebox.showerror("Error", "Page Size must be a number")
             return
 
         try:
             query = json.loads(query_str)
+        except json.JSONDecodeError as e:
+            messagebox.showerror("JSON Error", f"Invalid JSON query:\n{str(e)}")
+            return
 
-            db = self.mongo_client[database]
-            coll = db[collection]
+        try:
+            options = self.get_mongo_tab_options(tab)
+        except ValueError as e:
+            messagebox.showerror("Options Error", str(e))
+            return
 
-            start_time = time.time()
+        coll = self.mongo_client[database][collection].with_options(codec_options=RAW_CODEC_OPTIONS)
+
+        # Drop the previous result cursor of this tab
+        self.query_executor.cancel(tab['frame'])
+        if tab['pager']:
+            tab['pager'].close()
+            tab['pager'] = None
+
+        use_cache = tab['use_cache_var'].get()
+        cacheable = not (query_type == "aggregate" and any(
+            isinstance(stage, dict) and ('$out' in stage or '$merge' in stage)
+            for stage in (query if isinstance(query, list) else [query])
+        ))
+        cache_key = ResultCache.make_key(self.mongo_cache_profile, database, collection, query_type,
+                                         query, options, page_size if query_type == "find" else 0)
+
+        # Set here rather than on submit: a cache hit submits nothing, yet later pages use this comment
+        comment = make_comment()
+        tab['comment'] = comment
+        if query_type == "find":
+            find_kwargs = {'comment': comment}
+            for name in ('hint', 'collation'):
+                if name in options:
+                    find_kwargs[name] = options[name]
+            if 'max_time_ms' in options:
+                find_kwargs['max_time_ms'] = options['max_time_ms']
+
+            pager = KeysetPager(coll, query,
+                                sort=list(options.get('sort', {}).items()),
+                                projection=options.get('projection'),
+                                page_size=page_size, batch_size=options['batch_size'],
+                                find_kwargs=find_kwargs)
+            tab['pager'] = pager
+            work = pager.first_page
+        else:
+            pager = None
+            work = lambda job: self.run_mongo_query(job, coll, query_type, query, options)
+
+        cached = self.result_cache.get(cache_key) if use_cache and cacheable else None
+        if cached:
+            (results, has_next), age = cached
+            if pager:
+                pager.prime(results, has_next)
+            self.show_mongo_query_results(tab, results, 0, cache_age=age)
+            return
 
-            if query_type == "find":
-                results = list(coll.find(query).skip(skip).limit(limit))
-            elif query_type == "aggregate":
-                if isinstance(query, list):
-                    pipeline = query
-                else:
-                    pipeline = [query]
-                results = list(coll.aggregate(pipeline))
-            elif query_type == "count":
-                count = coll.count_documents(query)
-                results = [{"count": count}]
+        # Watch the collection before the query runs, so no change can slip in between
+        cache_token = self.result_cache.begin(self.mongo_client, database, collection) if cacheable else None
+
+        def on_success(results, execution_time):
+            if cacheable:
+                has_next = pager.has_next if pager else False
+                self.result_cache.put(cache_key, (results, has_next), results, cache_token)
+
+            # Add to history
+            self.config_manager.add_to_history(
+                'mongo', query_str, database, collection, execution_time, options,
+                timings=tab['timings'].as_dict() if tab['timings'] else None
+            )
+
+        self.submit_mongo_tab_job(tab, work, comment, on_success)
+        self.status_bar.config(text=f"Running query on {database}.{collection}...")
+
+    def get_mongo_tab_options(self, tab):
+        """Read the query option fields of tab; raises ValueError on bad input"""
+        options = {}
+
+        for name in ('projection', 'sort', 'collation'):
+            text = tab[f'{name}_entry'].get().strip()
+            if text:
+                try:
+                    value = json.loads(text)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON in {name.title()}:\n{str(e)}")
+                if not isinstance(value, dict):
+                    raise ValueError(f"{name.title()} must be a JSON object")
+                options[name] = value
+
+        hint = tab['hint_entry'].get().strip()
+        if hint:
+            # Either an index name or a key pattern such as {"a": 1}
+            if hint.startswith('{'):
+                try:
+                    options['hint'] = json.loads(hint)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON in Hint:\n{str(e)}")
             else:
-                results = []
+                options['hint'] = hint
 
-            execution_time = time.time() - start_time
+        try:
+            options['batch_size'] = int(tab['batch_size_entry'].get())
+            max_time = tab['max_time_entry'].get().strip()
+            if max_time:
+                options['max_time_ms'] = int(max_time)
+        except ValueError:
+            raise ValueError("Batch Size and Max Time must be numbers")
 
-            # Convert ObjectId to string
-            for doc in results:
-                if '_id' in doc:
-                    doc['_id'] = str(doc['_id'])
+        return options
 
-            result_text.delete('1.0', 'end')
-            result_json = json.dumps(results, indent=2, ensure_ascii=False)
-            result_text.insert('1.0', result_json)
-            result_text.highlight()
+    def set_mongo_tab_options(self, tab, options):
+        """Fill the query option fields of tab from a saved options dict"""
+        options = options or {}
 
-            time_label.config(text=f"Time: {execution_time:.3f}s | Results: {len(results)}")
+        for name in ('projection', 'sort', 'collation', 'hint'):
+            value = options.get(name, '')
+            if isinstance(value, dict):
+                value = json.dumps(value, ensure_ascii=False)
+            tab[f'{name}_entry'].delete(0, 'end')
+            tab[f'{name}_entry'].insert(0, value)
 
-            # Add to history
-            self.config_manager.add_to_history(
-                'mongo', query_str, database, collection, execution_time
-            )
+        tab['batch_size_entry'].delete(0, 'end')
+        tab['batch_size_entry'].insert(0, str(options.get('batch_size', 100)))
+        tab['max_time_entry'].delete(0, 'end')
+        tab['max_time_entry'].insert(0, str(options.get('max_time_ms', '')))
 
-            self.status_bar.config(text=f"Query executed successfully: {len(results)} documents in {execution_time:.3f}s")
+    def explain_mongo_query_tab(self, tab):
+        """Run explain (executionStats) for the tab's query and show the plan"""
+        if not self.mongo_client:
+            messagebox.showerror("Error", "Please connect to MongoDB first!")
+            return
+
+        database = tab['db_entry'].get().strip()
+        collection = tab['coll_entry'].get().strip()
+        query_type = tab['query_type_var'].get()
+
+        if not database or not collection:
+            messagebox.showerror("Error", "Please specify database and collection!")
+            return
 
+        try:
+            query = json.loads(tab['query_text'].get('1.0', 'end-1c'))
+            options = self.get_mongo_tab_options(tab)
+            page_size = int(tab['page_size_entry'].get())
         except json.JSONDecodeError as e:
             messagebox.showerror("JSON Error", f"Invalid JSON query:\n{str(e)}")
-        except Exception as e:
-            messagebox.showerror("Query Error", f"Failed to execute query:\n{str(e)}")
-            time_label.config(text="Error")
+            return
+        except ValueError as e:
+            messagebox.showerror("Options Error", str(e))
+            return
+
+        db = self.mongo_client[database]
+        title = f"{database}.{collection} ({query_type})"
+
+        def on_done(explain):
+            self.status_bar.config(text="Explain finished")
+            ExplainPlanDialog(self.root, title, explain)
+
+        def on_error(error):
+            messagebox.showerror("Explain Error", f"Failed to explain query:\n{str(error)}")
+
+        self.query_executor.submit(
+            (tab['frame'], 'explain'),
+            lambda job: run_explain(db, collection, query_type, query, options,
+                                    limit=page_size if query_type == 'find' else 0,
+                                    comment=job.comment),
+            on_done, on_error, mongo_client=self.mongo_client
+        )
+        self.status_bar.config(text=f"Explaining query on {database}.{collection}...")
+
+    def page_mongo_query_tab(self, tab, step):
+        """Load the next (step=1) or previous (step=-1) page of a find result"""
+        pager = tab['pager']
+        if not pager or self.query_executor.is_running(tab['frame']):
+            return
+
+        work = pager.next_page if step > 0 else pager.prev_page
+        self.submit_mongo_tab_job(tab, work, tab['comment'])
+
+    def submit_mongo_tab_job(self, tab, work, comment, on_success=None):
+        """Run work(job) for tab on the executor and render its results when done"""
+        start_time = time.time()
+        timings = QueryTimings()
+
+        def timed_work(job):
+            job.timings = timings
+            results = work(job)
+            timings.set_server(*self.command_timer.take(comment))
+            return results
+
+        def on_done(results):
+            execution_time = time.time() - start_time
+            tab['timings'] = timings
+            self.show_mongo_query_results(tab, results, execution_time)
+            if on_success:
+                on_success(results, execution_time)
+
+        def on_error(error):
+            self.command_timer.take(comment)
+            self.finish_mongo_query_tab(tab)
+            messagebox.showerror("Query Error", f"Failed to execute query:\n{str(error)}")
+            tab['time_label'].config(text="Error")
+
+        def on_cancel():
+            self.command_timer.take(comment)
+            if self.query_executor.is_running(tab['frame']):
+                return
+            self.finish_mongo_query_tab(tab)
+            tab['time_label'].config(text="Cancelled")
+            self.status_bar.config(text="Query cancelled")
+
+        tab['comment'] = comment
+        self.query_executor.submit(
+            tab['frame'], timed_work, on_done, on_error, on_cancel,
+            mongo_client=self.mongo_client, comment=comment
+        )
+
+        tab['stop_btn'].config(state='normal')
+        tab['prev_btn'].config(state='disabled')
+        tab['next_btn'].config(state='disabled')
+        tab['time_label'].config(text="Running...")
+
+    def run_mongo_query(self, job, coll, query_type, query, options):
+        """Worker side of an aggregate/count execution; never touches Tk widgets"""
+        kwargs = {'comment': job.comment}
+        for name in ('hint', 'collation'):
+            if name in options:
+                kwargs[name] = options[name]
+        if 'max_time_ms' in options:
+            kwargs['maxTimeMS'] = options['max_time_ms']
+
+        if query_type == "aggregate":
+            pipeline = query if isinstance(query, list) else [query]
+            cursor = job.attach_cursor(coll.aggregate(pipeline, batchSize=options['batch_size'], **kwargs))
+        elif query_type == "count":
+            start = time.perf_counter()
+            count = coll.count_documents(query, **kwargs)
+            if job.timings:
+                job.timings.add('first_batch', time.perf_counter() - start)
+            return [{"count": count}]
+        else:
+            return []
+
+        results = []
+        try:
+            while True:
+                job.check_cancelled()
+                try:
+                    results.append(job.timings.next_document(cursor) if job.timings else next(cursor))
+                except StopIteration:
+                    break
+        except QueryCancelled:
+            raise
+        except Exception:
+            if job.cancelled:
+                raise QueryCancelled()
+            raise
+        return results
+
+    def stop_mongo_query_tab(self, tab):
+        """Stop the query running in tab"""
+        if self.query_executor.cancel(tab['frame']):
+            tab['time_label'].config(text="Stopping...")
+
+    def finish_mongo_query_tab(self, tab):
+        """Reset tab controls after a query finished, failed or was stopped"""
+        tab['stop_btn'].config(state='disabled')
+
+        pager = tab['pager']
+        if pager and pager.page >= 0:
+            tab['page_label'].config(text=f"Page {pager.page + 1}")
+            tab['prev_btn'].config(state='normal' if pager.has_prev else 'disabled')
+            tab['next_btn'].config(state='normal' if pager.has_next else 'disabled')
+        else:
+            tab['page_label'].config(text="")
+
+    def show_mongo_query_results(self, tab, results, execution_time, cache_age=None):
+        """Render query results into tab"""
+        self.finish_mongo_query_tab(tab)
+
+        self.query_executor.cancel((tab['frame'], 'json'))
+        tab['results'] = results
+        tab['rendered_views'] = set()
+        if cache_age is not None:
+            tab['timings'] = None
+
+        start = time.perf_counter()
+        self.render_result_view(tab, tab['timings'])
+        if tab['timings']:
+            # Reading the documents into the table is already counted as decode
+            decode = (tab['timings'].ms['decode'] or 0.0) / 1000
+            tab['timings'].add('render', time.perf_counter() - start - decode)
+            tab['timing_label'].config(text=tab['timings'].summary())
+        else:
+            tab['timing_label'].config(text="")
+
+        if cache_age is not None:
+            tab['time_label'].config(text=f"Cache hit ({cache_age:.0f}s old) | Results: {len(results)}")
+            self.status_bar.config(text=f"Served {len(results)} documents from the result cache")
+        else:
+            tab['time_label'].config(text=f"Time: {execution_time:.3f}s | Results: {len(results)}")
+            self.status_bar.config(text=f"Query executed successfully: {len(results)} documents in {execution_time:.3f}s")
 
     def setup_redis_tab(self):
         # Connection Frame
@@ -831,21 +1712,60 @@ class DatabaseQueryTool:
         self.redis_pattern.insert(0, "*")
         self.redis_pattern.pack(side='left', padx=5)
 
+        ttk.Label(search_frame, text="Type:").pack(side='left', padx=2)
+        self.redis_type_filter = ttk.Combobox(search_frame, width=7, state='readonly', values=('',) + KEY_TYPES)
+        self.redis_type_filter.pack(side='left', padx=2)
+
+        ttk.Label(search_frame, text="Delimiter:").pack(side='left', padx=2)
+        self.redis_delimiter = ttk.Entry(search_frame, width=3)
+        self.redis_delimiter.insert(0, self.config_manager.get_setting('redis_delimiter', ':'))
+        self.redis_delimiter.pack(side='left', padx=2)
+
         ttk.Button(search_frame, text="Search", command=self.refresh_redis_tree, width=8).pack(side='left', padx=2)
 
+        # SCAN paging controls
+        scan_frame = ttk.Frame(left_frame)
+        scan_frame.pack(side='bottom', fill='x', pady=5)
+
+        self.redis_scan_label = ttk.Label(scan_frame, text="", foreground='gray')
+        self.redis_scan_label.pack(side='left', padx=5)
+        self.redis_stop_scan_btn = ttk.Button(scan_frame, text="Stop", command=self.stop_redis_scan, state='disabled')
+        self.redis_stop_scan_btn.pack(side='right', padx=2)
+        self.redis_load_more_btn = ttk.Button(scan_frame, text="Load More", command=self.load_more_redis_keys,
+                                              state='disabled')
+        self.redis_load_more_btn.pack(side='right', padx=2)
+
         tree_scroll = ttk.Scrollbar(left_frame)
         tree_scroll.pack(side='right', fill='y')
 
-        self.redis_tree = ttk.Treeview(left_frame, yscrollcommand=tree_scroll.set, selectmode='browse',
-                                        columns=('type',), show='tree headings')
+        def on_tree_scroll(first, last):
+            tree_scroll.set(first, last)
+            # Scrolled to the bottom of a list longer than the view: fetch the next page
+            if float(first) > 0 and float(last) >= 0.999:
+                self.load_more_redis_keys()
+
+        self.redis_tree = ttk.Treeview(left_frame, yscrollcommand=on_tree_scroll, selectmode='browse',
+                                        columns=('type', 'ttl', 'memory', 'encoding'), show='tree headings')
         self.redis_tree.pack(side='left', fill='both', expand=True)
         tree_scroll.config(command=self.redis_tree.yview)
 
-        self.redis_tree.heading('#0', text='Key')
-        self.redis_tree.heading('type', text='Type')
-        self.redis_tree.column('type', width=80)
+        self.redis_tree_headings = {'#0': 'Key', 'type': 'Type', 'ttl': 'TTL', 'memory': 'Memory',
+                                    'encoding': 'Encoding'}
+        for column, label in self.redis_tree_headings.items():
+            self.redis_tree.heading(column, text=label, command=lambda c=column: self.sort_redis_tree(c))
+        self.redis_tree.column('ttl', width=70)
+        self.redis_tree.column('memory', width=70)
+        self.redis_tree.column('encoding', width=80)
+        self.redis_tree.column('type', width=110)
         self.redis_tree.bind('<<TreeviewSelect>>', self.on_redis_tree_select)
+        self.redis_tree.bind('<<TreeviewOpen>>', self.on_redis_tree_open)
         self.redis_tree.bind('<Double-1>', self.on_redis_tree_double_click)
+        self.redis_tree_view = None
+        self.redis_scan = None
+        self.redis_sort = None
+        self.redis_sort_job = None
+        self.redis_render_job = None
+        self.reset_redis_tree(self.redis_delimiter.get())
 
         # Right panel - Commands and Results
         right_frame = ttk.Frame(paned)
@@ -881,7 +1801,7 @@ class DatabaseQueryTool:
 
         ttk.Label(cmd_frame, text="Custom Command (JSON array):").pack(anchor='w', padx=5, pady=5)
         self.redis_custom = scrolledtext.ScrolledText(cmd_frame, width=60, height=3)
-        self.redis_custom.insert('1.0', '["KEYS", "*"]')
+        self.redis_custom.insert('1.0', '["SCAN", "0", "MATCH", "*", "COUNT", "100"]')
         self.redis_custom.pack(fill='x', padx=5, pady=5)
         self.redis_custom.config(state='disabled')
 
@@ -890,16 +1810,52 @@ class DatabaseQueryTool:
 
         ttk.Button(exec_frame, text="Execute", command=self.execute_redis_command).pack(side='left', padx=5)
         ttk.Button(exec_frame, text="Add to Favorites", command=self.add_redis_favorite).pack(side='left', padx=5)
+        self.redis_more_keys_btn = ttk.Button(exec_frame, text="More Keys", command=self.more_command_keys,
+                                              state='disabled')
+        self.redis_more_keys_btn.pack(side='left', padx=5)
+        self.redis_command_scan = None
 
         self.redis_time_label = ttk.Label(exec_frame, text="")
         self.redis_time_label.pack(side='right', padx=5)
 
         ttk.Label(cmd_frame, text="Results:").pack(anchor='w', padx=5, pady=5)
+
+        # Paging through the elements of the selected key's value
+        value_frame = ttk.Frame(cmd_frame)
+        value_frame.pack(fill='x', padx=5)
+        self.redis_value_prev_btn = ttk.Button(value_frame, text="◀ Prev", width=7, state='disabled',
+                                               command=lambda: self.page_redis_value(-1))
+        self.redis_value_prev_btn.pack(side='left', padx=2)
+        self.redis_value_next_btn = ttk.Button(value_frame, text="Next ▶", width=7, state='disabled',
+                                               command=lambda: self.page_redis_value(1))
+        self.redis_value_next_btn.pack(side='left', padx=2)
+        self.redis_value_all_btn = ttk.Button(value_frame, text="Load All", state='disabled',
+                                              command=self.load_all_redis_value)
+        self.redis_value_all_btn.pack(side='left', padx=2)
+        self.redis_value_label = ttk.Label(value_frame, text="")
+        self.redis_value_label.pack(side='left', padx=5)
+
+        self.redis_score_max = ttk.Entry(value_frame, width=7)
+        self.redis_score_max.insert(0, "+inf")
+        self.redis_score_max.pack(side='right', padx=2)
+        ttk.Label(value_frame, text="to").pack(side='right')
+        self.redis_score_min = ttk.Entry(value_frame, width=7)
+        self.redis_score_min.insert(0, "-inf")
+        self.redis_score_min.pack(side='right', padx=2)
+        ttk.Label(value_frame, text="Score:").pack(side='right', padx=2)
+        self.redis_value_match = ttk.Entry(value_frame, width=10)
+        self.redis_value_match.pack(side='right', padx=2)
+        ttk.Label(value_frame, text="Filter:").pack(side='right', padx=2)
+        for entry in (self.redis_value_match, self.redis_score_min, self.redis_score_max):
+            entry.bind('<Return>', lambda e: self.open_redis_value(self.redis_pager.key) if self.redis_pager else None)
+        self.redis_pager = None
+
         self.redis_result = JsonHighlightText(cmd_frame, width=80, height=15)
         self.redis_result.pack(fill='both', expand=True, padx=5, pady=5)
 
     # MongoDB Methods
     def connect_mongo(self):
+        profile_key = None
         try:
             host = self.mongo_host.get()
             port = int(self.mongo_port.get())
@@ -911,47 +1867,161 @@ class DatabaseQueryTool:
             else:
                 uri = f"mongodb://{host}:{port}/"
 
-            self.mongo_client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+            profile_key = f"{username}@{host}:{port}"
+            self.mongo_client = self.client_registry.mongo_client(
+                profile_key, uri, self.selected_profile('mongo', host, port)
+            )
             self.mongo_client.admin.command('ping')
 
+            self.result_cache.clear()
+            self.mongo_cache_profile = profile_key
+
             self.mongo_status.config(text="Status: Connected", foreground="green")
             self.status_bar.config(text="Connected to MongoDB")
             messagebox.showinfo("Success", "Successfully connected to MongoDB!")
             self.refresh_mongo_tree()
         except Exception as e:
+            if profile_key:
+                self.client_registry.discard('mongo', profile_key)
+            self.mongo_client = None
             self.mongo_status.config(text="Status: Connection Failed", foreground="red")
             messagebox.showerror("Connection Error", f"Failed to connect to MongoDB:\n{str(e)}")
 
     def refresh_mongo_tree(self):
+        """Draw the cached database tree, then reconcile it with the server in the background.
+
+        Collections are listed when a database is first expanded; databases
+        whose collections were cached are re-listed right away.
+        """
         if not self.mongo_client:
             messagebox.showerror("Error", "Please connect to MongoDB first!")
             return
 
-        try:
-            for item in self.mongo_tree.get_children():
-                self.mongo_tree.delete(item)
+        for key in list(self.metadata_executor.jobs):
+            if key[0] in ('mongo_tree', 'mongo_db'):
+                self.metadata_executor.cancel(key)
+        self.mongo_tree.delete(*self.mongo_tree.get_children())
+        self.mongo_tree_nodes = {}
+        client = self.mongo_client
+        profile = self.mongo_cache_profile
+
+        cached = self.metadata_cache.load_mongo(profile)
+        for db_name, collections in cached.items():
+            self.insert_mongo_db_node(db_name)
+            if collections is not None:
+                self.fill_mongo_db_node(db_name, collections)
+                self.update_mongo_counts(db_name, {info['name']: info['count'] for info in collections})
+
+        def on_done(db_list):
+            self.metadata_cache.save_mongo_databases(profile, db_list)
+            removed = [db_name for db_name in self.mongo_tree_nodes if db_name not in db_list]
+            for db_name in removed:
+                self.mongo_tree.delete(self.mongo_tree_nodes.pop(db_name)['node'])
+
+            added = 0
+            for index, db_name in enumerate(db_list):
+                if db_name not in self.mongo_tree_nodes:
+                    self.insert_mongo_db_node(db_name, index)
+                    added += 1
+                elif cached.get(db_name) is not None:
+                    self.load_mongo_database(db_name)
+
+            if cached:
+                self.status_bar.config(
+                    text=f"Loaded {len(db_list)} databases ({added} new, {len(removed)} removed since last visit)"
+                )
+            else:
+                self.status_bar.config(text=f"Loaded {len(db_list)} databases")
 
-            db_list = self.mongo_client.list_database_names()
+        def on_error(error):
+            messagebox.showerror("Error", f"Failed to refresh database list:\n{str(error)}")
 
-            for db_name in db_list:
-                db_node = self.mongo_tree.insert('', 'end', text=f"📁 {db_name}", tags=('database',))
+        self.metadata_executor.submit(
+            ('mongo_tree',), lambda job: self.mongo_metadata.list_databases(client, job),
+            on_done, on_error, mongo_client=client
+        )
+        if cached:
+            self.status_bar.config(text=f"Showing {len(cached)} cached databases, refreshing...")
+        else:
+            self.status_bar.config(text="Loading databases...")
 
-                db = self.mongo_client[db_name]
-                collections = db.list_collection_names()
+    def insert_mongo_db_node(self, db_name, index='end'):
+        node = self.mongo_tree.insert('', index, text=f"📁 {db_name}", values=(db_name,), tags=('database',))
+        # Placeholder child so the node shows as expandable before its collections are listed
+        self.mongo_tree.insert(node, 'end', text="Loading...", tags=('placeholder',))
+        self.mongo_tree_nodes[db_name] = {'node': node, 'loaded': False, 'collections': {}}
 
-                for coll_name in collections:
-                    try:
-                        stats = db.command("collStats", coll_name)
-                        count = stats.get('count', 0)
-                        self.mongo_tree.insert(db_node, 'end', text=f"📄 {coll_name} ({count} docs)",
-                                               values=(db_name, coll_name), tags=('collection',))
-                    except:
-                        self.mongo_tree.insert(db_node, 'end', text=f"📄 {coll_name}",
-                                               values=(db_name, coll_name), tags=('collection',))
+    def on_mongo_tree_open(self, event):
+        node = self.mongo_tree.focus()
+        if 'database' not in self.mongo_tree.item(node, 'tags'):
+            return
+        db_name = self.mongo_tree.item(node, 'values')[0]
+        entry = self.mongo_tree_nodes.get(db_name)
+        if entry and not entry['loaded']:
+            self.load_mongo_database(db_name)
+
+    def load_mongo_database(self, db_name):
+        """List a database's collections, then fill in document counts as they arrive"""
+        entry = self.mongo_tree_nodes[db_name]
+        entry['loaded'] = True
+        client = self.mongo_client
+        profile = self.mongo_cache_profile
+
+        def on_progress(update):
+            if 'collections' in update:
+                self.fill_mongo_db_node(db_name, update['collections'])
+            if 'counts' in update:
+                self.update_mongo_counts(db_name, update['counts'])
+
+        def on_done(result):
+            self.update_mongo_counts(db_name, result['counts'])
+            self.metadata_cache.save_mongo_collections(profile, db_name, result['collections'], result['counts'])
+            self.status_bar.config(text=f"Loaded {len(result['collections'])} collections from {db_name}")
+
+        def on_error(error):
+            entry['loaded'] = False
+            messagebox.showerror("Error", f"Failed to load collections of {db_name}:\n{str(error)}")
+
+        self.metadata_executor.submit(
+            ('mongo_db', db_name), lambda job: self.mongo_metadata.load_database(client, db_name, job),
+            on_done, on_error, mongo_client=client, on_progress=on_progress
+        )
 
-            self.status_bar.config(text=f"Loaded {len(db_list)} databases")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to refresh database list:\n{str(e)}")
+    def fill_mongo_db_node(self, db_name, collections):
+        """Bring a database node's children in line with collections, keeping unchanged rows"""
+        entry = self.mongo_tree_nodes.get(db_name)
+        if entry is None:
+            return
+        node = entry['node']
+        existing = entry['collections']
+        names = {info['name'] for info in collections}
+
+        for coll_name in [name for name in existing if name not in names]:
+            self.mongo_tree.delete(existing.pop(coll_name))
+        keep = set(existing.values())
+        for child in self.mongo_tree.get_children(node):
+            if child not in keep:
+                self.mongo_tree.delete(child)
+
+        for index, info in enumerate(collections):
+            coll_name = info['name']
+            if coll_name in existing:
+                self.mongo_tree.move(existing[coll_name], node, index)
+                continue
+            text = f"📄 {coll_name}" if info['type'] == 'collection' else f"📄 {coll_name} ({info['type']})"
+            existing[coll_name] = self.mongo_tree.insert(
+                node, index, text=text, values=(db_name, coll_name), tags=('collection',)
+            )
+        self.mongo_tree.item(node, text=f"📁 {db_name} ({len(collections)} collections)")
+
+    def update_mongo_counts(self, db_name, counts):
+        entry = self.mongo_tree_nodes.get(db_name)
+        if entry is None:
+            return
+        for coll_name, count in counts.items():
+            item = entry['collections'].get(coll_name)
+            if item is not None and count is not None and self.mongo_tree.exists(item):
+                self.mongo_tree.item(item, text=f"📄 {coll_name} ({count} docs)")
 
     def on_mongo_tree_select(self, event):
         selected = self.mongo_tree.selection()
@@ -999,77 +2069,75 @@ class DatabaseQueryTool:
                     current_tab['query_text'].delete('1.0', 'end')
                     current_tab['query_text'].insert('1.0', '{}')
 
-                    self.execute_mongo_query_tab(
-                        current_tab['db_entry'],
-                        current_tab['coll_entry'],
-                        current_tab['query_text'],
-                        current_tab['query_type_var'],
-                        current_tab['limit_entry'],
-                        current_tab['skip_entry'],
-                        current_tab['result_text'],
-                        current_tab['time_label']
-                    )
-
-    def show_mongo_schema(self, db_entry, coll_entry, result_text):
-        """Show collection schema"""
+                    self.execute_mongo_query_tab(current_tab)
+
+    def show_mongo_schema(self, tab):
+        """Infer the collection schema from a random sample, streaming partial results"""
         if not self.mongo_client:
             messagebox.showerror("Error", "Please connect to MongoDB first!")
             return
 
-        database = db_entry.get().strip()
-        collection = coll_entry.get().strip()
+        database = tab['db_entry'].get().strip()
+        collection = tab['coll_entry'].get().strip()
 
         if not database or not collection:
             messagebox.showerror("Error", "Please select a database and collection!")
             return
 
-        try:
-            db = self.mongo_client[database]
-            coll = db[collection]
+        sample_size = simpledialog.askinteger(
+            "Analyze Schema", "Number of documents to sample:",
+            initialvalue=self.config_manager.get_setting('schema_sample_size', 1000),
+            minvalue=1, maxvalue=1000000
+        )
+        if not sample_size:
+            return
 
-            sample_docs = list(coll.find().limit(100))
+        coll = self.mongo_client[database][collection]
+        start_time = time.time()
 
-            if not sample_docs:
-                messagebox.showinfo("Schema Info", "Collection is empty")
-                return
+        def on_progress(report):
+            self.show_text_result(tab, to_extended_json(report))
+            tab['time_label'].config(
+                text=f"Sampling... {report['sampled_documents']}/{sample_size}"
+            )
 
-            schema = {}
-            for doc in sample_docs:
-                for key, value in doc.items():
-                    value_type = type(value).__name__
-                    if key not in schema:
-                        schema[key] = set()
-                    schema[key].add(value_type)
-
-            schema_report = {
-                "database": database,
-                "collection": collection,
-                "document_count": coll.count_documents({}),
-                "sample_size": len(sample_docs),
-                "fields": {key: list(types) for key, types in schema.items()}
-            }
-
-            sample_doc = sample_docs[0].copy()
-            if '_id' in sample_doc:
-                sample_doc['_id'] = str(sample_doc['_id'])
-            schema_report["sample_document"] = sample_doc
-
-            result_json = json.dumps(schema_report, indent=2, ensure_ascii=False)
-            result_text.delete('1.0', 'end')
-            result_text.insert('1.0', result_json)
-            result_text.highlight()
+        def on_done(report):
+            self.finish_mongo_query_tab(tab)
+            self.show_text_result(tab, to_extended_json(report))
+            tab['time_label'].config(
+                text=f"Time: {time.time() - start_time:.3f}s | Sampled: {report['sampled_documents']}"
+            )
+            self.status_bar.config(text=f"Schema analyzed: {len(report['fields'])} paths")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to analyze schema:\n{str(e)}")
+        def on_error(error):
+            self.finish_mongo_query_tab(tab)
+            tab['time_label'].config(text="Error")
+            messagebox.showerror("Error", f"Failed to analyze schema:\n{str(error)}")
+
+        def on_cancel():
+            if self.query_executor.is_running(tab['frame']):
+                return
+            self.finish_mongo_query_tab(tab)
+            tab['time_label'].config(text="Cancelled")
+
+        comment = make_comment()
+        tab['comment'] = comment
+        self.query_executor.submit(
+            tab['frame'], lambda job: analyze_collection(coll, sample_size, job=job),
+            on_done, on_error, on_cancel,
+            mongo_client=self.mongo_client, comment=comment, on_progress=on_progress
+        )
+        tab['stop_btn'].config(state='normal')
+        tab['time_label'].config(text="Sampling...")
 
-    def show_mongo_indexes(self, db_entry, coll_entry, result_text):
+    def show_mongo_indexes(self, tab):
         """Show collection indexes"""
         if not self.mongo_client:
             messagebox.showerror("Error", "Please connect to MongoDB first!")
             return
 
-        database = db_entry.get().strip()
-        collection = coll_entry.get().strip()
+        database = tab['db_entry'].get().strip()
+        collection = tab['coll_entry'].get().strip()
 
         if not database or not collection:
             messagebox.showerror("Error", "Please select a database and collection!")
@@ -1081,22 +2149,83 @@ class DatabaseQueryTool:
 
             indexes = list(coll.list_indexes())
 
-            result_json = json.dumps(indexes, indent=2, ensure_ascii=False, default=str)
-            result_text.delete('1.0', 'end')
-            result_text.insert('1.0', result_json)
-            result_text.highlight()
+            result_json = to_extended_json(indexes)
+            self.show_text_result(tab, result_json)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to get indexes:\n{str(e)}")
 
-    def show_mongo_stats(self, db_entry, coll_entry, result_text):
+    def open_pipeline_builder(self, tab):
+        """Edit the tab's pipeline stage by stage; a find filter becomes a leading $match"""
+        if not tab['db_entry'].get().strip() or not tab['coll_entry'].get().strip():
+            messagebox.showerror("Error", "Please specify database and collection!")
+            return
+        try:
+            query = json.loads(tab['query_text'].get('1.0', 'end-1c') or '{}')
+        except json.JSONDecodeError as e:
+            messagebox.showerror("JSON Error", f"Invalid JSON query:\n{str(e)}")
+            return
+
+        if isinstance(query, list):
+            pipeline = [stage for stage in query if isinstance(stage, dict)]
+        else:
+            pipeline = [{'$match': query}] if query else []
+            sort = tab['sort_entry'].get().strip()
+            if sort:
+                try:
+                    pipeline.append({'$sort': json.loads(sort)})
+                except json.JSONDecodeError:
+                    pass
+        PipelineBuilderDialog(self.root, self, tab, pipeline)
+
+    def show_mongo_index_advice(self, tab):
+        """Recommend and flag indexes from this collection's query history and index usage"""
+        if not self.mongo_client:
+            messagebox.showerror("Error", "Please connect to MongoDB first!")
+            return
+
+        database = tab['db_entry'].get().strip()
+        collection = tab['coll_entry'].get().strip()
+
+        if not database or not collection:
+            messagebox.showerror("Error", "Please select a database and collection!")
+            return
+
+        coll = self.mongo_client[database][collection]
+        history = list(self.config_manager.get_history('mongo'))
+
+        def on_done(report):
+            self.finish_mongo_query_tab(tab)
+            self.show_text_result(tab, to_extended_json(report))
+            tab['time_label'].config(text=f"Recommendations: {len(report['recommendations'])}")
+            if not report['history_queries']:
+                self.status_bar.config(text=f"No query history for {database}.{collection}; only existing indexes were checked")
+            else:
+                self.status_bar.config(text=f"Analyzed {report['history_queries']} queries from history")
+
+        def on_error(error):
+            self.finish_mongo_query_tab(tab)
+            tab['time_label'].config(text="Error")
+            messagebox.showerror("Error", f"Failed to analyze indexes:\n{str(error)}")
+
+        def on_cancel():
+            if not self.query_executor.is_running(tab['frame']):
+                self.finish_mongo_query_tab(tab)
+                tab['time_label'].config(text="Cancelled")
+
+        self.query_executor.submit(tab['frame'], lambda job: advise(coll, history),
+                                   on_done, on_error, on_cancel)
+        tab['stop_btn'].config(state='normal')
+        tab['time_label'].config(text="Analyzing...")
+
+    def show_mongo_stats(self, tab):
         """Show collection statistics"""
         if not self.mongo_client:
             messagebox.showerror("Error", "Please connect to MongoDB first!")
             return
 
-        database = db_entry.get().strip()
-        collection = coll_entry.get().strip()
+        database = tab['db_entry'].get().strip()
+        collection = tab['coll_entry'].get().strip()
 
         if not database or not collection:
             messagebox.showerror("Error", "Please select a database and collection!")
@@ -1106,83 +2235,460 @@ class DatabaseQueryTool:
             db = self.mongo_client[database]
             stats = db.command("collStats", collection)
 
-            result_json = json.dumps(stats, indent=2, ensure_ascii=False, default=str)
-            result_text.delete('1.0', 'end')
-            result_text.insert('1.0', result_json)
-            result_text.highlight()
+            result_json = to_extended_json(stats)
+            self.show_text_result(tab, result_json)
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to get stats:\n{str(e)}")
 
     # Redis Methods
     def connect_redis(self):
+        profile_key = None
         try:
             host = self.redis_host.get()
             port = int(self.redis_port.get())
             password = self.redis_password.get() or None
             db = int(self.redis_db.get())
 
-            self.redis_client = redis.Redis(
-                host=host,
-                port=port,
-                password=password,
-                db=db,
-                decode_responses=True,
-                socket_connect_timeout=5
+            profile_key = f"{host}:{port}/{db}"
+            self.redis_client = self.client_registry.redis_client(
+                profile_key, host, port, password, db, self.selected_profile('redis', host, port)
             )
 
             self.redis_client.ping()
+            self.redis_cache_profile = profile_key
 
             self.redis_status.config(text="Status: Connected", foreground="green")
             self.status_bar.config(text="Connected to Redis")
             messagebox.showinfo("Success", "Successfully connected to Redis!")
             self.refresh_redis_tree()
         except Exception as e:
+            if profile_key:
+                self.client_registry.discard('redis', profile_key)
+            self.redis_client = None
             self.redis_status.config(text="Status: Connection Failed", foreground="red")
             messagebox.showerror("Connection Error", f"Failed to connect to Redis:\n{str(e)}")
 
     def refresh_redis_tree(self):
+        """Draw the cached key list for the pattern, then walk the keyspace with SCAN a page at a time.
+
+        Further pages load when the list is scrolled to the bottom or Load
+        More is pressed. Each page's rows appear first and their TYPE, TTL,
+        MEMORY USAGE and OBJECT ENCODING follow in pipelined batches. Keys
+        that were not seen are only removed once a scan has covered the
+        whole keyspace.
+        """
         if not self.redis_client:
             messagebox.showerror("Error", "Please connect to Redis first!")
             return
 
-        try:
-            for item in self.redis_tree.get_children():
-                self.redis_tree.delete(item)
+        profile = self.redis_cache_profile
+        pattern = self.redis_pattern.get() or "*"
+        key_type = self.redis_type_filter.get() or None
+        delimiter = self.redis_delimiter.get() or ':'
+        cache_name = f"{pattern} TYPE {key_type}" if key_type else pattern
+
+        view = (profile, pattern, key_type, delimiter)
+        if view != self.redis_tree_view:
+            self.reset_redis_tree(delimiter)
+            self.redis_tree_view = view
+            cached = self.metadata_cache.load_redis_keys(profile, cache_name)
+            self.add_redis_keys([(key, {'type': key_type}) for key, key_type in cached])
+            if cached:
+                self.status_bar.config(text=f"Showing {len(cached)} cached keys, refreshing...")
+
+        self.redis_scan = {
+            'view': view,
+            'cache_name': cache_name,
+            'client': self.redis_client,
+            'scanner': KeyScanner(
+                self.redis_client, pattern, key_type=key_type,
+                count=self.config_manager.get_setting('redis_scan_count', 1000),
+                page_size=self.config_manager.get_setting('redis_page_size', 500)
+            ),
+            'seen': {},
+            'loading': False,
+            'saved_at': time.time()
+        }
+        self.load_more_redis_keys()
+
+    def load_more_redis_keys(self):
+        """Fetch the next SCAN page of the current key browser view, then its key metadata"""
+        scan = self.redis_scan
+        if scan is None or scan['scanner'].done or scan['loading']:
+            return
+        scanner = scan['scanner']
+        batch_size = self.config_manager.get_setting('redis_metadata_batch', 100)
+
+        def load_page(job):
+            keys, cursor, calls = scanner.fetch_page(job)
+            keys = list(dict.fromkeys(keys))
+            job.report_progress(('keys', keys))
+            for i in range(0, len(keys), batch_size):
+                job.check_cancelled()
+                batch = keys[i:i + batch_size]
+                job.report_progress(('metadata', list(zip(batch, fetch_key_metadata(scan['client'], batch)))))
+            return cursor, calls
+
+        def on_progress(update):
+            kind, items = update
+            if self.redis_scan is not scan:
+                return
+            if kind == 'keys':
+                for key in items:
+                    known = self.redis_namespace.get(key)
+                    scan['seen'].setdefault(key, scanner.key_type or (known or {}).get('type'))
+                self.add_redis_keys([(key, {'type': scan['seen'][key]}) for key in items])
+            else:
+                for key, meta in items:
+                    if meta is None:
+                        scan['seen'].pop(key, None)
+                    else:
+                        scan['seen'][key] = meta['type']
+                self.update_redis_key_metadata(items)
+            self.update_redis_scan_controls()
+
+        def on_done(result):
+            cursor, calls = result
+            scan['loading'] = False
+            if self.redis_scan is not scan:
+                return
+            scanner.advance(cursor, calls)
+            if scanner.done:
+                added, removed = self.apply_redis_keys(list(scan['seen'].items()))
+                self.save_redis_scan(scan)
+                self.status_bar.config(text=f"Loaded {len(scan['seen'])} keys ({added} new, {removed} removed)")
+            elif time.time() - scan['saved_at'] >= 5:
+                self.save_redis_scan(scan)
+            self.update_redis_scan_controls()
+
+        def on_error(error):
+            scan['loading'] = False
+            if self.redis_scan is scan:
+                self.update_redis_scan_controls()
+                messagebox.showerror("Error", f"Failed to scan keys:\n{str(error)}")
+
+        def on_cancel():
+            scan['loading'] = False
+            if self.redis_scan is scan:
+                self.save_redis_scan(scan)
+                self.update_redis_scan_controls()
+
+        # Replaces (and stops) the page load of any earlier scan
+        scan['loading'] = True
+        self.metadata_executor.submit(('redis_tree',), load_page, on_done, on_error, on_cancel,
+                                      on_progress=on_progress)
+        self.update_redis_scan_controls()
+
+    def stop_redis_scan(self):
+        self.metadata_executor.cancel(('redis_tree',))
+
+    def save_redis_scan(self, scan):
+        """Cache the keys on display for the scan's view"""
+        scan['saved_at'] = time.time()
+        keys = [(key, meta.get('type')) for key, meta in self.redis_namespace.items()]
+        self.metadata_cache.save_redis_keys(scan['view'][0], scan['cache_name'], keys)
+
+    def update_redis_scan_controls(self):
+        scan = self.redis_scan
+        loading = scan is not None and scan['loading']
+        more = scan is not None and not scan['scanner'].done
+        self.redis_load_more_btn.config(state='normal' if more and not loading else 'disabled')
+        self.redis_stop_scan_btn.config(state='normal' if loading else 'disabled')
+
+        if scan is None:
+            text = ""
+        else:
+            text = f"{len(self.redis_namespace):,} keys loaded"
+            if loading:
+                text += " · scanning..."
+            elif more:
+                text += " · more available"
+            else:
+                text += " · end of keyspace"
+        self.redis_scan_label.config(text=text)
+
+    def reset_redis_tree(self, delimiter):
+        """Empty the key browser and start a new namespace model"""
+        self.redis_tree.delete(*self.redis_tree.get_children())
+        self.redis_namespace = KeyNamespace(delimiter)
+        self.redis_tree_items = {}
+        self.redis_item_keys = {}
+        self.redis_node_items = {}
+        self.redis_item_nodes = {}
+        self.redis_row_parents = {}
+        self.redis_more_rows = {}
+        # Expanded prefixes (and the root): how many rows they may show and how many they do
+        self.redis_windows = {}
+        # Windows whose rows may no longer be the first ones in the current order
+        self.redis_dirty_windows = set()
+        self.new_redis_window(self.redis_namespace.root, self.REDIS_WINDOW)
+
+    def new_redis_window(self, node, limit):
+        self.redis_windows[node] = {'limit': limit, 'prefixes': 0, 'keys': 0, 'more': None}
+        return self.redis_windows[node]
+
+    def redis_node_item(self, node):
+        return '' if node is self.redis_namespace.root else self.redis_node_items[node]
+
+    def apply_redis_keys(self, keys):
+        """Make the namespace hold exactly [(key, type)]; returns (added, removed)"""
+        wanted = dict(keys)
+        removed = [key for key, _ in self.redis_namespace.items() if key not in wanted]
+        self.remove_redis_keys(removed)
+        added = self.add_redis_keys([(key, {'type': key_type}) for key, key_type in keys
+                                     if key not in self.redis_namespace])
+        return added, len(removed)
+
+    def add_redis_keys(self, keys):
+        """Add or update [(key, metadata)] in the namespace; rows appear only under expanded prefixes"""
+        namespace = self.redis_namespace
+        changed = set()
+        added = 0
+        for key, meta in keys:
+            is_new = key not in namespace
+            path, created = namespace.add(key, meta)
+            changed.update(path)
+            for node in created:
+                self.show_redis_row('prefix', node, node.parent)
+            if is_new:
+                added += 1
+                self.show_redis_row('key', key, namespace.node_of(key))
+            elif key in self.redis_tree_items:
+                self.redis_tree.item(self.redis_tree_items[key], values=self.redis_key_row(namespace.get(key)))
+        self.refresh_redis_rows(changed)
+        return added
+
+    def remove_redis_keys(self, keys):
+        namespace = self.redis_namespace
+        changed = set()
+        for key in keys:
+            surviving, removed = namespace.remove(key)
+            changed.update(surviving)
+            changed.difference_update(removed)
+            if key in self.redis_tree_items:
+                self.forget_redis_row(self.redis_tree_items[key])
+            for node in removed:
+                if node in self.redis_node_items:
+                    self.forget_redis_row(self.redis_node_items[node])
+        self.refresh_redis_rows(changed)
+
+    def update_redis_key_metadata(self, items):
+        """Fill in [(key, metadata)]; keys whose metadata is None no longer exist"""
+        self.remove_redis_keys([key for key, meta in items if meta is None])
+        self.add_redis_keys([(key, meta) for key, meta in items if meta is not None])
+
+    def show_redis_row(self, kind, value, parent_node):
+        """Insert a new prefix/key row if its parent is expanded and its window has room"""
+        window = self.redis_windows.get(parent_node)
+        if window is None:
+            return
+        if window['prefixes'] + window['keys'] >= window['limit']:
+            self.update_more_row(parent_node)
+            # The new entry may belong among the first rows of the window
+            self.schedule_redis_render(parent_node)
+            return
+        if kind == 'prefix':
+            self.insert_redis_prefix_row(value, parent_node, window['prefixes'])
+        else:
+            self.insert_redis_key_row(value, parent_node, window['prefixes'] + window['keys'])
+        if self.redis_sort:
+            self.schedule_redis_sort()
+        else:
+            # Shown at the end for now; moved to its place by name with the next render
+            self.schedule_redis_render(parent_node)
+
+    def schedule_redis_render(self, node):
+        """Re-select a window's rows once keys stop arriving for a moment, not after every page"""
+        self.redis_dirty_windows.add(node)
+        if self.redis_render_job is None:
+            self.redis_render_job = self.root.after(300, self.render_dirty_redis_windows)
+
+    def render_dirty_redis_windows(self):
+        self.redis_render_job = None
+        dirty, self.redis_dirty_windows = self.redis_dirty_windows, set()
+        # Parents first, so windows collapsed away by a parent's render are skipped
+        for node in sorted(dirty, key=lambda node: len(node.prefix)):
+            if node in self.redis_windows:
+                self.render_redis_window(node, self.redis_windows[node]['limit'])
+
+    def insert_redis_prefix_row(self, node, parent_node, index):
+        item = self.redis_tree.insert(self.redis_node_item(parent_node), index, text=self.redis_prefix_text(node),
+                                      values=self.redis_prefix_row(node), tags=('prefix',))
+        # Expanded lazily; the placeholder makes the row expandable
+        self.redis_tree.insert(item, 'end', text="Loading...", tags=('placeholder',))
+        self.redis_node_items[node] = item
+        self.redis_item_nodes[item] = node
+        self.redis_row_parents[item] = parent_node
+        self.redis_windows[parent_node]['prefixes'] += 1
+        return item
+
+    def insert_redis_key_row(self, key, parent_node, index):
+        item = self.redis_tree.insert(
+            self.redis_node_item(parent_node), index, text=f"🔑 {self.redis_namespace.display_name(key)}",
+            values=self.redis_key_row(self.redis_namespace.get(key)), tags=('key', key)
+        )
+        self.redis_tree_items[key] = item
+        self.redis_item_keys[item] = key
+        self.redis_row_parents[item] = parent_node
+        self.redis_windows[parent_node]['keys'] += 1
+        return item
+
+    def forget_redis_row(self, item):
+        """Delete a row and everything rendered below it, keeping the maps and window counts in step"""
+        for child in self.redis_tree.get_children(item):
+            self.forget_redis_row(child)
+
+        parent_node = self.redis_row_parents.pop(item, None)
+        window = self.redis_windows.get(parent_node)
+        key = self.redis_item_keys.pop(item, None)
+        node = self.redis_item_nodes.pop(item, None)
+        if key is not None:
+            self.redis_tree_items.pop(key, None)
+            if window is not None:
+                window['keys'] -= 1
+        elif node is not None:
+            self.redis_node_items.pop(node, None)
+            self.redis_windows.pop(node, None)
+            if window is not None:
+                window['prefixes'] -= 1
+        self.redis_more_rows.pop(item, None)
+        if self.redis_tree.exists(item):
+            self.redis_tree.delete(item)
+
+    def refresh_redis_rows(self, nodes):
+        """Redraw the aggregates of prefix rows and the '... more' rows under expanded prefixes"""
+        for node in nodes:
+            item = self.redis_node_items.get(node)
+            if item is not None:
+                self.redis_tree.item(item, text=self.redis_prefix_text(node), values=self.redis_prefix_row(node))
+            if node in self.redis_windows:
+                self.update_more_row(node)
+
+    def update_more_row(self, node):
+        window = self.redis_windows[node]
+        parent_item = self.redis_node_item(node)
+        remaining = node.entries - window['prefixes'] - window['keys']
+        more = window['more']
+        if remaining <= 0:
+            if more is not None:
+                self.redis_more_rows.pop(more, None)
+                if self.redis_tree.exists(more):
+                    self.redis_tree.delete(more)
+                window['more'] = None
+            return
 
-            pattern = self.redis_pattern.get() or "*"
-            keys = self.redis_client.keys(pattern)
+        if window['prefixes'] + window['keys'] < window['limit']:
+            # Rows were removed from a full window: fill the freed places
+            self.render_redis_window(node, window['limit'])
+            return
 
-            if len(keys) > 1000:
-                keys = keys[:1000]
-                messagebox.showwarning("Warning", "Showing first 1000 keys only")
+        text = f"… {remaining:,} more"
+        if more is not None and self.redis_tree.exists(more):
+            if self.redis_tree.item(more, 'text') != text:
+                self.redis_tree.item(more, text=text)
+            self.redis_tree.move(more, parent_item, 'end')
+        else:
+            window['more'] = self.redis_tree.insert(parent_item, 'end', text=text, tags=('more',))
+            self.redis_more_rows[window['more']] = node
+
+    def render_redis_window(self, node, limit):
+        """Show the first limit rows under node in the current order, reusing rows already shown"""
+        parent_item = self.redis_node_item(node)
+        rows = ordered_entries(node, limit, self.redis_sort)
+        wanted = set()
+        for kind, value in rows:
+            if kind == 'prefix':
+                wanted.add(self.redis_node_items.get(value))
+            else:
+                wanted.add(self.redis_tree_items.get(value))
 
-            key_groups = defaultdict(list)
-            for key in sorted(keys):
-                if ':' in key:
-                    prefix = key.split(':', 1)[0]
-                    key_groups[prefix].append(key)
-                else:
-                    key_groups['_root'].append(key)
-
-            for group, group_keys in sorted(key_groups.items()):
-                if group == '_root':
-                    for key in group_keys:
-                        key_type = self.redis_client.type(key)
-                        self.redis_tree.insert('', 'end', text=f"🔑 {key}",
-                                               values=(key_type,), tags=('key', key))
-                else:
-                    group_node = self.redis_tree.insert('', 'end', text=f"📂 {group}",
-                                                         tags=('group',))
-                    for key in group_keys:
-                        key_type = self.redis_client.type(key)
-                        display_name = key.split(':', 1)[1] if ':' in key else key
-                        self.redis_tree.insert(group_node, 'end', text=f"🔑 {display_name}",
-                                               values=(key_type,), tags=('key', key))
-
-            self.status_bar.config(text=f"Loaded {len(keys)} keys")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to refresh key list:\n{str(e)}")
+        for child in self.redis_tree.get_children(parent_item):
+            if child not in wanted or child in self.redis_more_rows:
+                self.forget_redis_row(child)
+
+        window = self.redis_windows.get(node) or self.new_redis_window(node, limit)
+        window['limit'] = limit
+        for index, (kind, value) in enumerate(rows):
+            if kind == 'prefix':
+                item = self.redis_node_items.get(value) or self.insert_redis_prefix_row(value, node, index)
+            else:
+                item = self.redis_tree_items.get(value) or self.insert_redis_key_row(value, node, index)
+            self.redis_tree.move(item, parent_item, index)
+        self.update_more_row(node)
+
+    def on_redis_tree_open(self, event):
+        """Render a prefix's children the first time it is expanded"""
+        item = self.redis_tree.focus()
+        node = self.redis_item_nodes.get(item)
+        if node is None or node in self.redis_windows:
+            return
+        for child in self.redis_tree.get_children(item):
+            self.redis_tree.delete(child)
+        self.new_redis_window(node, self.REDIS_WINDOW)
+        self.render_redis_window(node, self.REDIS_WINDOW)
+
+    def show_more_redis_rows(self, item):
+        node = self.redis_more_rows.get(item)
+        if node is not None and node in self.redis_windows:
+            self.render_redis_window(node, self.redis_windows[node]['limit'] + self.REDIS_WINDOW)
+
+    def redis_prefix_text(self, node):
+        return f"📂 {node.name}{self.redis_namespace.delimiter} ({node.count:,})"
+
+    @staticmethod
+    def redis_prefix_row(node):
+        return (node.type_mix(), '', format_bytes(node.memory) if node.memory else '', '')
+
+    @staticmethod
+    def redis_key_row(meta):
+        return (meta.get('type') or '', format_ttl(meta.get('ttl')), format_bytes(meta.get('memory')),
+                meta.get('encoding') or '')
+
+    def sort_redis_tree(self, column):
+        """Sort every expanded prefix by a column (clicking it again reverses); '#0' restores name order"""
+        if column == '#0':
+            self.redis_sort = None
+        elif self.redis_sort and self.redis_sort[0] == column:
+            self.redis_sort = (column, not self.redis_sort[1])
+        else:
+            self.redis_sort = (column, column in ('ttl', 'memory'))
+
+        for name, label in self.redis_tree_headings.items():
+            if self.redis_sort and self.redis_sort[0] == name:
+                label += ' ▼' if self.redis_sort[1] else ' ▲'
+            self.redis_tree.heading(name, text=label)
+
+        # Re-select each window's rows in the new order; parents first, so collapsed-away windows are skipped
+        for node in list(self.redis_windows):
+            if node in self.redis_windows:
+                self.render_redis_window(node, self.redis_windows[node]['limit'])
+
+    def schedule_redis_sort(self):
+        """Re-order shown rows once metadata stops arriving for a moment, not after every batch"""
+        if self.redis_sort_job is None:
+            self.redis_sort_job = self.root.after(300, self.apply_redis_sort)
+
+    def apply_redis_sort(self):
+        """Re-order the rows already shown by the sort column as their values fill in"""
+        self.redis_sort_job = None
+        if not self.redis_sort:
+            return
+        column, descending = self.redis_sort
+        namespace = self.redis_namespace
+        for node, window in self.redis_windows.items():
+            parent_item = self.redis_node_item(node)
+            children = self.redis_tree.get_children(parent_item)
+            prefixes = [item for item in children if item in self.redis_item_nodes]
+            keys = [item for item in children if item in self.redis_item_keys]
+            prefixes.sort(key=lambda item: sort_rank(self.redis_item_nodes[item].value(column),
+                                                     self.redis_item_nodes[item].name, descending),
+                          reverse=descending)
+            keys.sort(key=lambda item: sort_rank(namespace.get(self.redis_item_keys[item]).get(column),
+                                                 self.redis_item_keys[item], descending),
+                      reverse=descending)
+            for index, item in enumerate(prefixes + keys):
+                self.redis_tree.move(item, parent_item, index)
 
     def on_redis_tree_select(self, event):
         selected = self.redis_tree.selection()
@@ -1192,48 +2698,101 @@ class DatabaseQueryTool:
         item = selected[0]
         tags = self.redis_tree.item(item, 'tags')
 
-        if 'key' in tags:
-            key_name = None
-            for tag in tags:
-                if tag != 'key':
-                    key_name = tag
-                    break
+        if 'more' in tags:
+            self.redis_tree.selection_remove(item)
+            self.show_more_redis_rows(item)
+            return
 
-            if not key_name:
-                text = self.redis_tree.item(item, 'text')
-                key_name = text.replace('🔑 ', '')
+        if 'key' in tags:
+            key_name = self.redis_item_keys[item]
 
             self.redis_key.delete(0, 'end')
             self.redis_key.insert(0, key_name)
 
-            try:
-                key_type = self.redis_client.type(key_name)
-                result = None
-
-                if key_type == 'string':
-                    result = self.redis_client.get(key_name)
-                    self.redis_command.set("GET")
-                elif key_type == 'hash':
-                    result = self.redis_client.hgetall(key_name)
-                    self.redis_command.set("HGETALL")
-                elif key_type == 'list':
-                    result = self.redis_client.lrange(key_name, 0, -1)
-                    self.redis_command.set("LRANGE")
-                elif key_type == 'set':
-                    result = self.redis_client.smembers(key_name)
-                    self.redis_command.set("SMEMBERS")
-                elif key_type == 'zset':
-                    result = self.redis_client.zrange(key_name, 0, -1, withscores=True)
-
-                if result is not None:
-                    result_json = json.dumps(result, indent=2, ensure_ascii=False, default=str)
-                    self.redis_result.delete('1.0', 'end')
-                    self.redis_result.insert('1.0', result_json)
-                    self.redis_result.highlight()
+            self.open_redis_value(key_name)
 
-            except Exception as e:
+    def open_redis_value(self, key):
+        """Show the first window of a key's value; its elements are paged, never fetched whole"""
+        try:
+            pager = ValuePager(
+                self.redis_client, key,
+                page_size=self.config_manager.get_setting('redis_value_page_size', 100),
+                match=self.redis_value_match.get().strip(),
+                min_score=self.redis_score_min.get().strip() or '-inf',
+                max_score=self.redis_score_max.get().strip() or '+inf',
+                string_window=self.config_manager.get_setting('redis_value_string_window', 65536)
+            )
+            if pager.key_type == 'none':
+                self.set_redis_pager(None)
                 self.redis_result.delete('1.0', 'end')
-                self.redis_result.insert('1.0', f"Error: {str(e)}")
+                self.redis_result.insert('1.0', f"Key '{key}' does not exist")
+                return
+            command = {'string': "GET", 'hash': "HGETALL", 'list': "LRANGE", 'set': "SMEMBERS"}.get(pager.key_type)
+            if command:
+                self.redis_command.set(command)
+            self.set_redis_pager(pager)
+            self.show_redis_value_page(pager.first())
+        except Exception as e:
+            self.set_redis_pager(None)
+            self.redis_result.delete('1.0', 'end')
+            self.redis_result.insert('1.0', f"Error: {str(e)}")
+
+    def set_redis_pager(self, pager):
+        self.redis_pager = pager
+        self.query_executor.cancel(('redis_value',))
+        if pager is None:
+            self.redis_value_label.config(text="")
+            for button in (self.redis_value_prev_btn, self.redis_value_next_btn, self.redis_value_all_btn):
+                button.config(state='disabled')
+
+    def show_redis_value_page(self, page):
+        items = page['items']
+        self.redis_result.delete('1.0', 'end')
+        if isinstance(items, str):
+            self.redis_result.insert('1.0', items)
+        else:
+            self.redis_result.insert('1.0', json.dumps(items, indent=2, ensure_ascii=False, default=str))
+            self.redis_result.highlight()
+
+        pager = self.redis_pager
+        self.redis_value_label.config(text=pager.describe())
+        self.redis_value_prev_btn.config(state='normal' if page['has_prev'] else 'disabled')
+        self.redis_value_next_btn.config(state='normal' if page['has_next'] else 'disabled')
+        self.redis_value_all_btn.config(state='disabled' if page['complete'] and not pager.filtered else 'normal')
+
+    def page_redis_value(self, step):
+        pager = self.redis_pager
+        if pager is None:
+            return
+        try:
+            self.show_redis_value_page(pager.next() if step > 0 else pager.previous())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read value:\n{str(e)}")
+
+    def load_all_redis_value(self):
+        """Fetch the whole value in the background, after confirming when it is large"""
+        pager = self.redis_pager
+        if pager is None:
+            return
+        limit = pager.string_window if pager.key_type == 'string' else pager.page_size
+        if (pager.length or 0) > limit and not messagebox.askyesno(
+                "Load All", f"Fetch the whole value of '{pager.key}'?\n\n{pager.describe()}"):
+            return
+
+        def on_done(page):
+            if self.redis_pager is pager:
+                self.show_redis_value_page(page)
+                self.status_bar.config(text=f"Loaded {pager.key}")
+
+        def on_error(error):
+            messagebox.showerror("Error", f"Failed to read value:\n{str(error)}")
+
+        def on_cancel():
+            self.status_bar.config(text="Loading value cancelled")
+
+        self.redis_value_all_btn.config(state='disabled')
+        self.status_bar.config(text=f"Loading the whole value of {pager.key}...")
+        self.query_executor.submit(('redis_value',), lambda job: pager.load_all(), on_done, on_error, on_cancel)
 
     def on_redis_tree_double_click(self, event):
         """Handle double-click on key to edit"""
@@ -1251,6 +2810,7 @@ class DatabaseQueryTool:
             messagebox.showerror("Error", "Please connect to Redis first!")
             return
 
+        self.set_redis_pager(None)
         try:
             cmd = self.redis_command.get()
             key = self.redis_key.get()
@@ -1267,8 +2827,17 @@ class DatabaseQueryTool:
                 result = self.redis_client.delete(key)
                 self.refresh_redis_tree()
             elif cmd == "KEYS":
+                # SCAN a page at a time instead of blocking the server with KEYS
                 pattern = key if key else "*"
-                result = self.redis_client.keys(pattern)
+                self.redis_command_scan = {
+                    'scanner': KeyScanner(
+                        self.redis_client, pattern,
+                        count=self.config_manager.get_setting('redis_scan_count', 1000),
+                        page_size=self.config_manager.get_setting('redis_page_size', 500)
+                    ),
+                    'keys': {}
+                }
+                result = self.scan_command_keys()
             elif cmd == "HGET":
                 field = value
                 result = self.redis_client.hget(key, field)
@@ -1307,12 +2876,47 @@ class DatabaseQueryTool:
             self.config_manager.add_to_history('redis', cmd_str, execution_time=execution_time)
 
             self.status_bar.config(text=f"Command executed in {execution_time:.3f}s")
+            if cmd != "KEYS":
+                self.redis_command_scan = None
+            self.update_command_keys_button()
 
         except json.JSONDecodeError as e:
             messagebox.showerror("JSON Error", f"Invalid JSON:\n{str(e)}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to execute command:\n{str(e)}")
 
+    def scan_command_keys(self):
+        """Add the next SCAN page to the KEYS command's result; returns every key found so far"""
+        scan = self.redis_command_scan
+        scanner = scan['scanner']
+        keys, cursor, calls = scanner.fetch_page()
+        scanner.advance(cursor, calls)
+        scan['keys'].update(dict.fromkeys(keys))
+        return list(scan['keys'])
+
+    def more_command_keys(self):
+        """Continue the KEYS command's scan and show the longer key list"""
+        if not self.redis_command_scan or self.redis_command_scan['scanner'].done:
+            return
+        try:
+            result = self.scan_command_keys()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to scan keys:\n{str(e)}")
+            return
+        self.redis_result.delete('1.0', 'end')
+        self.redis_result.insert('1.0', json.dumps(result, indent=2, ensure_ascii=False))
+        self.redis_result.highlight()
+        self.update_command_keys_button()
+
+    def update_command_keys_button(self):
+        scan = self.redis_command_scan
+        if scan is None:
+            self.redis_more_keys_btn.config(state='disabled')
+            return
+        done = scan['scanner'].done
+        self.redis_more_keys_btn.config(state='disabled' if done else 'normal')
+        self.status_bar.config(text=f"{len(scan['keys'])} keys" + ("" if done else " so far · More Keys continues the scan"))
+
     def edit_redis_value(self):
         """Open editor for Redis value"""
         if not self.redis_client:
@@ -1325,33 +2929,53 @@ class DatabaseQueryTool:
             return
 
         try:
-            key_type = self.redis_client.type(key)
-            value = None
-
-            if key_type == 'string':
-                value = self.redis_client.get(key) or ''
-            elif key_type == 'hash':
-                value = self.redis_client.hgetall(key)
-            elif key_type == 'list':
-                value = self.redis_client.lrange(key, 0, -1)
-            elif key_type == 'set':
-                value = list(self.redis_client.smembers(key))
-            elif key_type == 'none':
-                value = ''
-                key_type = 'string'
-
-            dialog = RedisValueEditor(self.root, key, value, key_type)
+            pager = self.redis_pager
+            if pager is None or pager.key != key or pager.page is None:
+                pager = ValuePager(
+                    self.redis_client, key,
+                    page_size=self.config_manager.get_setting('redis_value_page_size', 100),
+                    string_window=self.config_manager.get_setting('redis_value_string_window', 65536)
+                )
+            key_type = pager.key_type
+
+            if key_type == 'none':
+                page = {'items': '', 'offset': 0, 'complete': True}
+                note = "New key"
+            elif key_type == 'stream':
+                messagebox.showwarning("Warning", "Stream entries cannot be edited here")
+                return
+            else:
+                page = pager.page or pager.first()
+                # Only the window shown is edited; changes to it are written back element by element
+                note = pager.describe()
+
+            dialog = RedisValueEditor(self.root, key, page['items'], key_type if key_type != 'none' else 'string',
+                                      note=note)
             self.root.wait_window(dialog)
 
             if dialog.result:
-                self.redis_client.set(dialog.result['key'], dialog.result['value'])
+                target = dialog.result['key']
+                text = dialog.result['value']
+                if key_type == 'none' or (target != key and key_type == 'string' and page['complete']):
+                    self.redis_client.set(target, text)
+                elif target != key:
+                    messagebox.showerror("Error", "Only new keys and whole strings can be saved under another key")
+                    return
+                else:
+                    new = text if key_type == 'string' else json.loads(text)
+                    save_window(self.redis_client, key, key_type, page['items'], new,
+                                offset=page['offset'], complete=page['complete'])
 
                 if dialog.result['ttl'] > 0:
-                    self.redis_client.expire(dialog.result['key'], dialog.result['ttl'])
+                    self.redis_client.expire(target, dialog.result['ttl'])
 
                 messagebox.showinfo("Success", "Value saved successfully")
                 self.refresh_redis_tree()
+                if self.redis_pager is not None and self.redis_pager.key == target:
+                    self.show_redis_value_page(self.redis_pager.read())
 
+        except json.JSONDecodeError as e:
+            messagebox.showerror("JSON Error", f"Invalid JSON:\n{str(e)}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to edit value:\n{str(e)}")
 
@@ -1399,6 +3023,20 @@ class DatabaseQueryTool:
             self.redis_profile_var.set(last_profile)
             self.on_redis_profile_select(None)
 
+    def selected_profile(self, db_type, host, port):
+        """The profile chosen in the connection bar, if the host and port fields still match it"""
+        if db_type == 'mongo':
+            name = self.mongo_profile_var.get()
+            profiles = self.config_manager.get_mongo_profiles()
+        else:
+            name = self.redis_profile_var.get()
+            profiles = self.config_manager.get_redis_profiles()
+
+        profile = next((p for p in profiles if p['name'] == name), None)
+        if profile and profile['host'] == host and int(profile['port']) == port:
+            return profile
+        return None
+
     def on_mongo_profile_select(self, event):
         """Load MongoDB profile"""
         profile_name = self.mongo_profile_var.get()
@@ -1450,12 +3088,15 @@ class DatabaseQueryTool:
             return
 
         try:
+            # Keep the pool settings of a profile being overwritten
+            existing = next((p for p in self.config_manager.get_mongo_profiles() if p['name'] == name), None)
             self.config_manager.add_mongo_profile(
                 name=name,
                 host=self.mongo_host.get(),
                 port=int(self.mongo_port.get()),
                 username=self.mongo_username.get(),
-                password=self.mongo_password.get()
+                password=self.mongo_password.get(),
+                **pool_options(existing, MONGO_POOL_DEFAULTS)
             )
             messagebox.showinfo("Success", "Profile saved successfully")
             self.update_mongo_profiles()
@@ -1469,12 +3110,14 @@ class DatabaseQueryTool:
             return
 
         try:
+            existing = next((p for p in self.config_manager.get_redis_profiles() if p['name'] == name), None)
             self.config_manager.add_redis_profile(
                 name=name,
                 host=self.redis_host.get(),
                 port=int(self.redis_port.get()),
                 password=self.redis_password.get(),
-                db=int(self.redis_db.get())
+                db=int(self.redis_db.get()),
+                **pool_options(existing, REDIS_POOL_DEFAULTS)
             )
             messagebox.showinfo("Success", "Profile saved successfully")
             self.update_redis_profiles()
@@ -1492,8 +3135,14 @@ class DatabaseQueryTool:
         self.update_redis_profiles()
 
     # Favorites
-    def add_mongo_favorite(self, db_entry, coll_entry, query_text):
+    def add_mongo_favorite(self, tab):
         """Add MongoDB query to favorites"""
+        try:
+            options = self.get_mongo_tab_options(tab)
+        except ValueError as e:
+            messagebox.showerror("Options Error", str(e))
+            return
+
         name = simpledialog.askstring("Add Favorite", "Enter favorite name:")
         if not name:
             return
@@ -1502,9 +3151,10 @@ class DatabaseQueryTool:
             self.config_manager.add_favorite(
                 'mongo',
                 name=name,
-                query=query_text.get('1.0', 'end-1c'),
-                database=db_entry.get(),
-                collection=coll_entry.get()
+                query=tab['query_text'].get('1.0', 'end-1c'),
+                database=tab['db_entry'].get(),
+                collection=tab['coll_entry'].get(),
+                options=options
             )
             messagebox.showinfo("Success", "Added to favorites")
         except Exception as e:
@@ -1550,101 +3200,276 @@ class DatabaseQueryTool:
 
     # Export/Import
     def export_results(self):
-        """Export current results"""
+        """Export current results: Mongo tabs re-run their query and stream it to a file"""
         current_tab = self.notebook.tab(self.notebook.select(), 'text')
 
         if 'MongoDB' in current_tab and self.mongo_query_tabs:
-            current_mongo_tab = self.mongo_query_tabs[self.mongo_query_notebook.index('current')]
-            result_text = current_mongo_tab['result_text'].get('1.0', 'end-1c')
+            self.export_mongo_query(self.mongo_query_tabs[self.mongo_query_notebook.index('current')])
         elif 'Redis' in current_tab:
-            result_text = self.redis_result.get('1.0', 'end-1c')
+            self.export_redis_result()
         else:
             messagebox.showwarning("Warning", "No results to export")
+
+    def export_mongo_query(self, tab):
+        """Stream every result of the tab's query to NDJSON/JSON/CSV/Parquet, optionally compressed"""
+        if not self.mongo_client:
+            messagebox.showerror("Error", "Please connect to MongoDB first!")
             return
 
-        if not result_text.strip():
-            messagebox.showwarning("Warning", "No results to export")
+        database = tab['db_entry'].get().strip()
+        collection = tab['coll_entry'].get().strip()
+        query_type = tab['query_type_var'].get()
+        if not database or not collection:
+            messagebox.showerror("Error", "Please specify database and collection!")
+            return
+        if query_type not in ('find', 'aggregate'):
+            messagebox.showwarning("Warning", "Only find and aggregate results can be exported")
             return
 
-        # Ask for format
-        format_choice = messagebox.askquestion("Export Format",
-                                               "Export as CSV?\n\nYes = CSV\nNo = JSON",
-                                               icon='question')
+        try:
+            query = json.loads(tab['query_text'].get('1.0', 'end-1c'))
+            options = self.get_mongo_tab_options(tab)
+        except json.JSONDecodeError as e:
+            messagebox.showerror("JSON Error", f"Invalid JSON query:\n{str(e)}")
+            return
+        except ValueError as e:
+            messagebox.showerror("Options Error", str(e))
+            return
 
-        if format_choice == 'yes':
-            filename = filedialog.asksaveasfilename(
-                defaultextension='.csv',
-                filetypes=[('CSV files', '*.csv'), ('All files', '*.*')]
-            )
-            if filename:
-                try:
-                    data = json.loads(result_text)
-                    if isinstance(data, list) and data:
-                        import pandas as pd
-                        df = pd.DataFrame(data)
-                        df.to_csv(filename, index=False)
-                        messagebox.showinfo("Success", f"Exported to {filename}")
-                    else:
-                        messagebox.showerror("Error", "Data format not suitable for CSV export")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to export:\n{str(e)}")
-        else:
-            filename = filedialog.asksaveasfilename(
-                defaultextension='.json',
-                filetypes=[('JSON files', '*.json'), ('All files', '*.*')]
+        filename = filedialog.asksaveasfilename(
+            defaultextension='.ndjson',
+            initialfile=f"{collection}.ndjson",
+            filetypes=[('NDJSON', '*.ndjson'), ('NDJSON (gzip)', '*.ndjson.gz'), ('NDJSON (zstd)', '*.ndjson.zst'),
+                       ('JSON array', '*.json'), ('CSV', '*.csv'), ('CSV (gzip)', '*.csv.gz'),
+                       ('Parquet', '*.parquet'), ('All files', '*.*')]
+        )
+        if not filename:
+            return
+
+        coll = self.mongo_client[database][collection]
+        comment = make_comment()
+        key = ('export', tab['frame'])
+        dialog = ProgressDialog(self.root, f"Exporting {database}.{collection}",
+                                on_cancel=lambda: self.query_executor.cancel(key))
+
+        def work(job):
+            # An exact count would scan the collection, so only unfiltered finds get a total
+            total = None
+            if query_type == 'find' and not query:
+                total = coll.estimated_document_count()
+            cursor = query_cursor(coll, query_type, query, options, comment)
+            return export_cursor(cursor, filename, job=job, total=total)
+
+        def on_progress(progress):
+            total = progress['total']
+            dialog.update_progress(
+                progress['exported'] / total if total else None,
+                f"Exported {progress['exported']:,}" + (f" of ~{total:,}" if total else '')
+                + f" documents ({progress['docs_per_sec']:,.0f} docs/sec)"
             )
-            if filename:
-                try:
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        f.write(result_text)
-                    messagebox.showinfo("Success", f"Exported to {filename}")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to export:\n{str(e)}")
 
-    def import_data(self):
-        """Import data from file"""
-        filename = filedialog.askopenfilename(
+        def on_done(summary):
+            dialog.destroy()
+            message = (f"Exported {summary['exported']:,} documents to {summary['path']}\n"
+                       f"{summary['bytes'] / (1024 * 1024):.1f} MB in {summary['seconds']:.1f}s")
+            if summary['dropped_fields']:
+                message += ("\n\nFields missing from the first batch were left out: "
+                            + ", ".join(summary['dropped_fields'][:20]))
+            if summary['coerced_values']:
+                message += (f"\n\n{summary['coerced_values']:,} values did not match their column's type and "
+                            f"were written as null: " + ", ".join(summary['coerced_fields'][:20]))
+            messagebox.showinfo("Success", message)
+
+        def on_error(error):
+            dialog.destroy()
+            messagebox.showerror("Error", f"Failed to export:\n{str(error)}")
+
+        def on_cancel():
+            dialog.destroy()
+            self.status_bar.config(text="Export cancelled")
+
+        self.query_executor.submit(key, work, on_done, on_error, on_cancel,
+                                   mongo_client=self.mongo_client, comment=comment, on_progress=on_progress)
+
+    def export_redis_result(self):
+        """Save the Redis result text as JSON, or as CSV when it is a list of objects"""
+        result_text = self.redis_result.get('1.0', 'end-1c')
+        if not result_text.strip():
+            messagebox.showwarning("Warning", "No results to export")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            defaultextension='.json',
             filetypes=[('JSON files', '*.json'), ('CSV files', '*.csv'), ('All files', '*.*')]
         )
-
         if not filename:
             return
 
+        try:
+            if filename.lower().endswith('.csv'):
+                data = json.loads(result_text)
+                if not (isinstance(data, list) and data and all(isinstance(row, dict) for row in data)):
+                    messagebox.showerror("Error", "Data format not suitable for CSV export")
+                    return
+                columns = list(dict.fromkeys(column for row in data for column in row))
+                with open(filename, 'w', encoding='utf-8', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=columns)
+                    writer.writeheader()
+                    writer.writerows(data)
+            else:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write(result_text)
+            messagebox.showinfo("Success", f"Exported to {filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export:\n{str(e)}")
+
+    def import_data(self):
+        """Stream a JSON/NDJSON/CSV file into the current Mongo tab's collection"""
         current_tab = self.notebook.tab(self.notebook.select(), 'text')
+        if 'MongoDB' not in current_tab:
+            messagebox.showwarning("Warning", "Import is only supported for MongoDB collections")
+            return
+        if not self.mongo_client or not self.mongo_query_tabs:
+            messagebox.showwarning("Warning", "Please connect to MongoDB first")
+            return
+
+        current_mongo_tab = self.mongo_query_tabs[self.mongo_query_notebook.index('current')]
+        db = current_mongo_tab['db_entry'].get().strip()
+        coll = current_mongo_tab['coll_entry'].get().strip()
+        if not db or not coll:
+            messagebox.showwarning("Warning", "Please specify database and collection")
+            return
+
+        filename = filedialog.askopenfilename(
+            filetypes=[('JSON files', '*.json *.ndjson *.jsonl *.json.gz *.ndjson.gz'),
+                       ('CSV files', '*.csv *.csv.gz'), ('All files', '*.*')]
+        )
+        if not filename:
+            return
 
         try:
-            if filename.endswith('.json'):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            elif filename.endswith('.csv'):
-                import pandas as pd
-                df = pd.read_csv(filename)
-                data = df.to_dict('records')
-            else:
-                messagebox.showerror("Error", "Unsupported file format")
+            importer = BulkImporter(
+                self.mongo_client[db][coll], filename,
+                batch_size=self.config_manager.get_setting('import_batch_size', 1000),
+                workers=self.config_manager.get_setting('import_workers', 4),
+                window=self.config_manager.get_setting('import_window', 8)
+            )
+            done = importer.load_checkpoint()
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to import:\n{str(e)}")
+            return
+
+        size_mb = importer.total_bytes / (1024 * 1024)
+        resume = False
+        if done:
+            answer = messagebox.askyesnocancel(
+                "Resume Import", f"A previous import of this file into {db}.{coll} stopped after {done} records.\n\n"
+                                 f"Yes = resume from record {done + 1}\nNo = start over"
+            )
+            if answer is None:
                 return
+            resume = answer
+        elif not messagebox.askyesno("Confirm", f"Import {os.path.basename(filename)} ({size_mb:.1f} MB) to {db}.{coll}?"):
+            return
 
-            if 'MongoDB' in current_tab:
-                if not isinstance(data, list):
-                    data = [data]
+        key = ('import', db, coll)
+        dialog = ProgressDialog(self.root, f"Importing into {db}.{coll}",
+                                on_cancel=lambda: self.query_executor.cancel(key))
 
-                if self.mongo_client and self.mongo_query_tabs:
-                    current_mongo_tab = self.mongo_query_tabs[self.mongo_query_notebook.index('current')]
-                    db = current_mongo_tab['db_entry'].get().strip()
-                    coll = current_mongo_tab['coll_entry'].get().strip()
+        def on_progress(progress):
+            dialog.update_progress(
+                progress['bytes'] / max(progress['total_bytes'], 1),
+                f"Read {progress['read']:,}  Inserted {progress['inserted']:,}  "
+                f"Duplicates {progress['duplicates']:,}  ({progress['docs_per_sec']:,.0f} docs/sec)"
+            )
 
-                    if db and coll:
-                        if messagebox.askyesno("Confirm", f"Import {len(data)} documents to {db}.{coll}?"):
-                            collection = self.mongo_client[db][coll]
-                            result = collection.insert_many(data)
-                            messagebox.showinfo("Success", f"Imported {len(result.inserted_ids)} documents")
-                    else:
-                        messagebox.showwarning("Warning", "Please specify database and collection")
-                else:
-                    messagebox.showwarning("Warning", "Please connect to MongoDB first")
+        def on_done(summary):
+            dialog.destroy()
+            self.result_cache.invalidate(db, coll)
+            messagebox.showinfo("Success", (
+                f"Imported {summary['inserted']:,} documents in {summary['seconds']:.1f}s "
+                f"({summary['docs_per_sec']:,.0f} docs/sec)"
+                + (f"\nSkipped {summary['skipped']:,} already imported records" if summary['skipped'] else '')
+                + (f"\n{summary['duplicates']:,} duplicates ignored" if summary['duplicates'] else '')
+            ))
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import:\n{str(e)}")
+        def on_error(error):
+            dialog.destroy()
+            self.result_cache.invalidate(db, coll)
+            messagebox.showerror("Error", f"Failed to import:\n{str(error)}\n\n"
+                                          f"Progress was saved; import the file again to resume.")
+
+        def on_cancel():
+            dialog.destroy()
+            self.result_cache.invalidate(db, coll)
+            self.status_bar.config(text="Import stopped; import the file again to resume")
+
+        self.query_executor.submit(key, lambda job: importer.run(job, resume=resume),
+                                   on_done, on_error, on_cancel, on_progress=on_progress)
+
+    def dump_collection(self):
+        """Dump the current Mongo tab's collection as parallel compressed part files"""
+        if not self.mongo_client or not self.mongo_query_tabs:
+            messagebox.showwarning("Warning", "Please connect to MongoDB first")
+            return
+
+        tab = self.mongo_query_tabs[self.mongo_query_notebook.index('current')]
+        db = tab['db_entry'].get().strip()
+        coll = tab['coll_entry'].get().strip()
+        if not db or not coll:
+            messagebox.showwarning("Warning", "Please specify database and collection")
+            return
+
+        directory = filedialog.askdirectory(title=f"Dump {db}.{coll} into folder")
+        if not directory:
+            return
+        key = simpledialog.askstring("Dump Collection", "Split on indexed field:", initialvalue='_id')
+        if not key:
+            return
+        workers = simpledialog.askinteger(
+            "Dump Collection", "Parallel readers:",
+            initialvalue=self.config_manager.get_setting('dump_workers', 4), minvalue=1, maxvalue=64
+        )
+        if not workers:
+            return
+        file_format = 'bson' if messagebox.askquestion(
+            "Dump Format", "Write raw BSON parts (mongorestore compatible)?\n\nYes = BSON\nNo = NDJSON",
+            icon='question'
+        ) == 'yes' else 'ndjson'
+        self.config_manager.update_setting('dump_workers', workers)
+
+        dumper = CollectionDumper(self.mongo_client[db][coll], os.path.join(directory, f"{db}.{coll}"),
+                                  key=key, workers=workers, file_format=file_format)
+        job_key = ('dump', db, coll)
+        dialog = ProgressDialog(self.root, f"Dumping {db}.{coll}",
+                                on_cancel=lambda: self.query_executor.cancel(job_key))
+
+        def on_progress(progress):
+            total = progress['total']
+            dialog.update_progress(
+                progress['documents'] / total if total else None,
+                f"{progress['documents']:,} documents, parts {progress['parts_done']}/{progress['parts']} "
+                f"({progress['docs_per_sec']:,.0f} docs/sec)"
+            )
+
+        def on_done(manifest):
+            dialog.destroy()
+            messagebox.showinfo("Success", (
+                f"Dumped {manifest['documents']:,} documents in {len(manifest['parts'])} parts to\n"
+                f"{dumper.directory}\n{manifest['bytes'] / (1024 * 1024):.1f} MB in {manifest['seconds']:.1f}s "
+                f"({manifest['docs_per_sec']:,.0f} docs/sec)" + (f"\n\n{manifest['note']}" if manifest['note'] else '')
+            ))
+
+        def on_error(error):
+            dialog.destroy()
+            messagebox.showerror("Error", f"Failed to dump collection:\n{str(error)}")
+
+        def on_cancel():
+            dialog.destroy()
+            self.status_bar.config(text="Dump cancelled; the part files are incomplete")
+
+        self.query_executor.submit(job_key, dumper.run, on_done, on_error, on_cancel,
+                                   mongo_client=self.mongo_client, on_progress=on_progress)
 
     # Theme
     def toggle_theme(self):
@@ -1681,13 +3506,59 @@ class DatabaseQueryTool:
 
         if 'MongoDB' in current_tab and self.mongo_query_tabs:
             current_mongo_tab = self.mongo_query_tabs[self.mongo_query_notebook.index('current')]
+            current_mongo_tab['results'] = None
+            current_mongo_tab['rendered_views'] = set()
             current_mongo_tab['result_text'].delete('1.0', 'end')
+            current_mongo_tab['tree_view'].set_documents([])
+            current_mongo_tab['table_frame'].set_buffer(ColumnarResultBuffer())
         elif 'Redis' in current_tab:
+            self.set_redis_pager(None)
             self.redis_result.delete('1.0', 'end')
 
+    def on_close(self):
+        """Stop running queries and exit"""
+        self.query_executor.shutdown()
+        self.metadata_executor.shutdown()
+        self.mongo_metadata.shutdown()
+        self.metadata_cache.close()
+        self.result_serializer.shutdown()
+        self.result_cache.clear()
+        self.client_registry.close()
+        self.root.quit()
+
+    def apply_settings(self):
+        """Bring running components in line with the saved settings"""
+        self.result_cache.configure(
+            max_bytes=self.config_manager.get_setting('cache_max_mb', 64) * 1024 * 1024,
+            ttl=self.config_manager.get_setting('cache_ttl', 300)
+        )
+        self.command_log.resize(self.config_manager.get_setting('command_log_size', 10000))
+
+    def clear_result_cache(self):
+        """Drop all cached query results"""
+        self.result_cache.clear()
+        self.status_bar.config(text="Result cache cleared")
+
+    def clear_metadata_cache(self):
+        """Forget the cached database and key browser trees"""
+        self.metadata_cache.clear()
+        self.status_bar.config(text="Browser cache cleared")
+
+    def show_background_error(self, message):
+        """Errors from background work that no dialog is waiting for"""
+        self.status_bar.config(text=message)
+
+    def show_command_log(self):
+        """Show latency statistics of every command sent to MongoDB and Redis"""
+        CommandLogDialog(self.root, self.command_log)
+
+    def show_redis_memory(self):
+        """Find the prefixes, types and keys that take the most Redis memory"""
+        RedisMemoryDialog(self.root, self)
+
     def show_settings(self):
         """Show settings dialog"""
-        SettingsDialog(self.root, self.config_manager)
+        SettingsDialog(self.root, self.config_manager, self)
 
     def show_about(self):
         """Show about dialog"""
@@ -1704,6 +3575,795 @@ class DatabaseQueryTool:
                            "- And much more!")
 
 
+class ExplainPlanDialog(tk.Toplevel):
+    """Dialog showing an explain plan as a stage tree with execution stats"""
+
+    def __init__(self, parent, title, explain):
+        super().__init__(parent)
+        self.title(f"Explain Plan - {title}")
+        self.geometry("1000x600")
+
+        result = parse_explain(explain)
+        summary = result['summary']
+
+        # Summary
+        summary_frame = ttk.LabelFrame(self, text="Summary", padding=10)
+        summary_frame.pack(fill='x', padx=10, pady=10)
+
+        ttk.Label(summary_frame, text=(
+            f"Returned: {summary['nReturned']}   "
+            f"Docs examined: {summary['totalDocsExamined']}   "
+            f"Keys examined: {summary['totalKeysExamined']}   "
+            f"Time: {summary['executionTimeMillis']} ms"
+        )).pack(anchor='w')
+
+        ratio = max(summary['docsExaminedPerReturned'], summary['keysExaminedPerReturned'])
+        ratio_label = ttk.Label(summary_frame, text=(
+            f"Examined/returned: docs {summary['docsExaminedPerReturned']:.1f}, "
+            f"keys {summary['keysExaminedPerReturned']:.1f}"
+        ), foreground='red' if ratio > 10 else 'green')
+        ratio_label.pack(anchor='w')
+
+        if summary['warnings']:
+            ttk.Label(summary_frame, text="Warnings: " + ", ".join(summary['warnings']),
+                      foreground='red').pack(anchor='w')
+
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill='both', expand=True, padx=10)
+
+        # Stage tree
+        plan_frame = ttk.Frame(notebook)
+        notebook.add(plan_frame, text="Plan")
+
+        columns = ('nReturned', 'docsExamined', 'keysExamined', 'time_ms', 'details')
+        self.tree = ttk.Treeview(plan_frame, columns=columns, show='tree headings')
+        self.tree.heading('#0', text='Stage')
+        self.tree.heading('nReturned', text='Returned')
+        self.tree.heading('docsExamined', text='Docs Examined')
+        self.tree.heading('keysExamined', text='Keys Examined')
+        self.tree.heading('time_ms', text='Time (ms)')
+        self.tree.heading('details', text='Details')
+
+        self.tree.column('#0', width=200)
+        self.tree.column('nReturned', width=80)
+        self.tree.column('docsExamined', width=100)
+        self.tree.column('keysExamined', width=100)
+        self.tree.column('time_ms', width=80)
+        self.tree.column('details', width=400)
+        self.tree.tag_configure('warning', background='#ffd6d6')
+
+        self.tree.pack(fill='both', expand=True, side='left')
+
+        scrollbar = ttk.Scrollbar(plan_frame, orient='vertical', command=self.tree.yview)
+        scrollbar.pack(side='right', fill='y')
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        for node in result['roots']:
+            self.insert_node('', node)
+
+        # Raw explain output
+        raw_frame = ttk.Frame(notebook)
+        notebook.add(raw_frame, text="Raw")
+        raw_text = JsonHighlightText(raw_frame, width=100, height=25)
+        raw_text.pack(fill='both', expand=True)
+        raw_text.insert('1.0', to_extended_json(explain))
+        raw_text.highlight()
+
+        ttk.Button(self, text="Close", command=self.destroy).pack(side='right', padx=10, pady=10)
+
+        self.transient(parent)
+
+    def insert_node(self, parent, node):
+        """Insert a plan node and its children, expanded"""
+        def show(value):
+            return '' if value is None else value
+
+        text = node['stage'] if not node['warning'] else f"⚠ {node['stage']} ({node['warning']})"
+        item = self.tree.insert(parent, 'end', text=text, open=True, values=(
+            show(node['nReturned']),
+            show(node['docsExamined']),
+            show(node['keysExamined']),
+            show(node['time_ms']),
+            node['details']
+        ), tags=('warning',) if node['warning'] else ())
+
+        for child in node['children']:
+            self.insert_node(item, child)
+
+
+class CommandLogDialog(tk.Toplevel):
+    """Per-command latency percentiles and histogram from the driver command log"""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, parent, command_log):
+        super().__init__(parent)
+        self.command_log = command_log
+        self.title("Command Log")
+        self.geometry("1000x600")
+        self.stats = {}
+
+        # Statistics
+        stats_frame = ttk.LabelFrame(self, text="Commands", padding=10)
+        stats_frame.pack(fill='both', expand=True, padx=10, pady=10)
+
+        columns = ('backend', 'command', 'count', 'errors', 'p50', 'p95', 'p99', 'max', 'reply', 'wait')
+        self.tree = ttk.Treeview(stats_frame, columns=columns, show='headings')
+        headings = {
+            'backend': 'Backend', 'command': 'Command', 'count': 'Count', 'errors': 'Errors',
+            'p50': 'p50 (ms)', 'p95': 'p95 (ms)', 'p99': 'p99 (ms)', 'max': 'Max (ms)',
+            'reply': 'Avg Reply (bytes)', 'wait': 'Avg Pool Wait (ms)'
+        }
+        for column in columns:
+            self.tree.heading(column, text=headings[column])
+            self.tree.column(column, width=120 if column in ('command', 'reply', 'wait') else 75)
+
+        self.tree.pack(fill='both', expand=True, side='left')
+        scrollbar = ttk.Scrollbar(stats_frame, orient='vertical', command=self.tree.yview)
+        scrollbar.pack(side='right', fill='y')
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.bind('<<TreeviewSelect>>', lambda e: self.draw_histogram())
+
+        # Histogram of the selected command
+        histogram_frame = ttk.LabelFrame(self, text="Latency Histogram", padding=10)
+        histogram_frame.pack(fill='x', padx=10)
+        self.canvas = tk.Canvas(histogram_frame, height=160, background='white')
+        self.canvas.pack(fill='x', expand=True)
+        self.canvas.bind('<Configure>', lambda e: self.draw_histogram())
+
+        # Buttons
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill='x', padx=10, pady=10)
+
+        self.summary_label = ttk.Label(btn_frame, text="")
+        self.summary_label.pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side='right', padx=5)
+        ttk.Button(btn_frame, text="Dump to File...", command=self.dump).pack(side='right', padx=5)
+        ttk.Button(btn_frame, text="Clear", command=self.clear).pack(side='right', padx=5)
+
+        self.refresh()
+        self.transient(parent)
+
+    def refresh(self):
+        """Recompute the statistics, keeping the selection, and schedule the next refresh"""
+        if not self.winfo_exists():
+            return
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        self.stats = {}
+
+        def ms(value):
+            return '' if value is None else f"{value:.2f}"
+
+        stats = self.command_log.stats()
+        for stat in stats:
+            iid = f"{stat['backend']}:{stat['command']}"
+            self.stats[iid] = stat
+            self.tree.insert('', 'end', iid=iid, values=(
+                stat['backend'], stat['command'], stat['count'], stat['errors'],
+                ms(stat['p50']), ms(stat['p95']), ms(stat['p99']), ms(stat['max']),
+                '' if stat['reply_bytes'] is None else f"{stat['reply_bytes']:.0f}",
+                ms(stat['pool_wait_ms'])
+            ))
+        keep = [iid for iid in selected if iid in self.stats]
+        if keep:
+            self.tree.selection_set(keep)
+
+        total = sum(stat['count'] for stat in stats)
+        self.summary_label.config(text=f"{total} commands buffered (keeps the last {self.command_log.entries.maxlen})")
+        self.draw_histogram()
+        self.after(self.REFRESH_MS, self.refresh)
+
+    def draw_histogram(self):
+        self.canvas.delete('all')
+        selected = self.tree.selection()
+        stat = self.stats.get(selected[0]) if selected else None
+        if stat is None:
+            self.canvas.create_text(10, 10, anchor='nw', text="Select a command to see its latency distribution")
+            return
+
+        counts = stat['histogram']
+        labels = [f"≤{bound:g}" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]:g}"]
+        width = max(self.canvas.winfo_width(), 200)
+        height = max(self.canvas.winfo_height(), 100)
+        bar_width = (width - 20) / len(counts)
+        peak = max(counts) or 1
+        for i, count in enumerate(counts):
+            x0 = 10 + i * bar_width
+            bar_height = (height - 40) * count / peak
+            self.canvas.create_rectangle(x0 + 2, height - 20 - bar_height, x0 + bar_width - 2, height - 20,
+                                         fill='#4a90d9', outline='')
+            self.canvas.create_text(x0 + bar_width / 2, height - 10, text=labels[i], font=('Arial', 8))
+            if count:
+                self.canvas.create_text(x0 + bar_width / 2, height - 26 - bar_height, text=str(count),
+                                        font=('Arial', 8))
+        self.canvas.create_text(width - 10, 5, anchor='ne', font=('Arial', 8),
+                                text=f"{stat['backend']} {stat['command']} latency (ms)")
+
+    def clear(self):
+        self.command_log.clear()
+
+    def dump(self):
+        """Write the buffered commands to an NDJSON file"""
+        filename = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".ndjson",
+            filetypes=[("NDJSON files", "*.ndjson"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            count = self.command_log.dump(filename)
+            messagebox.showinfo("Success", f"{count} commands written to {filename}", parent=self)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to write command log:\n{str(e)}", parent=self)
+
+
+class RedisMemoryDialog(tk.Toplevel):
+    """Background SCAN over the keyspace reporting memory by prefix and type and the biggest keys"""
+
+    def __init__(self, parent, main_app):
+        super().__init__(parent)
+        self.main_app = main_app
+        self.report = None
+        self.title("Redis Memory Analysis")
+        self.geometry("1000x650")
+
+        # Scan options
+        opt_frame = ttk.LabelFrame(self, text="Options", padding=10)
+        opt_frame.pack(fill='x', padx=10, pady=5)
+
+        def field(row, column, label, default, width=10):
+            ttk.Label(opt_frame, text=label).grid(row=row, column=column * 2, sticky='w', padx=5, pady=2)
+            entry = ttk.Entry(opt_frame, width=width)
+            entry.insert(0, str(default))
+            entry.grid(row=row, column=column * 2 + 1, sticky='w', padx=5, pady=2)
+            return entry
+
+        settings = main_app.config_manager
+        self.match_entry = field(0, 0, "Match:", main_app.redis_pattern.get() or '*', width=20)
+        ttk.Label(opt_frame, text="Type:").grid(row=0, column=2, sticky='w', padx=5, pady=2)
+        self.type_combo = ttk.Combobox(opt_frame, values=('',) + KEY_TYPES, width=8, state='readonly')
+        self.type_combo.set(main_app.redis_type_filter.get())
+        self.type_combo.grid(row=0, column=3, sticky='w', padx=5, pady=2)
+        self.delimiter_entry = field(0, 2, "Delimiter:", main_app.redis_delimiter.get() or ':', width=4)
+        self.depth_entry = field(0, 3, "Prefix depth:", 2, width=4)
+        self.sample_entry = field(1, 0, "Sample %:", settings.get_setting('redis_memory_sample_percent', 100))
+        self.samples_entry = field(1, 1, "MEMORY SAMPLES:", settings.get_setting('redis_memory_samples', 5))
+        self.top_entry = field(1, 2, "Top keys:", 100, width=6)
+        self.ops_entry = field(1, 3, "Max ops/sec:", settings.get_setting('redis_memory_max_ops', 5000), width=8)
+
+        control_frame = ttk.Frame(self)
+        control_frame.pack(fill='x', padx=10, pady=5)
+        self.start_btn = ttk.Button(control_frame, text="Analyze", command=self.start)
+        self.start_btn.pack(side='left', padx=5)
+        self.stop_btn = ttk.Button(control_frame, text="Stop", command=self.stop, state='disabled')
+        self.stop_btn.pack(side='left', padx=5)
+        self.progress = ttk.Progressbar(control_frame, mode='determinate', maximum=1000, length=200)
+        self.progress.pack(side='left', padx=10)
+        self.status_label = ttk.Label(control_frame, text="")
+        self.status_label.pack(side='left', padx=5)
+
+        # Results
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill='both', expand=True, padx=10, pady=5)
+        group_columns = ('keys', 'memory', 'share', 'elements', 'types')
+        group_headings = {'keys': 'Keys', 'memory': 'Memory', 'share': '% of Memory', 'elements': 'Elements',
+                          'types': 'Types'}
+        self.prefix_tree = self.add_tree(notebook, "By Prefix", "Prefix", group_columns, group_headings)
+        self.type_tree = self.add_tree(notebook, "By Type", "Type", group_columns, group_headings)
+        self.memory_tree = self.add_tree(notebook, "Biggest Keys", "Key", ('type', 'size'),
+                                         {'type': 'Type', 'size': 'Memory'})
+        self.length_tree = self.add_tree(notebook, "Longest Keys", "Key", ('type', 'size'),
+                                         {'type': 'Type', 'size': 'Elements (bytes for strings)'})
+        for tree in (self.memory_tree, self.length_tree):
+            tree.bind('<Double-1>', self.open_key)
+
+        # Buttons
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill='x', padx=10, pady=10)
+
+        self.summary_label = ttk.Label(btn_frame, text="")
+        self.summary_label.pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Close", command=self.close).pack(side='right', padx=5)
+        ttk.Button(btn_frame, text="Export Report...", command=self.export).pack(side='right', padx=5)
+        self.protocol('WM_DELETE_WINDOW', self.close)
+
+        self.transient(parent)
+
+    @staticmethod
+    def add_tree(notebook, title, name_heading, columns, headings):
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=title)
+        tree = ttk.Treeview(frame, columns=columns, show='tree headings')
+        tree.heading('#0', text=name_heading)
+        tree.column('#0', width=380)
+        for column in columns:
+            tree.heading(column, text=headings[column])
+            tree.column(column, width=220 if column == 'types' else 110, anchor='w' if column == 'types' else 'e')
+        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        return tree
+
+    @property
+    def job_key(self):
+        return (self, 'analyze')
+
+    def start(self):
+        if not self.main_app.redis_client:
+            messagebox.showerror("Error", "Please connect to Redis first!", parent=self)
+            return
+        try:
+            sample_percent = float(self.sample_entry.get())
+            memory_samples = int(self.samples_entry.get())
+            top_n = int(self.top_entry.get())
+            max_ops = int(self.ops_entry.get())
+            depth = int(self.depth_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Sample %, MEMORY SAMPLES, top keys, max ops/sec and prefix depth "
+                                          "must be numbers", parent=self)
+            return
+        if not 0 < sample_percent <= 100:
+            messagebox.showerror("Error", "Sample % must be between 0 and 100", parent=self)
+            return
+
+        settings = self.main_app.config_manager
+        settings.update_setting('redis_memory_sample_percent', sample_percent)
+        settings.update_setting('redis_memory_samples', memory_samples)
+        settings.update_setting('redis_memory_max_ops', max_ops)
+
+        analyzer = MemoryAnalyzer(
+            self.main_app.redis_client, match=self.match_entry.get().strip(), key_type=self.type_combo.get(),
+            delimiter=self.delimiter_entry.get(), prefix_depth=depth, sample_rate=sample_percent / 100,
+            memory_samples=memory_samples, top_n=top_n, scan_count=settings.get_setting('redis_scan_count', 1000),
+            max_ops=max_ops
+        )
+
+        def on_progress(progress):
+            if not self.winfo_exists():
+                return
+            total = progress['total']
+            if total:
+                self.progress['value'] = min(progress['scanned'] / total, 1.0) * 1000
+            self.status_label.config(text=(
+                f"{progress['scanned']:,} keys scanned, {progress['measured']:,} measured "
+                f"({progress['keys_per_sec']:,.0f} keys/sec)"
+            ))
+            self.show_report(progress['report'])
+
+        def on_done(report):
+            if not self.winfo_exists():
+                return
+            self.stop_btn.config(state='disabled')
+            self.start_btn.config(state='normal')
+            self.progress['value'] = 1000
+            self.status_label.config(text=f"Done in {report['seconds']:.1f}s "
+                                          f"({report['throttled_seconds']:.1f}s throttled)")
+            self.show_report(report)
+
+        def on_error(error):
+            if not self.winfo_exists():
+                return
+            self.stop_btn.config(state='disabled')
+            self.start_btn.config(state='normal')
+            self.status_label.config(text="Error")
+            messagebox.showerror("Error", f"Memory analysis failed:\n{str(error)}", parent=self)
+
+        def on_cancel():
+            if not self.winfo_exists():
+                return
+            self.stop_btn.config(state='disabled')
+            self.start_btn.config(state='normal')
+            self.status_label.config(text="Stopped; the report covers the keys scanned so far")
+
+        self.report = None
+        self.progress['value'] = 0
+        self.main_app.query_executor.submit(self.job_key, analyzer.run, on_done, on_error, on_cancel,
+                                            on_progress=on_progress)
+        self.start_btn.config(state='disabled')
+        self.stop_btn.config(state='normal')
+        self.status_label.config(text="Scanning...")
+
+    def stop(self):
+        self.main_app.query_executor.cancel(self.job_key)
+
+    def show_report(self, report):
+        self.report = report
+        total = report['estimated_memory'] or 1
+
+        def fill_groups(tree, groups, label=lambda name: name):
+            tree.delete(*tree.get_children())
+            for group in groups:
+                types = ', '.join(f"{key_type} {count:,}" for key_type, count in group['types'].items())
+                tree.insert('', 'end', text=label(group['name']), values=(
+                    f"{group['keys']:,}", format_bytes(group['memory']), f"{group['memory'] * 100 / total:.1f}%",
+                    f"{group['elements']:,}", types
+                ))
+
+        def fill_keys(tree, keys, size):
+            tree.delete(*tree.get_children())
+            for entry in keys:
+                tree.insert('', 'end', text=entry['key'], values=(entry['type'], size(entry['size'])))
+
+        fill_groups(self.prefix_tree, report['prefixes'], lambda name: name or "(no prefix)")
+        fill_groups(self.type_tree, report['types'])
+        fill_keys(self.memory_tree, report['top_memory'], format_bytes)
+        fill_keys(self.length_tree, report['top_elements'], lambda size: f"{size:,}")
+
+        estimate = '' if report['sample_rate'] >= 1 else f" (estimated from a {report['sample_rate']:.1%} sample)"
+        summary = f"{report['scanned']:,} keys, {format_bytes(report['estimated_memory'])} measured{estimate}"
+        if report['server'].get('used_memory'):
+            summary += f"; server used_memory {format_bytes(report['server']['used_memory'])}"
+        if not report['memory_available']:
+            summary += "; MEMORY USAGE is not available on this server"
+        self.summary_label.config(text=summary)
+
+    def open_key(self, event):
+        """Show the double-clicked key in the main window's Redis tab"""
+        tree = event.widget
+        selected = tree.selection()
+        if not selected:
+            return
+        self.main_app.redis_key.delete(0, 'end')
+        self.main_app.redis_key.insert(0, tree.item(selected[0], 'text'))
+
+    def export(self):
+        if self.report is None:
+            messagebox.showinfo("Info", "Nothing to export yet", parent=self)
+            return
+        filename = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            export_report(self.report, filename)
+            messagebox.showinfo("Success", f"Report written to {filename}", parent=self)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to write report:\n{str(e)}", parent=self)
+
+    def close(self):
+        self.stop()
+        self.destroy()
+
+
+class ProgressDialog(tk.Toplevel):
+    """Progress bar for a long-running transfer, with a Cancel button"""
+
+    def __init__(self, parent, title, on_cancel=None):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("500x130")
+        self.resizable(False, False)
+
+        self.progress = ttk.Progressbar(self, mode='determinate', maximum=1000)
+        self.progress.pack(fill='x', padx=10, pady=(15, 5))
+
+        self.status_label = ttk.Label(self, text="Starting...")
+        self.status_label.pack(anchor='w', padx=10)
+
+        self.cancel_btn = ttk.Button(self, text="Cancel", command=self.cancel)
+        self.cancel_btn.pack(side='right', padx=10, pady=10)
+        self.on_cancel = on_cancel
+        self.protocol('WM_DELETE_WINDOW', self.cancel)
+
+        self.transient(parent)
+
+    def update_progress(self, fraction, text):
+        """fraction in [0, 1], or None for an unknown total"""
+        if fraction is None:
+            if self.progress['mode'] != 'indeterminate':
+                self.progress.config(mode='indeterminate')
+                self.progress.start(50)
+        else:
+            self.progress['value'] = min(fraction, 1.0) * 1000
+        self.status_label.config(text=text)
+
+    def cancel(self):
+        self.cancel_btn.config(state='disabled')
+        self.status_label.config(text="Stopping...")
+        if self.on_cancel:
+            self.on_cancel()
+
+
+class PipelineBuilderDialog(tk.Toplevel):
+    """Stage-by-stage aggregation editor with previews over a bounded input"""
+
+    def __init__(self, parent, main_app, tab, pipeline):
+        super().__init__(parent)
+        self.main_app = main_app
+        self.tab = tab
+        self.database = tab['db_entry'].get().strip()
+        self.collection = tab['coll_entry'].get().strip()
+        self.stages = list(pipeline)
+        self.results = {}
+        self.current = None
+        self.title(f"Pipeline Builder - {self.database}.{self.collection}")
+        self.geometry("1100x700")
+
+        # Input bounds
+        opt_frame = ttk.Frame(self)
+        opt_frame.pack(fill='x', padx=10, pady=5)
+
+        ttk.Label(opt_frame, text="Input:").pack(side='left', padx=5)
+        self.mode_var = tk.StringVar(value='sample')
+        ttk.Radiobutton(opt_frame, text="$sample", variable=self.mode_var, value='sample').pack(side='left')
+        ttk.Radiobutton(opt_frame, text="$limit", variable=self.mode_var, value='limit').pack(side='left')
+        self.size_entry = ttk.Entry(opt_frame, width=8)
+        self.size_entry.insert(0, "1000")
+        self.size_entry.pack(side='left', padx=5)
+        ttk.Label(opt_frame, text="docs").pack(side='left')
+
+        ttk.Button(opt_frame, text="Preview", command=self.preview).pack(side='left', padx=10)
+        self.stop_btn = ttk.Button(opt_frame, text="Stop", command=self.stop, state='disabled')
+        self.stop_btn.pack(side='left', padx=5)
+        self.status_label = ttk.Label(opt_frame, text="")
+        self.status_label.pack(side='left', padx=10)
+
+        paned = ttk.PanedWindow(self, orient='horizontal')
+        paned.pack(fill='both', expand=True, padx=10, pady=5)
+
+        # Stage list with per-stage output counts and timings
+        left_frame = ttk.Frame(paned)
+        paned.add(left_frame, weight=1)
+
+        columns = ('operator', 'count', 'stage_ms', 'total_ms')
+        self.stage_tree = ttk.Treeview(left_frame, columns=columns, show='headings', selectmode='browse')
+        self.stage_tree.heading('operator', text='Stage')
+        self.stage_tree.heading('count', text='Docs Out')
+        self.stage_tree.heading('stage_ms', text='+ms')
+        self.stage_tree.heading('total_ms', text='Total ms')
+        self.stage_tree.column('operator', width=140)
+        self.stage_tree.column('count', width=80, anchor='e')
+        self.stage_tree.column('stage_ms', width=70, anchor='e')
+        self.stage_tree.column('total_ms', width=80, anchor='e')
+        self.stage_tree.tag_configure('error', foreground='red')
+        self.stage_tree.pack(fill='both', expand=True)
+        self.stage_tree.bind('<<TreeviewSelect>>', self.on_select)
+
+        stage_btn_frame = ttk.Frame(left_frame)
+        stage_btn_frame.pack(fill='x', pady=5)
+        ttk.Button(stage_btn_frame, text="Add", command=self.add_stage, width=6).pack(side='left', padx=2)
+        ttk.Button(stage_btn_frame, text="Remove", command=self.remove_stage, width=8).pack(side='left', padx=2)
+        ttk.Button(stage_btn_frame, text="Up", command=lambda: self.move_stage(-1), width=5).pack(side='left', padx=2)
+        ttk.Button(stage_btn_frame, text="Down", command=lambda: self.move_stage(1), width=6).pack(side='left', padx=2)
+
+        # Stage editor and output preview
+        right_frame = ttk.Frame(paned)
+        paned.add(right_frame, weight=2)
+
+        ttk.Label(right_frame, text="Stage (JSON):").pack(anchor='w')
+        self.stage_text = JsonHighlightText(right_frame, width=60, height=8)
+        self.stage_text.pack(fill='x')
+        self.stage_text.bind('<KeyRelease>', self.stage_text.on_key_release)
+        ttk.Button(right_frame, text="Apply && Preview", command=self.apply_and_preview).pack(anchor='e', pady=5)
+
+        self.output_label = ttk.Label(right_frame, text="Stage output:")
+        self.output_label.pack(anchor='w')
+        self.output_text = JsonHighlightText(right_frame, width=60, height=20)
+        self.output_text.pack(fill='both', expand=True)
+
+        # Buttons
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill='x', padx=10, pady=10)
+
+        ttk.Button(btn_frame, text="Use in Query Tab", command=self.use_in_tab).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Close", command=self.close).pack(side='right', padx=5)
+        self.protocol('WM_DELETE_WINDOW', self.close)
+
+        self.refresh_stages()
+        if self.stages:
+            self.select(0)
+
+        self.transient(parent)
+
+    @property
+    def job_key(self):
+        return (self, 'preview')
+
+    def refresh_stages(self):
+        self.stage_tree.delete(*self.stage_tree.get_children())
+        for i, stage in enumerate(self.stages):
+            result = self.results.get(i)
+            values = (f"{i + 1}. {stage_operator(stage)}", '', '', '')
+            tags = ()
+            if result:
+                if result['error']:
+                    values = (values[0], 'error', '', '')
+                    tags = ('error',)
+                else:
+                    values = (values[0], result['count'], f"{result['stage_ms']:.1f}", f"{result['total_ms']:.1f}")
+            self.stage_tree.insert('', 'end', iid=str(i), values=values, tags=tags)
+
+    def select(self, index):
+        self.stage_tree.selection_set(str(index))
+        self.stage_tree.see(str(index))
+
+    def on_select(self, event):
+        selected = self.stage_tree.selection()
+        if not selected:
+            return
+        index = int(selected[0])
+        if index == self.current:
+            return
+        if self.current is not None and not self.apply_stage():
+            self.select(self.current)
+            return
+        self.current = index
+
+        self.stage_text.delete('1.0', 'end')
+        self.stage_text.insert('1.0', json.dumps(self.stages[index], indent=2, ensure_ascii=False))
+        self.stage_text.highlight()
+        self.show_output(index)
+
+    def show_output(self, index):
+        result = self.results.get(index)
+        self.output_text.delete('1.0', 'end')
+        if result is None:
+            self.output_label.config(text="Stage output: not previewed")
+            return
+        if result['error']:
+            self.output_label.config(text="Stage output: error")
+            self.output_text.insert('1.0', result['error'])
+            return
+        self.output_label.config(
+            text=f"Stage output: {result['count']} documents (first {len(result['documents'])} shown)"
+        )
+        self.output_text.insert('1.0', to_extended_json(result['documents']))
+        self.output_text.highlight()
+
+    def apply_stage(self) -> bool:
+        """Store the editor's JSON into the selected stage"""
+        if self.current is None:
+            return True
+        try:
+            stage = json.loads(self.stage_text.get('1.0', 'end-1c'))
+        except json.JSONDecodeError as e:
+            messagebox.showerror("JSON Error", f"Invalid stage JSON:\n{str(e)}", parent=self)
+            return False
+        if not isinstance(stage, dict) or len(stage) != 1 or not next(iter(stage)).startswith('$'):
+            messagebox.showerror("Error", "A stage must be an object with one $operator", parent=self)
+            return False
+        if stage != self.stages[self.current]:
+            self.stages[self.current] = stage
+            # This and later stages see different input now
+            self.results = {i: r for i, r in self.results.items() if i < self.current}
+            for i in range(self.current, len(self.stages)):
+                self.stage_tree.item(str(i), values=(f"{i + 1}. {stage_operator(self.stages[i])}", '', '', ''),
+                                     tags=())
+        return True
+
+    def apply_and_preview(self):
+        if self.apply_stage():
+            current = self.current
+            self.current = None
+            self.refresh_stages()
+            if current is not None:
+                self.select(current)
+            self.preview()
+
+    def add_stage(self):
+        if not self.apply_stage():
+            return
+        index = self.current + 1 if self.current is not None else len(self.stages)
+        self.stages.insert(index, {'$match': {}})
+        self.results = {i: r for i, r in self.results.items() if i < index}
+        self.current = None
+        self.refresh_stages()
+        self.select(index)
+
+    def remove_stage(self):
+        if self.current is None:
+            return
+        index = self.current
+        del self.stages[index]
+        self.results = {i: r for i, r in self.results.items() if i < index}
+        self.current = None
+        self.stage_text.delete('1.0', 'end')
+        self.refresh_stages()
+        if self.stages:
+            self.select(min(index, len(self.stages) - 1))
+
+    def move_stage(self, step):
+        if self.current is None or not self.apply_stage():
+            return
+        index = self.current
+        target = index + step
+        if not 0 <= target < len(self.stages):
+            return
+        self.stages[index], self.stages[target] = self.stages[target], self.stages[index]
+        self.results = {i: r for i, r in self.results.items() if i < min(index, target)}
+        self.current = None
+        self.refresh_stages()
+        self.select(target)
+
+    def preview(self):
+        """Run every stage prefix over the bounded input; rows fill in as stages finish"""
+        if not self.main_app.mongo_client:
+            messagebox.showerror("Error", "Please connect to MongoDB first!", parent=self)
+            return
+        if not self.stages or not self.apply_stage():
+            return
+        try:
+            size = int(self.size_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Input size must be a number", parent=self)
+            return
+
+        coll = self.main_app.mongo_client[self.database][self.collection]
+        stages = list(self.stages)
+        mode = self.mode_var.get()
+        self.results = {}
+        self.refresh_stages()
+        if self.current is not None:
+            self.select(self.current)
+
+        def on_progress(result):
+            if not self.winfo_exists():
+                return
+            self.results[result['index']] = result
+            item = str(result['index'])
+            if not self.stage_tree.exists(item):
+                return
+            if result['error']:
+                self.stage_tree.item(item, values=(self.stage_tree.item(item, 'values')[0], 'error', '', ''),
+                                     tags=('error',))
+            else:
+                self.stage_tree.item(item, values=(
+                    self.stage_tree.item(item, 'values')[0], result['count'],
+                    f"{result['stage_ms']:.1f}", f"{result['total_ms']:.1f}"
+                ))
+            if result['index'] == self.current:
+                self.show_output(self.current)
+
+        def on_done(results):
+            if not self.winfo_exists():
+                return
+            self.stop_btn.config(state='disabled')
+            total = results[-1]['total_ms'] if results and results[-1]['total_ms'] is not None else 0
+            self.status_label.config(text=f"Previewed {len(results)} of {len(stages)} stages ({total:.0f} ms)")
+
+        def on_error(error):
+            if not self.winfo_exists():
+                return
+            self.stop_btn.config(state='disabled')
+            self.status_label.config(text="Error")
+            messagebox.showerror("Error", f"Preview failed:\n{str(error)}", parent=self)
+
+        def on_cancel():
+            if not self.winfo_exists():
+                return
+            self.stop_btn.config(state='disabled')
+            self.status_label.config(text="Cancelled")
+
+        self.main_app.query_executor.submit(
+            self.job_key,
+            lambda job: preview_pipeline(coll, stages, mode=mode, size=size, job=job),
+            on_done, on_error, on_cancel, mongo_client=self.main_app.mongo_client, on_progress=on_progress
+        )
+        self.stop_btn.config(state='normal')
+        self.status_label.config(text="Previewing...")
+
+    def stop(self):
+        self.main_app.query_executor.cancel(self.job_key)
+
+    def use_in_tab(self):
+        """Write the pipeline back into the query tab as an aggregate"""
+        if not self.apply_stage():
+            return
+        self.tab['query_type_var'].set('aggregate')
+        self.tab['query_text'].delete('1.0', 'end')
+        self.tab['query_text'].insert('1.0', json.dumps(self.stages, indent=2, ensure_ascii=False))
+        self.tab['query_text'].highlight()
+        self.close()
+
+    def close(self):
+        self.stop()
+        self.destroy()
+
+
 class FavoritesDialog(tk.Toplevel):
     """Dialog for managing favorites"""
 
@@ -1794,6 +4454,7 @@ class FavoritesDialog(tk.Toplevel):
                 current_tab['query_text'].delete('1.0', 'end')
                 current_tab['query_text'].insert('1.0', fav['query'])
                 current_tab['query_text'].highlight()
+                self.main_app.set_mongo_tab_options(current_tab, fav.get('options'))
 
             elif self.db_type == 'redis':
                 # Parse command
@@ -1834,14 +4495,14 @@ class HistoryDialog(tk.Toplevel):
         self.db_type = db_type
         self.main_app = main_app
         self.title(f"{db_type.upper()} Query History")
-        self.geometry("900x500")
+        self.geometry("1100x500")
 
         # List frame
         list_frame = ttk.LabelFrame(self, text="History", padding=10)
         list_frame.pack(fill='both', expand=True, padx=10, pady=10)
 
         # Treeview
-        columns = ('time', 'query', 'database', 'collection', 'exec_time')
+        columns = ('time', 'query', 'database', 'collection', 'exec_time', 'breakdown')
         self.tree = ttk.Treeview(list_frame, columns=columns, show='headings')
 
         self.tree.heading('time', text='Time')
@@ -1849,12 +4510,14 @@ class HistoryDialog(tk.Toplevel):
         self.tree.heading('database', text='Database')
         self.tree.heading('collection', text='Collection')
         self.tree.heading('exec_time', text='Exec Time (s)')
+        self.tree.heading('breakdown', text='Breakdown')
 
         self.tree.column('time', width=150)
         self.tree.column('query', width=350)
         self.tree.column('database', width=100)
         self.tree.column('collection', width=100)
         self.tree.column('exec_time', width=100)
+        self.tree.column('breakdown', width=250)
 
         self.tree.pack(fill='both', expand=True, side='left')
 
@@ -1893,7 +4556,8 @@ class HistoryDialog(tk.Toplevel):
                 item['query'][:60] + '...' if len(item['query']) > 60 else item['query'],
                 item.get('database', ''),
                 item.get('collection', ''),
-                f"{item.get('execution_time', 0):.3f}"
+                f"{item.get('execution_time', 0):.3f}",
+                format_timings(item.get('timings', {}))
             ))
 
     def load_history(self):
@@ -1926,6 +4590,7 @@ class HistoryDialog(tk.Toplevel):
                 current_tab['query_text'].delete('1.0', 'end')
                 current_tab['query_text'].insert('1.0', item['query'])
                 current_tab['query_text'].highlight()
+                self.main_app.set_mongo_tab_options(current_tab, item.get('options'))
 
             elif self.db_type == 'redis':
                 # Parse command
@@ -1952,11 +4617,12 @@ class HistoryDialog(tk.Toplevel):
 class SettingsDialog(tk.Toplevel):
     """Dialog for application settings"""
 
-    def __init__(self, parent, config_manager):
+    def __init__(self, parent, config_manager, main_app):
         super().__init__(parent)
         self.config_manager = config_manager
+        self.main_app = main_app
         self.title("Settings")
-        self.geometry("500x400")
+        self.geometry("520x750")
 
         # Settings frame
         settings_frame = ttk.LabelFrame(self, text="Settings", padding=20)
@@ -1997,6 +4663,56 @@ class SettingsDialog(tk.Toplevel):
         ttk.Entry(settings_frame, textvariable=self.refresh_interval_var, width=10).grid(row=row, column=1, sticky='w', pady=10)
         row += 1
 
+        # Result cache
+        ttk.Label(settings_frame, text="Result Cache Size (MB):").grid(row=row, column=0, sticky='w', pady=10)
+        self.cache_max_mb_var = tk.StringVar(value=str(config_manager.get_setting('cache_max_mb', 64)))
+        ttk.Entry(settings_frame, textvariable=self.cache_max_mb_var, width=10).grid(row=row, column=1, sticky='w', pady=10)
+        row += 1
+
+        ttk.Label(settings_frame, text="Result Cache TTL (s, 0 = none):").grid(row=row, column=0, sticky='w', pady=10)
+        self.cache_ttl_var = tk.StringVar(value=str(config_manager.get_setting('cache_ttl', 300)))
+        ttk.Entry(settings_frame, textvariable=self.cache_ttl_var, width=10).grid(row=row, column=1, sticky='w', pady=10)
+        row += 1
+
+        # Schema analysis
+        ttk.Label(settings_frame, text="Schema Sample Size:").grid(row=row, column=0, sticky='w', pady=10)
+        self.schema_sample_size_var = tk.StringVar(value=str(config_manager.get_setting('schema_sample_size', 1000)))
+        ttk.Entry(settings_frame, textvariable=self.schema_sample_size_var, width=10).grid(row=row, column=1, sticky='w', pady=10)
+        row += 1
+
+        # Bulk import
+        ttk.Label(settings_frame, text="Import Batch Size:").grid(row=row, column=0, sticky='w', pady=10)
+        self.import_batch_size_var = tk.StringVar(value=str(config_manager.get_setting('import_batch_size', 1000)))
+        ttk.Entry(settings_frame, textvariable=self.import_batch_size_var, width=10).grid(row=row, column=1, sticky='w', pady=10)
+        row += 1
+
+        ttk.Label(settings_frame, text="Import Workers / In-flight Batches:").grid(row=row, column=0, sticky='w', pady=10)
+        import_frame = ttk.Frame(settings_frame)
+        import_frame.grid(row=row, column=1, sticky='w', pady=10)
+        self.import_workers_var = tk.StringVar(value=str(config_manager.get_setting('import_workers', 4)))
+        ttk.Entry(import_frame, textvariable=self.import_workers_var, width=5).pack(side='left')
+        ttk.Label(import_frame, text=" / ").pack(side='left')
+        self.import_window_var = tk.StringVar(value=str(config_manager.get_setting('import_window', 8)))
+        ttk.Entry(import_frame, textvariable=self.import_window_var, width=5).pack(side='left')
+        row += 1
+
+        # Command log
+        ttk.Label(settings_frame, text="Command Log Size:").grid(row=row, column=0, sticky='w', pady=10)
+        self.command_log_size_var = tk.StringVar(value=str(config_manager.get_setting('command_log_size', 10000)))
+        ttk.Entry(settings_frame, textvariable=self.command_log_size_var, width=10).grid(row=row, column=1, sticky='w', pady=10)
+        row += 1
+
+        # Redis key browser
+        ttk.Label(settings_frame, text="Redis SCAN COUNT / Page Size:").grid(row=row, column=0, sticky='w', pady=10)
+        scan_frame = ttk.Frame(settings_frame)
+        scan_frame.grid(row=row, column=1, sticky='w', pady=10)
+        self.redis_scan_count_var = tk.StringVar(value=str(config_manager.get_setting('redis_scan_count', 1000)))
+        ttk.Entry(scan_frame, textvariable=self.redis_scan_count_var, width=7).pack(side='left')
+        ttk.Label(scan_frame, text=" / ").pack(side='left')
+        self.redis_page_size_var = tk.StringVar(value=str(config_manager.get_setting('redis_page_size', 500)))
+        ttk.Entry(scan_frame, textvariable=self.redis_page_size_var, width=7).pack(side='left')
+        row += 1
+
         # Buttons
         btn_frame = ttk.Frame(self)
         btn_frame.pack(fill='x', padx=10, pady=10)
@@ -2015,6 +4731,16 @@ class SettingsDialog(tk.Toplevel):
             self.config_manager.update_setting('page_size', int(self.page_size_var.get()))
             self.config_manager.update_setting('auto_refresh', self.auto_refresh_var.get())
             self.config_manager.update_setting('refresh_interval', int(self.refresh_interval_var.get()))
+            self.config_manager.update_setting('cache_max_mb', int(self.cache_max_mb_var.get()))
+            self.config_manager.update_setting('cache_ttl', int(self.cache_ttl_var.get()))
+            self.config_manager.update_setting('schema_sample_size', int(self.schema_sample_size_var.get()))
+            self.config_manager.update_setting('import_batch_size', int(self.import_batch_size_var.get()))
+            self.config_manager.update_setting('import_workers', int(self.import_workers_var.get()))
+            self.config_manager.update_setting('import_window', int(self.import_window_var.get()))
+            self.config_manager.update_setting('command_log_size', int(self.command_log_size_var.get()))
+            self.config_manager.update_setting('redis_scan_count', int(self.redis_scan_count_var.get()))
+            self.config_manager.update_setting('redis_page_size', int(self.redis_page_size_var.get()))
+            self.main_app.apply_settings()
 
             messagebox.showinfo("Success", "Settings saved successfully")
             self.destroy()
@@ -0,0 +1,223 @@
+from typing import Dict, List, Optional
+
+
+CHILD_STAGE_FIELDS = ('inputStage', 'outerStage', 'innerStage', 'thenStage', 'elseStage')
+# Slot-based engine (SBE) stages named after the classic stage doing the same work
+SBE_STAGES = {
+    'scan': 'COLLSCAN',
+    'coscan': 'COLLSCAN',
+    'ixscan': 'IXSCAN',
+    'ixseek': 'IXSCAN',
+    'ixscan_generic': 'IXSCAN',
+    'seek': 'FETCH',
+    'sort': 'SORT',
+    'limit': 'LIMIT',
+    'limitskip': 'LIMIT',
+}
+
+
+def stage_name(name: str) -> str:
+    """Classic name of an execution stage; SBE stages are lowercase"""
+    if name.islower():
+        return SBE_STAGES.get(name, name.upper())
+    return name
+
+
+def build_explain_command(collection: str, query_type: str, query, options: Optional[Dict] = None,
+                          limit: int = 0) -> Dict:
+    """Build the command explained for a query tab's find, aggregate or count"""
+    options = options or {}
+
+    if query_type == 'aggregate':
+        command = {
+            'aggregate': collection,
+            'pipeline': query if isinstance(query, list) else [query],
+            'cursor': {}
+        }
+    elif query_type == 'count':
+        command = {'count': collection, 'query': query}
+    else:
+        command = {'find': collection, 'filter': query}
+        if options.get('projection'):
+            command['projection'] = options['projection']
+        if options.get('sort'):
+            command['sort'] = options['sort']
+        if limit:
+            command['limit'] = limit
+
+    for name in ('hint', 'collation'):
+        if name in options:
+            command[name] = options[name]
+    if 'max_time_ms' in options:
+        command['maxTimeMS'] = options['max_time_ms']
+    return command
+
+
+def run_explain(db, collection: str, query_type: str, query, options: Optional[Dict] = None,
+                limit: int = 0, comment: Optional[str] = None) -> Dict:
+    """Run explain with executionStats verbosity"""
+    command = build_explain_command(collection, query_type, query, options, limit)
+    explain = {'explain': command, 'verbosity': 'executionStats'}
+    if comment:
+        explain['comment'] = comment
+    return db.command(explain)
+
+
+def stage_node(stage: Dict) -> Dict:
+    """Normalize one classic or SBE execution stage (and its inputs) into a plan node"""
+    name = stage_name(stage.get('stage', '?'))
+    # SBE stages count what they read as numReads
+    reads = stage.get('numReads')
+    node = {
+        'stage': name,
+        'nReturned': stage.get('nCounted', stage.get('nReturned')),
+        'docsExamined': stage.get('docsExamined', reads if name in ('COLLSCAN', 'FETCH') else None),
+        'keysExamined': stage.get('keysExamined', reads if name == 'IXSCAN' else None),
+        'time_ms': stage.get('executionTimeMillisEstimate'),
+        'details': stage_details(stage, name),
+        'warning': None,
+        'children': []
+    }
+
+    if name == 'COLLSCAN':
+        node['warning'] = 'Collection scan'
+    elif name == 'SORT':
+        node['warning'] = 'In-memory sort'
+        if stage.get('usedDisk'):
+            node['warning'] += ' (spilled to disk)'
+
+    for field in CHILD_STAGE_FIELDS:
+        if isinstance(stage.get(field), dict):
+            node['children'].append(stage_node(stage[field]))
+    for child in stage.get('inputStages', []):
+        node['children'].append(stage_node(child))
+    # Sharded explains nest each shard's plan under the merge stage
+    for shard in stage.get('shards', []):
+        shard_node = {
+            'stage': f"shard: {shard.get('shardName', '?')}", 'nReturned': shard.get('nReturned'),
+            'docsExamined': shard.get('totalDocsExamined'), 'keysExamined': shard.get('totalKeysExamined'),
+            'time_ms': shard.get('executionTimeMillis'), 'details': '', 'warning': None, 'children': []
+        }
+        if isinstance(shard.get('executionStages'), dict):
+            shard_node['children'].append(stage_node(shard['executionStages']))
+        node['children'].append(shard_node)
+    return node
+
+
+def stage_details(stage: Dict, name: str) -> str:
+    parts = []
+    if stage.get('indexName'):
+        parts.append(f"index: {stage['indexName']}")
+    if stage.get('keyPattern'):
+        parts.append(f"keys: {stage['keyPattern']}")
+    if stage.get('direction') and name in ('IXSCAN', 'COLLSCAN'):
+        parts.append(f"direction: {stage['direction']}")
+    if stage.get('sortPattern'):
+        parts.append(f"sort: {stage['sortPattern']}")
+    if stage.get('filter'):
+        parts.append(f"filter: {stage['filter']}")
+    if stage.get('limitAmount'):
+        parts.append(f"limit: {stage['limitAmount']}")
+    return ', '.join(parts)
+
+
+def execution_tree(execution_stats: Dict) -> Optional[Dict]:
+    stages = execution_stats.get('executionStages')
+    if not isinstance(stages, dict):
+        return None
+    if 'stage' not in stages and isinstance(stages.get('queryPlan'), dict):
+        stages = stages['queryPlan']
+    return stage_node(stages)
+
+
+def pipeline_nodes(stages: List[Dict]) -> List[Dict]:
+    """Plan nodes for the stages of an aggregation explain"""
+    nodes = []
+    for stage in stages:
+        name = next((key for key in stage if key.startswith('$')), '?')
+        body = stage.get(name)
+
+        if name == '$cursor' and isinstance(body, dict):
+            stats = body.get('executionStats', {})
+            node = {
+                'stage': name,
+                'nReturned': stats.get('nReturned', stage.get('nReturned')),
+                'docsExamined': stats.get('totalDocsExamined'),
+                'keysExamined': stats.get('totalKeysExamined'),
+                'time_ms': stats.get('executionTimeMillis', stage.get('executionTimeMillisEstimate')),
+                'details': '',
+                'warning': None,
+                'children': []
+            }
+            child = execution_tree(stats)
+            if child:
+                node['children'].append(child)
+        else:
+            node = {
+                'stage': name,
+                'nReturned': stage.get('nReturned'),
+                'docsExamined': None,
+                'keysExamined': None,
+                'time_ms': stage.get('executionTimeMillisEstimate'),
+                'details': str(body)[:200] if body is not None else '',
+                'warning': 'In-memory sort' if name == '$sort' else None,
+                'children': []
+            }
+            if name == '$sort' and stage.get('usedDisk'):
+                node['warning'] += ' (spilled to disk)'
+        nodes.append(node)
+    return nodes
+
+
+def parse_explain(explain: Dict) -> Dict:
+    """Turn an explain reply into {'roots': [plan nodes], 'summary': totals}"""
+    roots = []
+    totals = {'nReturned': 0, 'totalDocsExamined': 0, 'totalKeysExamined': 0, 'executionTimeMillis': 0}
+
+    def add_stats(stats):
+        for key in totals:
+            value = stats.get(key)
+            if isinstance(value, (int, float)):
+                totals[key] = max(totals[key], value) if key == 'executionTimeMillis' else totals[key] + value
+
+    if 'shards' in explain and isinstance(explain['shards'], dict):
+        for shard, shard_explain in explain['shards'].items():
+            shard_result = parse_explain(shard_explain)
+            roots.append({
+                'stage': f"shard: {shard}", 'nReturned': shard_result['summary']['nReturned'],
+                'docsExamined': shard_result['summary']['totalDocsExamined'],
+                'keysExamined': shard_result['summary']['totalKeysExamined'],
+                'time_ms': shard_result['summary']['executionTimeMillis'],
+                'details': '', 'warning': None, 'children': shard_result['roots']
+            })
+            add_stats(shard_result['summary'])
+    elif 'stages' in explain:
+        roots.extend(pipeline_nodes(explain['stages']))
+        for stage in explain['stages']:
+            if isinstance(stage.get('$cursor'), dict):
+                add_stats(stage['$cursor'].get('executionStats', {}))
+        # The pipeline's own output is what the last stage returned
+        if roots and roots[-1].get('nReturned') is not None:
+            totals['nReturned'] = roots[-1]['nReturned']
+    else:
+        stats = explain.get('executionStats', {})
+        root = execution_tree(stats)
+        if root:
+            roots.append(root)
+        add_stats(stats)
+        if root and not stats.get('nReturned') and root['nReturned']:
+            # count reports its result as nCounted on the root stage
+            totals['nReturned'] = root['nReturned']
+
+    returned = max(totals['nReturned'], 1)
+    summary = dict(totals)
+    summary['docsExaminedPerReturned'] = totals['totalDocsExamined'] / returned
+    summary['keysExaminedPerReturned'] = totals['totalKeysExamined'] / returned
+    summary['warnings'] = sorted({node['warning'] for node in walk(roots) if node['warning']})
+    return {'roots': roots, 'summary': summary}
+
+
+def walk(nodes: List[Dict]):
+    for node in nodes:
+        yield node
+        yield from walk(node['children'])
@@ -0,0 +1,307 @@
+import csv
+import datetime
+import gzip
+import io
+import os
+import tempfile
+import time
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from result_buffer import ColumnarResultBuffer
+from result_serializer import to_extended_json
+
+
+FORMATS = ('json', 'ndjson', 'csv', 'parquet')
+
+
+def detect_format(path: str) -> Tuple[str, Optional[str]]:
+    """(format, compression) from a file name such as out.ndjson.zst or out.csv.gz"""
+    name = path.lower()
+    compression = None
+    if name.endswith('.gz'):
+        compression, name = 'gzip', name[:-3]
+    elif name.endswith('.zst'):
+        compression, name = 'zstd', name[:-4]
+
+    if name.endswith('.parquet'):
+        return 'parquet', compression
+    if name.endswith('.csv'):
+        return 'csv', compression
+    if name.endswith('.ndjson') or name.endswith('.jsonl'):
+        return 'ndjson', compression
+    return 'json', compression
+
+
+def open_output(path: str, compression: Optional[str] = None):
+    """Binary file for path, compressed with gzip or zstd if asked"""
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression needs the zstandard package (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'), closefd=True)
+    return open(path, 'wb')
+
+
+def query_cursor(coll, query_type: str, query, options: Optional[Dict] = None, comment: Optional[str] = None):
+    """Unpaged cursor over every result of a query tab's find or aggregate"""
+    options = options or {}
+    kwargs = {'comment': comment, 'batch_size': options.get('batch_size', 1000)}
+    for name in ('hint', 'collation'):
+        if name in options:
+            kwargs[name] = options[name]
+
+    if query_type == 'aggregate':
+        pipeline = query if isinstance(query, list) else [query]
+        writes = [next(iter(stage)) for stage in pipeline
+                  if isinstance(stage, Mapping) and next(iter(stage), None) in ('$out', '$merge')]
+        if writes:
+            # Running the pipeline again would write its output collection a second time
+            raise ValueError(f"Remove the {writes[0]} stage to export an aggregate's results")
+        if 'max_time_ms' in options:
+            kwargs['maxTimeMS'] = options['max_time_ms']
+        kwargs['batchSize'] = kwargs.pop('batch_size')
+        return coll.aggregate(pipeline, allowDiskUse=True, **kwargs)
+    if query_type != 'find':
+        raise ValueError(f"Cannot export the results of a {query_type} query")
+
+    if 'max_time_ms' in options:
+        kwargs['max_time_ms'] = options['max_time_ms']
+    return coll.find(query, projection=options.get('projection'),
+                     sort=list(options.get('sort', {}).items()) or None, **kwargs)
+
+
+class NdjsonWriter:
+    """One relaxed Extended JSON document per line"""
+
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, docs: List[Mapping]):
+        self.out.write(''.join(to_extended_json(doc, indent=None) + '\n' for doc in docs).encode('utf-8'))
+
+    def close(self):
+        pass
+
+
+class JsonArrayWriter(NdjsonWriter):
+    """A JSON array written element by element"""
+
+    def __init__(self, out):
+        super().__init__(out)
+        self.first = True
+        self.out.write(b'[\n')
+
+    def write(self, docs: List[Mapping]):
+        if not docs:
+            return
+        text = ',\n'.join(to_extended_json(doc, indent=None) for doc in docs)
+        self.out.write(((',\n' if not self.first else '') + text).encode('utf-8'))
+        self.first = False
+
+    def close(self):
+        self.out.write(b'\n]\n')
+
+
+def cell_value(value):
+    """Scalar for a flattened field: containers and BSON types become Extended JSON or text"""
+    if value is None or isinstance(value, (bool, int, float, str, datetime.datetime)):
+        return value
+    if isinstance(value, (list, Mapping)):
+        return to_extended_json(value, indent=None)
+    return str(value)
+
+
+def flatten_rows(docs: List[Mapping]) -> List[Dict]:
+    return [{path: cell_value(value) for path, value in ColumnarResultBuffer.flatten(doc)} for doc in docs]
+
+
+class CsvWriter:
+    """CSV with a column for every field of every document.
+
+    The header can only be written once all fields are known, so rows are
+    spooled to a temporary file with the columns seen so far (a column
+    keeps its position once seen) and copied out under the full header,
+    padded to its width, at close.
+    """
+
+    def __init__(self, out):
+        self.text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+        self.spool = tempfile.TemporaryFile('w+', encoding='utf-8', newline='')
+        self.spool_writer = csv.writer(self.spool)
+        self.columns: Dict[str, int] = {}
+
+    def write(self, docs: List[Mapping]):
+        for row in flatten_rows(docs):
+            for column in row:
+                if column not in self.columns:
+                    self.columns[column] = len(self.columns)
+            cells = [''] * len(self.columns)
+            for column, value in row.items():
+                cells[self.columns[column]] = '' if value is None else value
+            self.spool_writer.writerow(cells)
+
+    def close(self):
+        writer = csv.writer(self.text)
+        writer.writerow(list(self.columns))
+        width = len(self.columns)
+        self.spool.seek(0)
+        for cells in csv.reader(self.spool):
+            writer.writerow(cells + [''] * (width - len(cells)))
+        self.spool.close()
+        self.text.flush()
+        self.text.detach()
+
+
+class ParquetWriter:
+    """Parquet row groups, one per batch, with the schema inferred from the first batch.
+
+    Values of later batches that do not fit their column's type are
+    written as null; how many, and in which columns, is kept in coerced
+    and coerced_columns for the export summary.
+    """
+
+    def __init__(self, out, compression: str = 'zstd'):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet export needs the pyarrow package (pip install pyarrow)")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.out = out
+        self.compression = compression
+        self.schema = None
+        self.writer = None
+        self.dropped = set()
+        self.coerced = 0
+        self.coerced_columns = set()
+
+    def write(self, docs: List[Mapping]):
+        rows = flatten_rows(docs)
+        if self.writer is None:
+            try:
+                table = self.pa.Table.from_pylist(rows)
+            except (self.pa.ArrowInvalid, self.pa.ArrowTypeError):
+                # Mixed types within a column: store everything as text
+                columns = list(dict.fromkeys(column for row in rows for column in row))
+                self.schema = self.pa.schema([(column, self.pa.string()) for column in columns])
+                table = self.table(rows)
+            self.schema = table.schema
+            self.writer = self.pq.ParquetWriter(self.out, self.schema, compression=self.compression)
+        else:
+            table = self.table(rows)
+        self.writer.write_table(table)
+
+    def table(self, rows: List[Dict]):
+        columns = {}
+        for field in self.schema:
+            values = [row.get(field.name) for row in rows]
+            columns[field.name] = self.coerce(values, field.type, field.name)
+        for row in rows:
+            self.dropped.update(column for column in row if column not in columns)
+        return self.pa.Table.from_pydict(columns, schema=self.schema)
+
+    def coerce(self, values, arrow_type, column: str):
+        pa = self.pa
+        try:
+            pa.array(values, type=arrow_type)
+            return values
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            pass
+        result = []
+        for value in values:
+            try:
+                pa.array([value], type=arrow_type)
+                result.append(value)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                if pa.types.is_string(arrow_type):
+                    result.append(str(value))
+                else:
+                    result.append(None)
+                    self.coerced += 1
+                    self.coerced_columns.add(column)
+        return result
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def make_writer(out, file_format: str):
+    if file_format == 'ndjson':
+        return NdjsonWriter(out)
+    if file_format == 'csv':
+        return CsvWriter(out)
+    if file_format == 'parquet':
+        return ParquetWriter(out)
+    return JsonArrayWriter(out)
+
+
+def export_cursor(cursor, path: str, file_format: Optional[str] = None, compression: Optional[str] = None,
+                  job=None, total: Optional[int] = None, batch_size: int = 1000,
+                  progress_interval: float = 0.25) -> Dict:
+    """Write every document of cursor to path, holding at most one batch in memory.
+
+    A partially written file is removed if the export fails or is stopped.
+    """
+    if file_format is None:
+        file_format, compression = detect_format(path)
+    if file_format == 'parquet':
+        # Parquet compresses its own pages; an outer gzip/zstd layer would only cost time
+        out = open(path, 'wb')
+    else:
+        out = open_output(path, compression)
+
+    if job is not None:
+        job.attach_cursor(cursor)
+
+    exported = 0
+    start = time.time()
+    last_report = start
+    writer = None
+    try:
+        writer = make_writer(out, file_format)
+        batch = []
+        for doc in cursor:
+            if job is not None:
+                job.check_cancelled()
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                writer.write(batch)
+                exported += len(batch)
+                batch = []
+                if job is not None and time.time() - last_report >= progress_interval:
+                    last_report = time.time()
+                    job.report_progress({
+                        'exported': exported, 'total': total,
+                        'docs_per_sec': exported / max(last_report - start, 1e-6)
+                    })
+        if job is not None:
+            job.check_cancelled()
+        if batch:
+            writer.write(batch)
+            exported += len(batch)
+        writer.close()
+        out.close()
+    except BaseException:
+        cursor.close()
+        out.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+
+    elapsed = time.time() - start
+    return {
+        'path': path, 'format': file_format, 'compression': compression,
+        'exported': exported, 'bytes': os.path.getsize(path), 'seconds': elapsed,
+        'docs_per_sec': exported / max(elapsed, 1e-6),
+        'dropped_fields': sorted(getattr(writer, 'dropped', ())),
+        'coerced_values': getattr(writer, 'coerced', 0),
+        'coerced_fields': sorted(getattr(writer, 'coerced_columns', ())),
+    }
@@ -0,0 +1,217 @@
+import json
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+
+EQUALITY_OPERATORS = {'$eq', '$in'}
+# Options that make an index more than its key pattern; such indexes are never called redundant
+SPECIAL_INDEX_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds',
+                         'collation', 'hidden')
+
+
+def parse_history_query(item: Dict) -> Optional[Tuple[Dict, List[Tuple[str, int]]]]:
+    """(filter, sort) of a history item; the leading $match/$sort of pipelines"""
+    try:
+        query = json.loads(item.get('query', ''))
+    except (TypeError, ValueError):
+        return None
+
+    sort = list((item.get('options') or {}).get('sort', {}).items())
+    if isinstance(query, Mapping):
+        return query, sort
+    if not isinstance(query, list):
+        return None
+
+    filters = []
+    for stage in query:
+        if not isinstance(stage, Mapping):
+            break
+        if '$match' in stage:
+            if sort:
+                break
+            filters.append(stage['$match'])
+        elif '$sort' in stage and not sort:
+            sort = list(stage['$sort'].items())
+        else:
+            break
+    if not filters and not sort:
+        return None
+    query_filter = filters[0] if len(filters) == 1 else ({'$and': filters} if filters else {})
+    return query_filter, sort
+
+
+def filter_shapes(query: Mapping) -> List[Tuple[frozenset, frozenset]]:
+    """(equality fields, range fields) for each way the filter can be satisfied.
+
+    Every $or branch needs its own index, so each one yields its own shape.
+    """
+    equality, ranges, branches = set(), set(), []
+    for field, condition in query.items():
+        if field == '$and':
+            for clause in condition:
+                for eq, rng in filter_shapes(clause):
+                    equality |= eq
+                    ranges |= rng
+        elif field == '$or':
+            branches = [shape for clause in condition for shape in filter_shapes(clause)]
+        elif field.startswith('$'):
+            continue
+        elif isinstance(condition, Mapping) and any(op.startswith('$') for op in condition):
+            if all(op in EQUALITY_OPERATORS for op in condition):
+                equality.add(field)
+            else:
+                ranges.add(field)
+        else:
+            equality.add(field)
+
+    if not branches:
+        return [(frozenset(equality), frozenset(ranges - equality))]
+    return [(frozenset(equality | eq), frozenset((ranges | rng) - equality - eq)) for eq, rng in branches]
+
+
+def esr_index(equality, sort: List[Tuple[str, int]], ranges) -> List[Tuple[str, int]]:
+    """Compound key ordered by the equality, sort, range rule"""
+    keys = [(field, 1) for field in sorted(equality)]
+    seen = set(equality)
+    for field, direction in sort:
+        if field not in seen:
+            keys.append((field, 1 if direction >= 0 else -1))
+            seen.add(field)
+    keys.extend((field, 1) for field in sorted(ranges) if field not in seen)
+    return keys
+
+
+def usage_patterns(history: List[Dict], database: str, collection: str) -> List[Dict]:
+    """Group the collection's history by query shape, most expensive first"""
+    patterns = {}
+    for item in history:
+        if item.get('database') != database or item.get('collection') != collection:
+            continue
+        parsed = parse_history_query(item)
+        if parsed is None:
+            continue
+        query_filter, sort = parsed
+        for equality, ranges in filter_shapes(query_filter):
+            shape = (equality, tuple(sort), ranges)
+            pattern = patterns.get(shape)
+            if pattern is None:
+                pattern = patterns[shape] = {
+                    'equality': sorted(equality), 'sort': sort, 'range': sorted(ranges),
+                    'count': 0, 'total_time': 0.0, 'example': item.get('query')
+                }
+            pattern['count'] += 1
+            pattern['total_time'] += item.get('execution_time') or 0
+
+    return sorted(patterns.values(), key=lambda p: (p['total_time'], p['count']), reverse=True)
+
+
+def index_keys(index: Mapping) -> List[Tuple[str, object]]:
+    return list(index['key'].items())
+
+
+def covers(keys: List[Tuple[str, object]], wanted: List[Tuple[str, int]], equality_count: int) -> bool:
+    """Whether an index with keys serves wanted: equality fields in any order, then the rest in order"""
+    if len(keys) < len(wanted):
+        return False
+    if {field for field, _ in keys[:equality_count]} != {field for field, _ in wanted[:equality_count]}:
+        return False
+    rest = keys[equality_count:len(wanted)]
+    wanted_rest = wanted[equality_count:]
+    if [field for field, _ in rest] != [field for field, _ in wanted_rest]:
+        return False
+    # A sort can walk the index backwards, so directions may be all flipped
+    same = all(d == w for (_, d), (_, w) in zip(rest, wanted_rest))
+    flipped = all(d == -w for (_, d), (_, w) in zip(rest, wanted_rest) if isinstance(d, int))
+    return same or flipped
+
+
+def is_prefix(keys: List[Tuple[str, object]], other: List[Tuple[str, object]]) -> bool:
+    return len(keys) < len(other) and other[:len(keys)] == keys
+
+
+def index_stats(coll) -> Dict[str, int]:
+    """{index name: ops} from $indexStats, summed over hosts; empty without privileges"""
+    ops = {}
+    try:
+        for stat in coll.aggregate([{'$indexStats': {}}]):
+            ops[stat['name']] = ops.get(stat['name'], 0) + int(stat.get('accesses', {}).get('ops', 0))
+    except PyMongoError:
+        return {}
+    return ops
+
+
+def index_sizes(coll) -> Dict[str, int]:
+    try:
+        return dict(coll.database.command('collStats', coll.name).get('indexSizes', {}))
+    except PyMongoError:
+        return {}
+
+
+def advise(coll, history: List[Dict]) -> Dict:
+    """Recommend missing indexes for the history's query shapes and flag unused or redundant ones"""
+    indexes = list(coll.list_indexes())
+    ops = index_stats(coll)
+    sizes = index_sizes(coll)
+
+    existing = []
+    for index in indexes:
+        keys = index_keys(index)
+        entry = {
+            'name': index['name'],
+            'key': dict(index['key']),
+            'size_bytes': sizes.get(index['name']),
+            'ops': ops.get(index['name']) if ops else None,
+            'flags': []
+        }
+        if ops and index['name'] != '_id_' and not ops.get(index['name']):
+            entry['flags'].append('unused since last restart')
+        if index['name'] != '_id_' and not any(option in index for option in SPECIAL_INDEX_OPTIONS):
+            for other in indexes:
+                if other['name'] != index['name'] and is_prefix(keys, index_keys(other)):
+                    entry['flags'].append(f"redundant: prefix of {other['name']}")
+                    break
+        existing.append(entry)
+
+    recommendations = []
+    for pattern in usage_patterns(history, coll.database.name, coll.name):
+        wanted = esr_index(pattern['equality'], pattern['sort'], pattern['range'])
+        if not wanted or wanted == [('_id', 1)]:
+            continue
+        equality_count = len(pattern['equality'])
+        if any(covers(index_keys(index), wanted, equality_count) for index in indexes):
+            continue
+        if any(covers(list(rec['index'].items()), wanted, equality_count) for rec in recommendations):
+            continue
+        recommendations.append({
+            'index': dict(wanted),
+            'equality': pattern['equality'],
+            'sort': dict(pattern['sort']),
+            'range': pattern['range'],
+            'queries': pattern['count'],
+            'avg_time': round(pattern['total_time'] / pattern['count'], 4),
+            'example': pattern['example']
+        })
+
+    # A shorter recommendation is served by a longer one sharing its prefix
+    recommendations = [
+        rec for rec in recommendations
+        if not any(other is not rec and covers(list(other['index'].items()), list(rec['index'].items()),
+                                               len(rec['equality']))
+                   for other in recommendations)
+    ]
+
+    flagged = [entry for entry in existing if entry['flags'] and entry['size_bytes']]
+    return {
+        'database': coll.database.name,
+        'collection': coll.name,
+        'history_queries': sum(
+            1 for item in history
+            if item.get('database') == coll.database.name and item.get('collection') == coll.name
+        ),
+        'index_stats_available': bool(ops),
+        'recommendations': recommendations,
+        'indexes': existing,
+        'reclaimable_bytes': sum(entry['size_bytes'] for entry in flagged)
+    }
@@ -0,0 +1,158 @@
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache:
+    """SQLite store of the last-seen browser metadata per connection profile.
+
+    Lets the database and key browsers draw the previous tree immediately on
+    connect while the live listing is reconciled in the background. The
+    cache is only an accelerator: when the file cannot be opened or written
+    the error is logged and the browsers fall back to live listings.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS mongo_databases (
+            profile TEXT NOT NULL,
+            database TEXT NOT NULL,
+            loaded INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (profile, database)
+        );
+        CREATE TABLE IF NOT EXISTS mongo_collections (
+            profile TEXT NOT NULL,
+            database TEXT NOT NULL,
+            collection TEXT NOT NULL,
+            type TEXT NOT NULL,
+            count INTEGER,
+            PRIMARY KEY (profile, database, collection)
+        );
+        CREATE TABLE IF NOT EXISTS redis_keys (
+            profile TEXT NOT NULL,
+            pattern TEXT NOT NULL,
+            key TEXT NOT NULL,
+            type TEXT,
+            PRIMARY KEY (profile, pattern, key)
+        );
+    """
+
+    def __init__(self, path: str = 'metadata_cache.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = None
+        try:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.executescript(self.SCHEMA)
+        except sqlite3.Error:
+            logger.warning("Metadata cache %s unavailable; browsers will list live only", path, exc_info=True)
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def load_mongo(self, profile: str) -> Dict[str, Optional[List[Dict]]]:
+        """{database: [{'name', 'type', 'count'}] or None if its collections were never listed}"""
+        if self.conn is None:
+            return {}
+        with self._lock:
+            try:
+                databases = self.conn.execute(
+                    "SELECT database, loaded FROM mongo_databases WHERE profile = ? ORDER BY database",
+                    (profile,)
+                ).fetchall()
+                rows = self.conn.execute(
+                    "SELECT database, collection, type, count FROM mongo_collections "
+                    "WHERE profile = ? ORDER BY database, collection",
+                    (profile,)
+                ).fetchall()
+            except sqlite3.Error:
+                logger.warning("Failed to read metadata cache %s", self.path, exc_info=True)
+                return {}
+
+        result = {database: [] if loaded else None for database, loaded in databases}
+        for database, collection, coll_type, count in rows:
+            if result.get(database) is not None:
+                result[database].append({'name': collection, 'type': coll_type, 'count': count})
+        return result
+
+    def save_mongo_databases(self, profile: str, databases: List[str]):
+        """Replace the database list, dropping cached collections of removed databases"""
+        self._write(self._save_mongo_databases, profile, databases)
+
+    def _save_mongo_databases(self, profile, databases):
+        existing = {row[0] for row in self.conn.execute(
+            "SELECT database FROM mongo_databases WHERE profile = ?", (profile,))}
+        removed = [(profile, database) for database in existing - set(databases)]
+        self.conn.executemany("DELETE FROM mongo_databases WHERE profile = ? AND database = ?", removed)
+        self.conn.executemany("DELETE FROM mongo_collections WHERE profile = ? AND database = ?", removed)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO mongo_databases (profile, database) VALUES (?, ?)",
+            [(profile, database) for database in databases]
+        )
+
+    def save_mongo_collections(self, profile: str, database: str, collections: List[Dict],
+                               counts: Dict[str, Optional[int]]):
+        self._write(self._save_mongo_collections, profile, database, collections, counts)
+
+    def _save_mongo_collections(self, profile, database, collections, counts):
+        self.conn.execute("DELETE FROM mongo_collections WHERE profile = ? AND database = ?",
+                          (profile, database))
+        self.conn.executemany(
+            "INSERT INTO mongo_collections (profile, database, collection, type, count) VALUES (?, ?, ?, ?, ?)",
+            [(profile, database, info['name'], info['type'], counts.get(info['name']))
+             for info in collections]
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO mongo_databases (profile, database, loaded) VALUES (?, ?, 1)",
+            (profile, database)
+        )
+
+    def load_redis_keys(self, profile: str, pattern: str) -> List[Tuple[str, Optional[str]]]:
+        """[(key, type)] last seen for pattern"""
+        if self.conn is None:
+            return []
+        with self._lock:
+            try:
+                return self.conn.execute(
+                    "SELECT key, type FROM redis_keys WHERE profile = ? AND pattern = ? ORDER BY key",
+                    (profile, pattern)
+                ).fetchall()
+            except sqlite3.Error:
+                logger.warning("Failed to read metadata cache %s", self.path, exc_info=True)
+                return []
+
+    def save_redis_keys(self, profile: str, pattern: str, keys: List[Tuple[str, Optional[str]]]):
+        self._write(self._save_redis_keys, profile, pattern, keys)
+
+    def _save_redis_keys(self, profile, pattern, keys):
+        self.conn.execute("DELETE FROM redis_keys WHERE profile = ? AND pattern = ?", (profile, pattern))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO redis_keys (profile, pattern, key, type) VALUES (?, ?, ?, ?)",
+            [(profile, pattern, key, key_type) for key, key_type in keys]
+        )
+
+    def clear(self):
+        self._write(self._clear)
+
+    def _clear(self):
+        for table in ('mongo_databases', 'mongo_collections', 'redis_keys'):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def close(self):
+        if self.conn is not None:
+            with self._lock:
+                self.conn.close()
+                self.conn = None
+
+    def _write(self, func, *args):
+        if self.conn is None:
+            return
+        with self._lock:
+            try:
+                with self.conn:
+                    func(*args)
+            except sqlite3.Error:
+                logger.warning("Failed to write metadata cache %s", self.path, exc_info=True)
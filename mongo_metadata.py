@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from pymongo.errors import PyMongoError
+
+
+class MongoMetadataLoader:
+    """Loads the database browser's metadata off the UI thread.
+
+    Databases and collections are listed by name only; document counts come
+    from estimatedDocumentCount (collection metadata, no scan) and are
+    fetched on a shared pool so that no more than max_concurrency count
+    commands run against the server at once, however many databases are
+    expanded.
+    """
+
+    PROGRESS_INTERVAL = 0.2
+
+    def __init__(self, max_concurrency: int = 8, max_time_ms: int = 5000):
+        self.max_time_ms = max_time_ms
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='stats')
+
+    @staticmethod
+    def list_databases(client, job=None) -> List[str]:
+        comment = job.comment if job is not None else None
+        return sorted(client.list_database_names(comment=comment))
+
+    @staticmethod
+    def list_collections(client, database: str, job=None) -> List[Dict]:
+        """[{'name', 'type'}] for the database, using listCollections nameOnly"""
+        comment = job.comment if job is not None else None
+        cursor = client[database].list_collections(nameOnly=True, comment=comment)
+        collections = [{'name': info['name'], 'type': info.get('type', 'collection')} for info in cursor]
+        return sorted(collections, key=lambda info: info['name'])
+
+    def count(self, client, database: str, collection: str) -> Optional[int]:
+        try:
+            return client[database][collection].estimated_document_count(maxTimeMS=self.max_time_ms)
+        except PyMongoError:
+            return None
+
+    def load_counts(self, client, database: str, collections: List[Dict], job) -> Dict[str, Optional[int]]:
+        """Count every collection on the shared pool, reporting partial {name: count} batches"""
+        futures = {
+            self.pool.submit(self.count, client, database, info['name']): info['name']
+            for info in collections if info['type'] == 'collection'
+        }
+
+        counts = {}
+        batch = {}
+        last_report = time.time()
+        try:
+            for future in as_completed(futures):
+                job.check_cancelled()
+                batch[futures[future]] = future.result()
+                if time.time() - last_report >= self.PROGRESS_INTERVAL:
+                    job.report_progress({'counts': batch})
+                    counts.update(batch)
+                    batch = {}
+                    last_report = time.time()
+        finally:
+            for future in futures:
+                future.cancel()
+
+        counts.update(batch)
+        return counts
+
+    def load_database(self, client, database: str, job) -> Dict:
+        """Worker side of expanding a database node"""
+        collections = self.list_collections(client, database, job)
+        job.report_progress({'collections': collections})
+        counts = self.load_counts(client, database, collections, job)
+        return {'collections': collections, 'counts': counts}
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
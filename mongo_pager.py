@@ -0,0 +1,205 @@
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import CursorNotFound, InvalidOperation
+
+from query_executor import QueryCancelled
+
+
+class KeysetPager:
+    """Pages through a find() result by range predicates on its sort keys.
+
+    Instead of skip/limit, every page remembers the sort key values (plus _id
+    as a tie-breaker) of its last document. The next page is served from a
+    live cursor that is kept open between pages; when that cursor is gone
+    (stopped, timed out, or going backwards) a new one is opened with a range
+    predicate on the stored keys, so page N costs the same as page 1.
+
+    Documents missing a sort key sort as null, below every other value.
+    Since a range predicate never matches across BSON types, null is given
+    its own branch: after a null anchor an ascending key continues with
+    every non-null value, and a descending key continues into the nulls
+    after a non-null anchor. Crossing between two other types (say from
+    numbers to strings) on a page boundary still skips the later type.
+    """
+
+    def __init__(self, coll, query: Dict, sort: Optional[List[Tuple[str, int]]] = None,
+                 projection: Optional[Dict] = None, page_size: int = 100, batch_size: int = 100,
+                 find_kwargs: Optional[Dict] = None):
+        self.coll = coll
+        self.query = query
+        self.sort = [(key, 1 if direction >= 0 else -1) for key, direction in (sort or [])]
+        if not any(key == '_id' for key, _ in self.sort):
+            self.sort.append(('_id', self.sort[-1][1] if self.sort else 1))
+        self.projection = self.keep_sort_keys(projection)
+        self.page_size = max(1, page_size)
+        self.batch_size = max(1, batch_size)
+        self.find_kwargs = find_kwargs or {}
+
+        self.page = -1
+        self.has_next = True
+        self.anchors: List[Tuple] = []
+        self.cursor = None
+        self._cursor_page = None
+        self._lookahead = None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 0
+
+    def first_page(self, job=None) -> List[Dict]:
+        return self.load_page(0, job)
+
+    def next_page(self, job=None) -> List[Dict]:
+        return self.load_page(self.page + 1, job)
+
+    def prev_page(self, job=None) -> List[Dict]:
+        return self.load_page(max(0, self.page - 1), job)
+
+    def load_page(self, page: int, job=None) -> List[Dict]:
+        """Load page (0-based); only pages up to one past the last loaded one are reachable"""
+        if page > len(self.anchors):
+            raise ValueError("Pages can only be loaded in order")
+
+        if self.cursor is None or self._cursor_page != page:
+            self._open_cursor(page)
+
+        try:
+            docs = self._fetch(job)
+        except CursorNotFound:
+            # Server-side cursor timed out between pages; resume from the anchor
+            self._open_cursor(page)
+            docs = self._fetch(job)
+
+        del self.anchors[page:]
+        if docs:
+            self.anchors.append(self.key_of(docs[-1]))
+        self.page = page
+        self._cursor_page = page + 1 if self.has_next else None
+        return docs
+
+    def prime(self, docs: List[Dict], has_next: bool):
+        """Start from an already known first page, e.g. one served from the result cache"""
+        self.close()
+        self.anchors = [self.key_of(docs[-1])] if docs else []
+        self.page = 0
+        self.has_next = has_next and bool(docs)
+
+    def close(self):
+        self._lookahead = None
+        self._cursor_page = None
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
+
+    def key_of(self, doc: Dict) -> Tuple:
+        """Keyset position of doc: its value for every sort key"""
+        key = []
+        for path, _ in self.sort:
+            value = doc
+            for part in path.split('.'):
+                value = value.get(part) if isinstance(value, Mapping) else None
+            key.append(value)
+        return tuple(key)
+
+    def range_filter(self, page: int) -> Dict:
+        """Filter selecting the documents after the last one of page - 1"""
+        if page == 0:
+            return self.query
+
+        # (k1 > v1) or (k1 = v1 and k2 > v2) or ... with each key's own direction
+        anchor = self.anchors[page - 1]
+        branches = []
+        for i, (path, direction) in enumerate(self.sort):
+            branch = {self.sort[j][0]: anchor[j] for j in range(i)}
+            if anchor[i] is None:
+                if direction == -1:
+                    # Nothing sorts below null (MinKey aside)
+                    continue
+                branch[path] = {'$ne': None}
+            elif direction == 1:
+                branch[path] = {'$gt': anchor[i]}
+            else:
+                branch['$or'] = [{path: {'$lt': anchor[i]}}, {path: None}]
+            branches.append(branch)
+        if not branches:
+            # The anchor was the last possible position
+            bound = {'_id': {'$in': []}}
+        else:
+            bound = branches[0] if len(branches) == 1 else {'$or': branches}
+
+        return {'$and': [self.query, bound]} if self.query else bound
+
+    def keep_sort_keys(self, projection: Optional[Dict]) -> Optional[Dict]:
+        """Adjust projection so the sort keys needed for paging are returned.
+
+        A projection may not name both a path and one of its parents, so an
+        included sort key already covered by a parent is left alone, and one
+        whose children are included replaces them. Exclusions of a sort key,
+        its parents or its children are dropped.
+        """
+        if not projection:
+            return projection
+        projection = dict(projection)
+        inclusive = any(value and key != '_id' for key, value in projection.items())
+        for path, _ in self.sort:
+            parents = {'.'.join(path.split('.')[:i]) for i in range(1, path.count('.') + 1)}
+            children = [key for key in projection if key.startswith(path + '.')]
+            if inclusive:
+                if not parents & projection.keys():
+                    for key in children:
+                        del projection[key]
+                    projection[path] = 1
+            else:
+                for key in [path] + children + [key for key in parents if key in projection]:
+                    projection.pop(key, None)
+        return projection
+
+    def _open_cursor(self, page: int):
+        self.close()
+        self.cursor = self.coll.find(
+            self.range_filter(page),
+            projection=self.projection,
+            sort=self.sort,
+            batch_size=self.batch_size,
+            **self.find_kwargs
+        )
+        self._cursor_page = page
+
+    def _fetch(self, job=None) -> List[Dict]:
+        """Pull one page plus one look-ahead document from the live cursor"""
+        cursor = self.cursor
+        if job is not None:
+            job.attach_cursor(cursor)
+
+        docs = []
+        if self._lookahead is not None:
+            docs.append(self._lookahead)
+            self._lookahead = None
+
+        timings = getattr(job, 'timings', None)
+        try:
+            while len(docs) <= self.page_size:
+                if job is not None:
+                    job.check_cancelled()
+                try:
+                    docs.append(timings.next_document(cursor) if timings else next(cursor))
+                except StopIteration:
+                    break
+        except (QueryCancelled, InvalidOperation):
+            # Stopped mid-page: drop the cursor so the page is re-read from its anchor
+            self.cursor = None
+            self._cursor_page = None
+            raise QueryCancelled()
+
+        if job is not None and job.cancelled:
+            self.cursor = None
+            self._cursor_page = None
+            raise QueryCancelled()
+
+        self.has_next = len(docs) > self.page_size
+        if self.has_next:
+            self._lookahead = docs.pop()
+        else:
+            self.close()
+        return docs
@@ -0,0 +1,113 @@
+import time
+from typing import Dict, List, Optional
+
+from result_serializer import RAW_CODEC_OPTIONS
+
+
+# Stages that must open a pipeline, so the bounded input is applied after them
+LEADING_STAGES = {'$geoNear', '$collStats', '$indexStats', '$currentOp', '$listSessions',
+                  '$changeStream', '$search', '$searchMeta', '$vectorSearch', '$documents'}
+# Stages that write; previews stop before them
+WRITE_STAGES = {'$out', '$merge'}
+
+
+def stage_operator(stage) -> str:
+    if isinstance(stage, dict) and len(stage) == 1:
+        return next(iter(stage))
+    return '?'
+
+
+def bounded_pipeline(pipeline: List[Dict], mode: str = 'sample', size: int = 1000,
+                     ids: Optional[List] = None) -> List[Dict]:
+    """pipeline reading at most size input documents: a $sample (random) or $limit (first found).
+
+    With ids (the _ids of a sample drawn earlier), the input is those
+    documents, so every prefix of a pipeline sees the same sample.
+    """
+    if pipeline and stage_operator(pipeline[0]) in LEADING_STAGES:
+        # $sample anywhere but first reads its whole input, so these are bounded with $limit
+        return [pipeline[0], {'$limit': size}] + pipeline[1:]
+    if ids is not None:
+        bound = {'$match': {'_id': {'$in': ids}}}
+    else:
+        bound = {'$sample': {'size': size}} if mode == 'sample' else {'$limit': size}
+    return [bound] + pipeline
+
+
+def sample_ids(coll, size: int, **kwargs) -> List:
+    """_ids of a random sample of size documents"""
+    cursor = coll.aggregate([{'$sample': {'size': size}}, {'$project': {'_id': 1}}], **kwargs)
+    return [doc['_id'] for doc in cursor]
+
+
+def preview_pipeline(coll, pipeline: List[Dict], mode: str = 'sample', size: int = 1000,
+                     preview_limit: int = 20, job=None, max_time_ms: Optional[int] = None) -> List[Dict]:
+    """Run each prefix of pipeline over a bounded input and describe every stage's output.
+
+    Each result has the stage's operator, output document count, the first
+    preview_limit output documents, the prefix's wall time and the time
+    added by this stage. Results are also passed to job.report_progress()
+    as they complete. In sample mode the sample is drawn once up front, so
+    counts and times of successive stages are measured on the same input.
+    """
+    coll = coll.with_options(codec_options=RAW_CODEC_OPTIONS)
+    comment = job.comment if job is not None else None
+    kwargs = {'comment': comment, 'allowDiskUse': True}
+    if max_time_ms:
+        kwargs['maxTimeMS'] = max_time_ms
+    results = []
+    previous_ms = 0.0
+
+    ids = None
+    if mode == 'sample' and pipeline and stage_operator(pipeline[0]) not in LEADING_STAGES:
+        ids = sample_ids(coll, size, **kwargs)
+
+    for i, stage in enumerate(pipeline):
+        if job is not None:
+            job.check_cancelled()
+
+        operator = stage_operator(stage)
+        result = {'index': i, 'operator': operator, 'count': None, 'documents': [],
+                  'total_ms': None, 'stage_ms': None, 'error': None}
+
+        if operator in WRITE_STAGES:
+            result['error'] = f"{operator} writes data and is not run in previews"
+            results.append(result)
+            if job is not None:
+                job.report_progress(result)
+            break
+
+        prefix = bounded_pipeline(pipeline[:i + 1], mode, size, ids)
+        prefix.append({'$facet': {
+            'count': [{'$count': 'n'}],
+            'documents': [{'$limit': preview_limit}]
+        }})
+
+        start = time.perf_counter()
+        try:
+            cursor = coll.aggregate(prefix, **kwargs)
+            if job is not None:
+                job.attach_cursor(cursor)
+            facet = next(cursor, None)
+        except Exception as e:
+            if job is not None:
+                job.check_cancelled()
+            result['error'] = str(e)
+            results.append(result)
+            if job is not None:
+                job.report_progress(result)
+            break
+
+        total_ms = (time.perf_counter() - start) * 1000
+        counts = facet['count'] if facet is not None else []
+        result['count'] = counts[0]['n'] if counts else 0
+        result['documents'] = list(facet['documents']) if facet is not None else []
+        result['total_ms'] = total_ms
+        result['stage_ms'] = max(total_ms - previous_ms, 0.0)
+        previous_ms = total_ms
+
+        results.append(result)
+        if job is not None:
+            job.report_progress(result)
+
+    return results
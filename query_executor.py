@@ -0,0 +1,235 @@
+import logging
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_comment() -> str:
+    """Unique tag attached to server operations as their comment"""
+    return f"nosql-studio:{uuid.uuid4().hex}"
+
+
+class QueryCancelled(Exception):
+    """Raised inside a worker when its job has been stopped"""
+
+
+class QueryJob:
+    """Handle for a single in-flight query"""
+
+    def __init__(self, key, comment=None):
+        self.key = key
+        # Sent to the server as the operation comment so the op can be found for killOp
+        self.comment = comment or make_comment()
+        self.mongo_client = None
+        self.cursor = None
+        self.future = None
+        self.progress_sink = None
+        # Called with a message when background cleanup such as killOp fails
+        self.error_sink = None
+        # Thread running killOp after cancel(), if one was started
+        self.kill_thread = None
+        # Optional QueryTimings the worker records its phases into
+        self.timings = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise QueryCancelled if the job has been stopped"""
+        if self._cancel_event.is_set():
+            raise QueryCancelled()
+
+    def report_progress(self, value):
+        """Hand an intermediate result to the job's on_progress callback"""
+        if self.progress_sink is not None and not self.cancelled:
+            self.progress_sink(value)
+
+    def attach_cursor(self, cursor):
+        """Register the cursor the worker is iterating so cancel() can close it"""
+        with self._lock:
+            self.cursor = cursor
+        if self.cancelled:
+            self._close_cursor()
+        return cursor
+
+    def cancel(self):
+        """Stop the job: close its cursor and kill the server-side operation"""
+        if self._cancel_event.is_set():
+            return
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+        self._close_cursor()
+        if self.mongo_client is not None:
+            self.kill_thread = threading.Thread(target=self._kill_server_op, daemon=True)
+            self.kill_thread.start()
+
+    def _close_cursor(self):
+        with self._lock:
+            cursor = self.cursor
+            self.cursor = None
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+    def _kill_server_op(self):
+        """Issue killOp for every server operation tagged with this job's comment"""
+        try:
+            ops = self.mongo_client.admin.aggregate([
+                {'$currentOp': {'allUsers': True}},
+                {'$match': {'$or': [
+                    {'command.comment': self.comment},
+                    {'cursor.originatingCommand.comment': self.comment}
+                ]}}
+            ])
+            for op in ops:
+                self.mongo_client.admin.command('killOp', op=op['opid'])
+        except Exception as e:
+            if self.error_sink is not None:
+                self.error_sink(f"Could not stop the server operation: {e}")
+
+
+class QueryExecutor:
+    """Runs queries on a worker pool and delivers results on the Tk main thread.
+
+    Each job is keyed (e.g. by query tab) so that a key has at most one
+    in-flight job; submitting again for the same key stops the previous one.
+    Callbacks are always invoked from the Tk event loop via root.after.
+    A callback that raises is logged and reported through on_error
+    (a message string) without holding up the other jobs' results.
+    """
+
+    POLL_INTERVAL_MS = 30
+
+    def __init__(self, root, max_workers: int = 4, on_error: Optional[Callable[[str], None]] = None):
+        self.root = root
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='query')
+        self.jobs: Dict[object, QueryJob] = {}
+        self.on_error = on_error
+        self._done = queue.Queue()
+        self._errors = queue.Queue()
+        # killOp threads of stopped jobs; polling continues until they finish so their errors are shown
+        self._kill_threads = []
+        self._polling = False
+
+    def submit(self, key, func: Callable, on_success: Callable, on_error: Callable,
+               on_cancel: Optional[Callable] = None, mongo_client=None,
+               comment: Optional[str] = None, on_progress: Optional[Callable] = None) -> QueryJob:
+        """Run func(job) in the pool; exactly one callback fires on the main thread.
+
+        Pass comment to reuse the tag of operations started by an earlier job,
+        e.g. a cursor that stays open across pages. Values the worker passes
+        to job.report_progress() reach on_progress on the main thread, before
+        the final callback.
+        """
+        self.cancel(key)
+
+        job = QueryJob(key, comment)
+        job.mongo_client = mongo_client
+        job.error_sink = self._errors.put
+        if on_progress is not None:
+            job.progress_sink = lambda value: self._done.put(
+                (job, None, on_progress, None, None, value)
+            )
+        self.jobs[key] = job
+
+        def run():
+            job.check_cancelled()
+            return func(job)
+
+        job.future = self.pool.submit(run)
+        job.future.add_done_callback(
+            lambda f: self._done.put((job, f, on_success, on_error, on_cancel, None))
+        )
+        self._schedule_poll()
+        return job
+
+    def cancel(self, key) -> bool:
+        """Stop the in-flight job for key, if any"""
+        job = self.jobs.get(key)
+        if job is None:
+            return False
+        job.cancel()
+        if job.kill_thread is not None:
+            self._kill_threads.append(job.kill_thread)
+            self._schedule_poll()
+        return True
+
+    def is_running(self, key) -> bool:
+        return key in self.jobs
+
+    def shutdown(self):
+        """Stop all jobs and release the worker threads"""
+        for job in list(self.jobs.values()):
+            job.cancel()
+        self.jobs.clear()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                job, future, on_success, on_error, on_cancel, value = self._done.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if future is None:
+                    # Progress report; dropped once the job is stopped or replaced
+                    if not job.cancelled and self.jobs.get(job.key) is job:
+                        on_success(value)
+                    continue
+                self._deliver(job, future, on_success, on_error, on_cancel)
+            except Exception as e:
+                logger.exception("Callback of job %r failed", job.key)
+                self._report(f"Error handling a result: {e}")
+
+        while True:
+            try:
+                message = self._errors.get_nowait()
+            except queue.Empty:
+                break
+            logger.error(message)
+            self._report(message)
+
+        self._kill_threads = [thread for thread in self._kill_threads if thread.is_alive()]
+        if self.jobs or self._kill_threads or not self._done.empty() or not self._errors.empty():
+            self._schedule_poll()
+
+    def _report(self, message: str):
+        if self.on_error is not None:
+            try:
+                self.on_error(message)
+            except Exception:
+                logger.exception("Error handler failed")
+
+    def _deliver(self, job, future, on_success, on_error, on_cancel):
+        if self.jobs.get(job.key) is job:
+            del self.jobs[job.key]
+
+        if job.cancelled or future.cancelled():
+            if on_cancel:
+                on_cancel()
+            return
+
+        error = future.exception()
+        if isinstance(error, QueryCancelled):
+            if on_cancel:
+                on_cancel()
+        elif error is not None:
+            on_error(error)
+        else:
+            on_success(future.result())
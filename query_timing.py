@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+
+COMMENT_PREFIX = 'nosql-studio:'
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Sums driver-measured command round trips per operation comment.
+
+    Registered on the MongoClient. getMore commands are attributed to the
+    comment of the command that opened their cursor, so a paged find is
+    charged for every batch it pulls. Totals that are never taken (commands
+    finishing after their query was cancelled or failed) and cursors that
+    are never closed are dropped oldest first past MAX_ENTRIES.
+    """
+
+    MAX_ENTRIES = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple, str] = {}
+        self._cursors: OrderedDict = OrderedDict()
+        self._totals: OrderedDict = OrderedDict()
+
+    def started(self, event):
+        command = event.command
+        comment = command.get('comment')
+        if event.command_name == 'getMore':
+            comment = self._cursors.get(command.get('getMore'), comment)
+        elif event.command_name == 'killCursors':
+            with self._lock:
+                for cursor_id in command.get('cursors', []):
+                    self._cursors.pop(cursor_id, None)
+        if isinstance(comment, str) and comment.startswith(COMMENT_PREFIX):
+            with self._lock:
+                self._requests[(event.connection_id, event.request_id)] = comment
+
+    def succeeded(self, event):
+        comment = self._finish(event)
+        if comment is None:
+            return
+        cursor = event.reply.get('cursor') if isinstance(event.reply, Mapping) else None
+        if isinstance(cursor, Mapping):
+            cursor_id = cursor.get('id')
+            with self._lock:
+                if cursor_id:
+                    self._cursors[cursor_id] = comment
+                    if len(self._cursors) > self.MAX_ENTRIES:
+                        self._cursors.popitem(last=False)
+                elif event.command_name == 'getMore':
+                    for key in [key for key, value in self._cursors.items() if value == comment]:
+                        del self._cursors[key]
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event) -> Optional[str]:
+        with self._lock:
+            comment = self._requests.pop((event.connection_id, event.request_id), None)
+            if comment is not None:
+                total = self._totals.setdefault(comment, [0, 0])
+                total[0] += event.duration_micros
+                total[1] += 1
+                if len(self._totals) > self.MAX_ENTRIES:
+                    self._totals.popitem(last=False)
+        return comment
+
+    def take(self, comment: str) -> Tuple[float, int]:
+        """(milliseconds, commands) recorded for comment since the last take"""
+        with self._lock:
+            micros, commands = self._totals.pop(comment, (0, 0))
+        return micros / 1000.0, commands
+
+
+class QueryTimings:
+    """Wall time of each phase of one query run, in milliseconds.
+
+    server: command round trips as measured by the driver (server work plus
+    network); first_batch: until the first document was available; fetch:
+    iterating the rest of the cursor; decode: reading the raw BSON into the
+    table view's columns, where it is first decoded (the JSON view decodes
+    as part of serialize, the tree view only what is expanded); serialize:
+    Extended JSON for the JSON view; render: filling the view on the Tk
+    thread. Phases that did not happen stay None.
+    """
+
+    PHASES = ('server', 'first_batch', 'fetch', 'decode', 'serialize', 'render')
+    LABELS = {'first_batch': 'first batch'}
+
+    def __init__(self):
+        self.ms: Dict[str, Optional[float]] = dict.fromkeys(self.PHASES)
+        self.commands = 0
+        self._first = True
+
+    def add(self, phase: str, seconds: float):
+        self.ms[phase] = (self.ms[phase] or 0.0) + seconds * 1000
+
+    def next_document(self, cursor):
+        """next(cursor), timed as first-batch latency the first time and as fetch afterwards"""
+        start = time.perf_counter()
+        try:
+            return next(cursor)
+        finally:
+            self.add('first_batch' if self._first else 'fetch', time.perf_counter() - start)
+            self._first = False
+
+    def set_server(self, ms: float, commands: int):
+        if commands:
+            self.ms['server'] = ms
+            self.commands = commands
+
+    def as_dict(self) -> Dict[str, float]:
+        return {f"{phase}_ms": round(value, 3) for phase, value in self.ms.items() if value is not None}
+
+    def summary(self) -> str:
+        return format_timings(self.as_dict())
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """'server 1.0ms · first batch 2.1ms ...' from QueryTimings.as_dict() (as kept in history)"""
+    parts = []
+    for phase in QueryTimings.PHASES:
+        value = timings.get(f"{phase}_ms")
+        if value is not None:
+            parts.append(f"{QueryTimings.LABELS.get(phase, phase)} {value:.1f}ms")
+    return " · ".join(parts)
@@ -0,0 +1,116 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+KEY_TYPES = ('string', 'hash', 'list', 'set', 'zset', 'stream')
+
+# Length (element count) command of each key type
+LENGTH_COMMANDS = {
+    'string': 'STRLEN',
+    'hash': 'HLEN',
+    'list': 'LLEN',
+    'set': 'SCARD',
+    'zset': 'ZCARD',
+    'stream': 'XLEN',
+}
+
+
+class KeyScanner:
+    """Walks the keyspace with SCAN one page at a time.
+
+    SCAN returns a handful of keys per call and never blocks the server the
+    way KEYS does, so a page is gathered from as many calls as it takes to
+    collect page_size keys, stopping early after time_budget seconds when
+    MATCH/TYPE filter out most of the keyspace. fetch_page() does not move
+    the cursor; the caller commits it with advance() once the page has been
+    used, so a page that is stopped halfway is simply fetched again. SCAN
+    may return a key more than once; callers de-duplicate.
+    """
+
+    def __init__(self, client, match: str = '*', count: int = 1000, key_type: Optional[str] = None,
+                 page_size: int = 500, time_budget: float = 0.5):
+        self.client = client
+        self.match = match or '*'
+        self.count = count
+        self.key_type = key_type or None
+        self.page_size = page_size
+        self.time_budget = time_budget
+        self.cursor = 0
+        self.calls = 0
+        self.started = False
+
+    @property
+    def done(self) -> bool:
+        """True once SCAN has returned cursor 0, i.e. the whole keyspace was walked"""
+        return self.started and self.cursor == 0
+
+    def fetch_page(self, job=None) -> Tuple[List[str], int, int]:
+        """(keys, next cursor, SCAN calls made) for the page starting at the current cursor"""
+        cursor = self.cursor
+        keys = []
+        calls = 0
+        deadline = time.time() + self.time_budget
+        while True:
+            if job is not None:
+                job.check_cancelled()
+            cursor, batch = self.client.scan(cursor, match=self.match, count=self.count, _type=self.key_type)
+            calls += 1
+            keys.extend(batch)
+            if cursor == 0 or len(keys) >= self.page_size or time.time() >= deadline:
+                return keys, int(cursor), calls
+
+    def advance(self, cursor: int, calls: int = 0):
+        self.cursor = cursor
+        self.calls += calls
+        self.started = True
+
+
+def fetch_key_metadata(client, keys: List[str]) -> List[Optional[Dict]]:
+    """{'type', 'ttl', 'memory', 'encoding'} of every key in one pipelined round trip.
+
+    ttl is in seconds (-1: no expiry). memory and encoding are None where
+    MEMORY USAGE / OBJECT ENCODING are unavailable (old or managed servers
+    that disable them). Keys deleted meanwhile come back as None.
+    """
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.type(key)
+        pipe.ttl(key)
+        pipe.memory_usage(key)
+        pipe.object('encoding', key)
+    replies = pipe.execute(raise_on_error=False)
+
+    def value(reply):
+        return None if isinstance(reply, Exception) else reply
+
+    metadata = []
+    for i in range(len(keys)):
+        key_type, ttl, memory, encoding = (value(reply) for reply in replies[i * 4:i * 4 + 4])
+        if key_type in (None, 'none'):
+            metadata.append(None)
+        else:
+            metadata.append({'type': key_type, 'ttl': ttl, 'memory': memory, 'encoding': encoding})
+    return metadata
+
+
+def format_bytes(size: Optional[float]) -> str:
+    if size is None:
+        return ''
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_ttl(ttl: Optional[int]) -> str:
+    if ttl is None:
+        return ''
+    if ttl < 0:
+        return 'none'
+    if ttl < 60:
+        return f"{ttl}s"
+    if ttl < 3600:
+        return f"{ttl // 60}m {ttl % 60}s"
+    if ttl < 86400:
+        return f"{ttl // 3600}h {ttl % 3600 // 60}m"
+    return f"{ttl // 86400}d {ttl % 86400 // 3600}h"
@@ -0,0 +1,277 @@
+import csv
+import heapq
+import json
+import random
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from redis_browser import LENGTH_COMMANDS
+
+
+class MemoryAnalyzer:
+    """Walks the keyspace with SCAN and measures where the memory goes.
+
+    Every batch of scanned keys is measured in pipelined round trips: TYPE
+    and MEMORY USAGE (with SAMPLES for nested values; 0 reads every
+    element) first, then the element count command of each type. With
+    sample_rate below 1 only that fraction of keys is measured and the
+    totals are scaled up as estimates. Memory is aggregated by type and by
+    key prefix up to prefix_depth levels, and the top_n biggest keys by
+    memory and by element count are kept in min-heaps. Past max_prefixes
+    distinct prefixes, new ones are folded into a "parent:*" bucket, so ids
+    embedded in key names cannot grow the aggregates without bound.
+
+    To be safe on a production server, the commands sent per second are
+    capped at max_ops and the job pauses while a round trip is slower
+    than slow_ms, giving the server room to serve its clients.
+    """
+
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, client, match: str = '*', key_type: Optional[str] = None, delimiter: str = ':',
+                 prefix_depth: int = 2, sample_rate: float = 1.0, memory_samples: int = 5, top_n: int = 100,
+                 scan_count: int = 1000, batch_size: int = 200, max_ops: int = 5000, slow_ms: float = 50,
+                 max_prefixes: int = 10000):
+        self.client = client
+        self.match = match or '*'
+        self.key_type = key_type or None
+        self.delimiter = delimiter or ':'
+        self.prefix_depth = max(prefix_depth, 0)
+        self.sample_rate = min(max(sample_rate, 0.0001), 1.0)
+        self.memory_samples = max(memory_samples, 0)
+        self.top_n = top_n
+        self.scan_count = scan_count
+        self.batch_size = batch_size
+        self.max_ops = max_ops
+        self.slow_ms = slow_ms
+        self.max_prefixes = max_prefixes
+
+        self.random = random.Random()
+        self.scanned = 0
+        self.measured = 0
+        self.missing = 0
+        self.commands = 0
+        self.memory_unavailable = False
+        self.throttled_seconds = 0.0
+        self.types: Dict[str, Dict] = {}
+        self.prefixes: Dict[str, Dict] = {}
+        # Min-heaps of (size, key, type): the smallest of the top_n is popped first
+        self.top_memory: List[tuple] = []
+        self.top_elements: List[tuple] = []
+
+        self._window_start = time.time()
+        self._window_ops = 0
+
+    def run(self, job=None) -> Dict:
+        start = time.time()
+        info = self.server_info()
+        dbsize = info.get('dbsize')
+        last_progress = 0.0
+        cursor = 0
+        pending = []
+        while True:
+            if job is not None:
+                job.check_cancelled()
+            cursor, keys = self.client.scan(cursor, match=self.match, count=self.scan_count, _type=self.key_type)
+            self.throttle(1, job)
+            self.scanned += len(keys)
+            pending.extend(key for key in keys if self.sample_rate >= 1 or self.random.random() < self.sample_rate)
+            while len(pending) >= self.batch_size or (pending and cursor == 0):
+                batch, pending = pending[:self.batch_size], pending[self.batch_size:]
+                self.measure(batch, job)
+
+            now = time.time()
+            if job is not None and (now - last_progress >= self.PROGRESS_INTERVAL or cursor == 0):
+                last_progress = now
+                job.report_progress({
+                    'scanned': self.scanned, 'measured': self.measured,
+                    'total': dbsize if self.match == '*' and not self.key_type else None,
+                    'keys_per_sec': self.scanned / max(now - start, 1e-6),
+                    'report': self.report(info, now - start)
+                })
+            if cursor == 0:
+                break
+        return self.report(info, time.time() - start)
+
+    def server_info(self) -> Dict:
+        """used_memory and key count of the server, where INFO/DBSIZE are allowed"""
+        info = {}
+        try:
+            memory = self.client.info('memory')
+            info['used_memory'] = memory.get('used_memory')
+            info['used_memory_dataset'] = memory.get('used_memory_dataset')
+        except Exception:
+            pass
+        try:
+            info['dbsize'] = self.client.dbsize()
+        except Exception:
+            pass
+        return info
+
+    def measure(self, keys: List[str], job=None):
+        """TYPE + MEMORY USAGE, then the element counts, of a batch in two pipelined round trips"""
+        with_memory = not self.memory_unavailable
+        step = 2 if with_memory else 1
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.type(key)
+            if with_memory:
+                pipe.memory_usage(key, samples=self.memory_samples)
+        replies = self.execute(pipe, len(keys) * step, job)
+
+        measured = []
+        for i, key in enumerate(keys):
+            key_type = replies[i * step]
+            memory = replies[i * step + 1] if with_memory else None
+            if isinstance(memory, Exception):
+                # Disabled on managed servers or missing before 4.0; stop asking
+                self.memory_unavailable = True
+                memory = None
+            if isinstance(key_type, Exception) or key_type in (None, 'none'):
+                self.missing += 1
+                continue
+            measured.append((key, key_type, memory))
+
+        pipe = self.client.pipeline(transaction=False)
+        for key, key_type, _ in measured:
+            pipe.execute_command(LENGTH_COMMANDS.get(key_type, 'EXISTS'), key)
+        counts = self.execute(pipe, len(measured), job)
+
+        for (key, key_type, memory), count in zip(measured, counts):
+            self.add(key, key_type, memory, None if isinstance(count, Exception) else count)
+
+    def execute(self, pipe, commands: int, job=None) -> List:
+        if not commands:
+            return []
+        start = time.perf_counter()
+        replies = pipe.execute(raise_on_error=False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.throttle(commands, job)
+        if elapsed_ms > self.slow_ms:
+            # The server is busy: back off for as long as the round trip took
+            self.sleep(elapsed_ms / 1000, job)
+        return replies
+
+    def throttle(self, commands: int, job=None):
+        """Sleep as needed to keep under max_ops commands per second"""
+        self.commands += commands
+        if not self.max_ops:
+            return
+        self._window_ops += commands
+        ahead = self._window_ops / self.max_ops - (time.time() - self._window_start)
+        if ahead > 0:
+            self.sleep(ahead, job)
+        if time.time() - self._window_start >= 1:
+            self._window_start = time.time()
+            self._window_ops = 0
+
+    def sleep(self, seconds: float, job=None):
+        self.throttled_seconds += seconds
+        deadline = time.time() + seconds
+        while True:
+            if job is not None:
+                job.check_cancelled()
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.1))
+
+    def add(self, key: str, key_type: str, memory: Optional[int], elements: Optional[int]):
+        self.measured += 1
+        for name, totals in [(key_type, self.types)] + [(prefix, self.prefixes) for prefix in self.prefixes_of(key)]:
+            entry = totals.get(name)
+            if entry is None:
+                entry = totals[name] = {'keys': 0, 'memory': 0, 'elements': 0, 'types': Counter()}
+            entry['keys'] += 1
+            entry['memory'] += memory or 0
+            entry['elements'] += elements or 0
+            entry['types'][key_type] += 1
+
+        if memory is not None:
+            self.push(self.top_memory, (memory, key, key_type))
+        if elements is not None:
+            self.push(self.top_elements, (elements, key, key_type))
+
+    def push(self, heap: List[tuple], item: tuple):
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def prefixes_of(self, key: str) -> List[str]:
+        """'a', 'a:b' for 'a:b:c' with depth 2; keys without a delimiter count under ''"""
+        segments = key.split(self.delimiter)[:-1][:self.prefix_depth]
+        if not segments:
+            return ['']
+        prefixes = []
+        for i in range(1, len(segments) + 1):
+            prefix = self.delimiter.join(segments[:i])
+            if prefix not in self.prefixes and len(self.prefixes) >= self.max_prefixes:
+                prefixes.append(self.delimiter.join(segments[:i - 1] + ['*']))
+                break
+            prefixes.append(prefix)
+        return prefixes
+
+    def report(self, info: Optional[Dict] = None, seconds: float = 0) -> Dict:
+        """Aggregates so far; totals and per-group figures scaled by 1 / sample_rate"""
+        scale = 1 / self.sample_rate
+
+        def group(name, entry):
+            return {
+                'name': name, 'keys': round(entry['keys'] * scale), 'memory': round(entry['memory'] * scale),
+                'elements': round(entry['elements'] * scale),
+                'types': dict(entry['types'].most_common())
+            }
+
+        def top(heap):
+            return [{'key': key, 'type': key_type, 'size': size} for size, key, key_type in sorted(heap, reverse=True)]
+
+        prefixes = sorted((group(name, entry) for name, entry in self.prefixes.items()),
+                          key=lambda entry: (-entry['memory'], entry['name']))
+        types = sorted((group(name, entry) for name, entry in self.types.items()),
+                       key=lambda entry: (-entry['memory'], entry['name']))
+        return {
+            'created': datetime.now().isoformat(),
+            'match': self.match,
+            'type': self.key_type,
+            'delimiter': self.delimiter,
+            'prefix_depth': self.prefix_depth,
+            'sample_rate': self.sample_rate,
+            'memory_samples': self.memory_samples,
+            'server': info or {},
+            'scanned': self.scanned,
+            'measured': self.measured,
+            'missing': self.missing,
+            'commands': self.commands,
+            'seconds': round(seconds, 3),
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'memory_available': not self.memory_unavailable,
+            'estimated_memory': round(sum(entry['memory'] for entry in self.types.values()) * scale),
+            'types': types,
+            'prefixes': prefixes,
+            'top_memory': top(self.top_memory),
+            'top_elements': top(self.top_elements),
+        }
+
+
+def export_report(report: Dict, path: str):
+    """Write a report as JSON, or as CSV with one row per type, prefix and big key"""
+    if not path.lower().endswith('.csv'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['section', 'name', 'type', 'keys', 'memory', 'elements'])
+        for entry in report['types']:
+            writer.writerow(['type', entry['name'], entry['name'], entry['keys'], entry['memory'], entry['elements']])
+        for entry in report['prefixes']:
+            writer.writerow(['prefix', entry['name'], ' '.join(entry['types']), entry['keys'], entry['memory'],
+                             entry['elements']])
+        for entry in report['top_memory']:
+            writer.writerow(['top_memory', entry['key'], entry['type'], 1, entry['size'], ''])
+        for entry in report['top_elements']:
+            writer.writerow(['top_elements', entry['key'], entry['type'], 1, '', entry['size']])
@@ -0,0 +1,198 @@
+import heapq
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class NamespaceNode:
+    """One key prefix: its sub-prefixes, the keys directly under it and subtree aggregates"""
+
+    __slots__ = ('prefix', 'name', 'parent', 'children', 'keys', 'count', 'memory', 'types')
+
+    def __init__(self, prefix: str, name: str, parent: Optional['NamespaceNode']):
+        self.prefix = prefix
+        self.name = name
+        self.parent = parent
+        self.children: Dict[str, NamespaceNode] = {}
+        # key -> metadata ({'type', 'ttl', 'memory', 'encoding'}, any of them possibly missing)
+        self.keys: Dict[str, Dict] = {}
+        self.count = 0
+        self.memory = 0
+        self.types = Counter()
+
+    @property
+    def entries(self) -> int:
+        """Rows directly under this node: sub-prefixes plus keys"""
+        return len(self.children) + len(self.keys)
+
+    def type_mix(self, top: int = 2) -> str:
+        """'hash 80% · string 20%' for the most common types in the subtree"""
+        known = sum(self.types.values())
+        if not known:
+            return ''
+        return ' · '.join(f"{key_type} {count * 100 // known}%" for key_type, count in self.types.most_common(top))
+
+    def dominant_type(self) -> Optional[str]:
+        return self.types.most_common(1)[0][0] if self.types else None
+
+    def value(self, column: str):
+        """Aggregate shown in a browser column, for sorting prefixes"""
+        if column == 'memory':
+            return self.memory
+        if column == 'type':
+            return self.dominant_type()
+        return None
+
+
+class KeyNamespace:
+    """Trie of Redis keys split on a delimiter, with per-prefix key count, memory and type mix.
+
+    "app:user:1:session" lives in node app -> user -> 1. Every node keeps
+    the totals of its whole subtree, adjusted by delta as keys are added,
+    updated or removed, so aggregates of a prefix with millions of keys
+    never need a walk. max_depth caps the number of prefix levels.
+    """
+
+    def __init__(self, delimiter: str = ':', max_depth: int = 16):
+        self.delimiter = delimiter or ':'
+        self.max_depth = max_depth
+        self.root = NamespaceNode('', '', None)
+        # key -> node holding it
+        self._index: Dict[str, NamespaceNode] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str) -> Optional[Dict]:
+        node = self._index.get(key)
+        return node.keys[key] if node is not None else None
+
+    def node_of(self, key: str) -> Optional[NamespaceNode]:
+        return self._index.get(key)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        for key, node in self._index.items():
+            yield key, node.keys[key]
+
+    def display_name(self, key: str) -> str:
+        """The part of key below its prefix node"""
+        node = self._index.get(key)
+        if node is None or node is self.root:
+            return key
+        return key[len(node.prefix) + len(self.delimiter):]
+
+    def add(self, key: str, meta: Dict) -> Tuple[List[NamespaceNode], List[NamespaceNode]]:
+        """Insert or update key; returns (nodes whose aggregates changed, nodes created)"""
+        if key in self._index:
+            return self.update(key, meta), []
+
+        segments = key.split(self.delimiter)[:-1][:self.max_depth]
+        node = self.root
+        path = [node]
+        created = []
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                prefix = segment if node is self.root else f"{node.prefix}{self.delimiter}{segment}"
+                child = NamespaceNode(prefix, segment, node)
+                node.children[segment] = child
+                created.append(child)
+            node = child
+            path.append(node)
+
+        meta = dict(meta)
+        node.keys[key] = meta
+        self._index[key] = node
+        for ancestor in path:
+            ancestor.count += 1
+            self._apply(ancestor, meta, 1)
+        return path, created
+
+    def update(self, key: str, meta: Dict) -> List[NamespaceNode]:
+        node = self._index[key]
+        old = node.keys[key]
+        new = dict(old)
+        new.update({name: value for name, value in meta.items() if value is not None})
+        node.keys[key] = new
+        path = self.path(node)
+        for ancestor in path:
+            self._apply(ancestor, old, -1)
+            self._apply(ancestor, new, 1)
+        return path
+
+    def remove(self, key: str) -> Tuple[List[NamespaceNode], List[NamespaceNode]]:
+        """Drop key; returns (surviving nodes whose aggregates changed, nodes removed as empty)"""
+        node = self._index.pop(key, None)
+        if node is None:
+            return [], []
+        meta = node.keys.pop(key)
+        path = self.path(node)
+        for ancestor in path:
+            ancestor.count -= 1
+            self._apply(ancestor, meta, -1)
+
+        removed = []
+        while node is not self.root and node.count == 0:
+            del node.parent.children[node.name]
+            removed.append(node)
+            node = node.parent
+        return [ancestor for ancestor in path if ancestor not in removed], removed
+
+    def find(self, prefix: str) -> Optional[NamespaceNode]:
+        node = self.root
+        if not prefix:
+            return node
+        for segment in prefix.split(self.delimiter):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    @staticmethod
+    def path(node: NamespaceNode) -> List[NamespaceNode]:
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        return path
+
+    @staticmethod
+    def _apply(node: NamespaceNode, meta: Dict, sign: int):
+        if meta.get('memory') is not None:
+            node.memory += sign * meta['memory']
+        if meta.get('type'):
+            node.types[meta['type']] += sign
+            if node.types[meta['type']] <= 0:
+                del node.types[meta['type']]
+
+
+def sort_rank(value, name: str, descending: bool = False):
+    """Sort key for a row by a column value: unknown values last in either direction, then by name"""
+    if value is None:
+        return (0, '', name) if descending else (1, '', name)
+    return (1, value, name) if descending else (0, value, name)
+
+
+def ordered_entries(node: NamespaceNode, limit: int,
+                    sort: Optional[Tuple[str, bool]] = None) -> List[Tuple[str, object]]:
+    """The first limit rows under node: sub-prefixes first, then keys.
+
+    Rows are ('prefix', NamespaceNode) or ('key', key), ordered by name or,
+    with sort=(column, descending), by that column. Only the first limit
+    rows are ordered (heap selection), so a prefix with millions of keys
+    costs one pass, not a full sort.
+    """
+    if sort is None:
+        prefixes = heapq.nsmallest(limit, node.children.values(), key=lambda child: child.name)
+        keys = heapq.nsmallest(max(limit - len(prefixes), 0), node.keys)
+    else:
+        column, descending = sort
+        select = heapq.nlargest if descending else heapq.nsmallest
+        prefixes = select(limit, node.children.values(),
+                          key=lambda child: sort_rank(child.value(column), child.name, descending))
+        keys = select(max(limit - len(prefixes), 0), node.keys,
+                      key=lambda key: sort_rank(node.keys[key].get(column), key, descending))
+    return [('prefix', child) for child in prefixes] + [('key', key) for key in keys]
@@ -0,0 +1,285 @@
+from typing import Dict, List, Optional, Tuple
+
+from redis_browser import LENGTH_COMMANDS
+
+
+class ValuePager:
+    """Reads a Redis value one window at a time.
+
+    Lists are sliced with LRANGE and strings with GETRANGE (windows of
+    string_window bytes), so any page can be read directly. Hashes and sets
+    are walked with HSCAN/SSCAN; the cursor that starts each page is kept,
+    so previous pages can be read again. Sorted sets are read in score
+    order with ZRANGEBYSCORE between min_score and max_score, each page
+    starting at the last score of the previous one, or with ZSCAN when a
+    member pattern is given (the score range is then checked on each
+    member). Streams are read with XRANGE from the last entry ID. Like
+    SCAN, HSCAN/SSCAN/ZSCAN may return an element more than once when the
+    value changes while it is paged. A member pattern only applies to
+    MATCH_TYPES; for other types describe() says it was not applied.
+    """
+
+    MATCH_TYPES = ('hash', 'set', 'zset')
+
+    def __init__(self, client, key: str, key_type: Optional[str] = None, page_size: int = 100,
+                 match: Optional[str] = None, min_score='-inf', max_score='+inf', string_window: int = 65536):
+        self.client = client
+        self.key = key
+        self.key_type = key_type or client.type(key)
+        self.page_size = max(page_size, 1)
+        self.match = match or None
+        self.min_score = min_score
+        self.max_score = max_score
+        self.string_window = string_window
+        self.length = self.read_length()
+        self.index = 0
+        # Where each page visited so far starts: cursor, (score, skip) or stream ID
+        self.starts: List = [self.first_start()]
+        self.page: Optional[Dict] = None
+
+    def read_length(self) -> Optional[int]:
+        command = LENGTH_COMMANDS.get(self.key_type)
+        return self.client.execute_command(command, self.key) if command else None
+
+    def first_start(self):
+        if self.key_type == 'zset' and not self.match:
+            return (self.min_score, 0)
+        if self.key_type == 'stream':
+            return '-'
+        return 0
+
+    @property
+    def scanned(self) -> bool:
+        """True when pages follow a cursor rather than a position"""
+        return self.key_type in ('hash', 'set') or (self.key_type == 'zset' and self.match is not None)
+
+    @property
+    def filtered(self) -> bool:
+        """True when a member pattern or score range leaves elements out of the pages"""
+        if self.match is not None and self.key_type in self.MATCH_TYPES:
+            return True
+        return self.key_type == 'zset' and (str(self.min_score), str(self.max_score)) != ('-inf', '+inf')
+
+    @property
+    def match_ignored(self) -> bool:
+        """True when a member pattern was given for a type it cannot filter"""
+        return self.match is not None and self.key_type not in self.MATCH_TYPES
+
+    def in_score_range(self, score: float) -> bool:
+        """Whether score lies between min_score and max_score"""
+        low_value, low_exclusive = parse_score(self.min_score)
+        high_value, high_exclusive = parse_score(self.max_score)
+        above = score > low_value if low_exclusive else score >= low_value
+        below = score < high_value if high_exclusive else score <= high_value
+        return above and below
+
+    def first(self) -> Dict:
+        self.index = 0
+        return self.read()
+
+    def next(self) -> Dict:
+        if self.page is not None and self.page['has_next']:
+            self.index += 1
+        return self.read()
+
+    def previous(self) -> Dict:
+        if self.index > 0:
+            self.index -= 1
+        return self.read()
+
+    def read(self) -> Dict:
+        """The current page: {'items', 'index', 'offset', 'has_prev', 'has_next', 'complete'}"""
+        start = self.starts[self.index]
+        reader = {
+            'string': self.read_string, 'list': self.read_list, 'hash': self.read_scan,
+            'set': self.read_scan, 'zset': self.read_zset if not self.match else self.read_scan,
+            'stream': self.read_stream
+        }.get(self.key_type)
+        if reader is None:
+            raise ValueError(f"Cannot page a value of type {self.key_type}")
+        items, next_start = reader(start)
+
+        # Remember where the following page starts; a re-read page may move it
+        del self.starts[self.index + 1:]
+        if next_start is not None:
+            self.starts.append(next_start)
+        offset = self.index * self.page_size if not self.scanned else None
+        self.page = {
+            'items': items,
+            'index': self.index,
+            'offset': offset,
+            'has_prev': self.index > 0,
+            'has_next': next_start is not None,
+            'complete': self.index == 0 and next_start is None,
+        }
+        return self.page
+
+    def read_string(self, start):
+        offset = self.index * self.string_window
+        end = offset + self.string_window - 1
+        # Raw bytes: a window may split a multi-byte character or the value may not be text at all
+        raw = self.client.execute_command('GETRANGE', self.key, offset, end, NEVER_DECODE=True)
+        text = raw.decode('utf-8', 'replace') if isinstance(raw, bytes) else (raw or '')
+        return text, (self.index + 1 if end + 1 < (self.length or 0) else None)
+
+    def read_list(self, start):
+        offset = self.index * self.page_size
+        items = self.client.lrange(self.key, offset, offset + self.page_size - 1)
+        return items, (self.index + 1 if offset + self.page_size < (self.length or 0) else None)
+
+    def read_scan(self, cursor):
+        """HSCAN/SSCAN/ZSCAN calls from cursor until a page is full or the walk ends"""
+        items = {} if self.key_type in ('hash', 'zset') else []
+        while True:
+            if self.key_type == 'hash':
+                cursor, batch = self.client.hscan(self.key, cursor, match=self.match, count=self.page_size)
+                items.update(batch)
+            elif self.key_type == 'set':
+                cursor, batch = self.client.sscan(self.key, cursor, match=self.match, count=self.page_size)
+                items.extend(batch)
+            else:
+                cursor, batch = self.client.zscan(self.key, cursor, match=self.match, count=self.page_size)
+                items.update((member, score) for member, score in batch if self.in_score_range(score))
+            if cursor == 0 or len(items) >= self.page_size:
+                break
+        if self.key_type == 'zset':
+            items = [[member, score] for member, score in items.items()]
+        return items, (cursor or None)
+
+    def read_zset(self, start):
+        """ZRANGEBYSCORE from (score, skip): the first skip members with that score were on earlier pages"""
+        low, skip = start
+        batch = self.client.zrangebyscore(self.key, low, self.max_score, start=skip, num=self.page_size + 1,
+                                          withscores=True)
+        items = [[member, score] for member, score in batch[:self.page_size]]
+        if len(batch) <= self.page_size:
+            return items, None
+
+        last = items[-1][1]
+        ties = sum(1 for _, score in items if score == last)
+        # A page of nothing but one score continues past the members skipped before it
+        low_value, low_exclusive = parse_score(low)
+        if ties == len(items) and not low_exclusive and low_value == last:
+            ties += skip
+        return items, (last, ties)
+
+    def read_stream(self, start):
+        batch = self.client.xrange(self.key, min=start, max='+', count=self.page_size + 1)
+        items = [{entry_id: fields} for entry_id, fields in batch[:self.page_size]]
+        return items, (batch[self.page_size][0] if len(batch) > self.page_size else None)
+
+    def load_all(self) -> Dict:
+        """The whole value as one page, for when the user asks for it; filters do not apply"""
+        self.match = None
+        self.min_score, self.max_score = '-inf', '+inf'
+        if self.key_type == 'string':
+            items = self.client.get(self.key) or ''
+        elif self.key_type == 'hash':
+            items = self.client.hgetall(self.key)
+        elif self.key_type == 'list':
+            items = self.client.lrange(self.key, 0, -1)
+        elif self.key_type == 'set':
+            items = sorted(self.client.smembers(self.key))
+        elif self.key_type == 'zset':
+            items = [[member, score] for member, score in self.client.zrange(self.key, 0, -1, withscores=True)]
+        elif self.key_type == 'stream':
+            items = [{entry_id: fields} for entry_id, fields in self.client.xrange(self.key)]
+        else:
+            raise ValueError(f"Cannot read a value of type {self.key_type}")
+
+        self.length = len(items) if self.key_type != 'string' else self.length
+        self.index = 0
+        self.starts = [self.first_start()]
+        self.page = {'items': items, 'index': 0, 'offset': 0, 'has_prev': False, 'has_next': False,
+                     'complete': True}
+        return self.page
+
+    def describe(self) -> str:
+        """Header line such as 'list · 1,204,331 items · page 3 (items 201-300)'"""
+        units = {'string': 'bytes', 'hash': 'fields', 'list': 'items', 'set': 'members', 'zset': 'members',
+                 'stream': 'entries'}
+        text = f"{self.key_type} · {self.length:,} {units.get(self.key_type, 'elements')}" \
+            if self.length is not None else self.key_type
+        page = self.page
+        if self.match_ignored:
+            text += f" · member filter not applied to {self.key_type}"
+        if page is None:
+            return text
+        if page['complete']:
+            return f"{text} · all matching shown" if self.filtered else f"{text} · all shown"
+        text += f" · page {page['index'] + 1}"
+        if self.key_type == 'string':
+            start = page['index'] * self.string_window
+            return f"{text} (bytes {start + 1:,}-{min(start + self.string_window, self.length):,})"
+        if page['offset'] is not None and self.key_type == 'list':
+            return f"{text} (items {page['offset'] + 1:,}-{page['offset'] + len(page['items']):,})"
+        return f"{text} ({len(page['items']):,} shown)"
+
+
+def parse_score(bound) -> Tuple[float, bool]:
+    """(value, exclusive) of a ZRANGEBYSCORE bound such as 5, '-inf' or '(5'"""
+    text = str(bound)
+    return float(text.lstrip('(')), text.startswith('(')
+
+
+def save_window(client, key: str, key_type: str, old, new, offset: Optional[int] = None,
+                complete: bool = False):
+    """Write the differences between a shown window (old) and its edited version (new).
+
+    Only the elements of the window are touched: hash fields are set or
+    deleted, set and sorted set members added or removed, list items set
+    by index. A string or list is replaced whole only when the window
+    covered the entire value.
+    """
+    pipe = client.pipeline(transaction=True)
+    if key_type == 'string':
+        if not complete:
+            raise ValueError("Only part of this string is shown; load the whole value to edit it")
+        pipe.set(key, new)
+    elif key_type == 'hash':
+        if not isinstance(new, dict):
+            raise ValueError("A hash must be edited as a JSON object")
+        removed = [field for field in old if field not in new]
+        if removed:
+            pipe.hdel(key, *removed)
+        changed = {field: value for field, value in new.items() if old.get(field) != value}
+        if changed:
+            pipe.hset(key, mapping=changed)
+    elif key_type == 'list':
+        if not isinstance(new, list):
+            raise ValueError("A list must be edited as a JSON array")
+        if complete and len(new) != len(old):
+            pipe.delete(key)
+            if new:
+                pipe.rpush(key, *new)
+        elif len(new) != len(old):
+            raise ValueError("Items can only be changed in place on a partial list; load the whole value to "
+                             "add or remove items")
+        else:
+            for i, (before, after) in enumerate(zip(old, new)):
+                if before != after:
+                    pipe.lset(key, (offset or 0) + i, after)
+    elif key_type == 'set':
+        if not isinstance(new, list):
+            raise ValueError("A set must be edited as a JSON array")
+        removed = set(old) - set(new)
+        added = set(new) - set(old)
+        if removed:
+            pipe.srem(key, *removed)
+        if added:
+            pipe.sadd(key, *added)
+    elif key_type == 'zset':
+        try:
+            new_scores = {member: float(score) for member, score in new}
+        except (TypeError, ValueError):
+            raise ValueError("A sorted set must be edited as a JSON array of [member, score] pairs")
+        old_scores = {member: score for member, score in old}
+        removed = [member for member in old_scores if member not in new_scores]
+        if removed:
+            pipe.zrem(key, *removed)
+        changed = {member: score for member, score in new_scores.items() if old_scores.get(member) != score}
+        if changed:
+            pipe.zadd(key, changed)
+    else:
+        raise ValueError(f"Values of type {key_type} cannot be edited here")
+    pipe.execute()
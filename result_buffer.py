@@ -0,0 +1,117 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson.json_util import dumps
+
+
+MISSING = None
+
+
+class ColumnarResultBuffer:
+    """Column-oriented store for query results.
+
+    Documents are flattened into dotted field paths (nested documents are
+    expanded, arrays stay a single cell). Every column is a plain list with
+    one slot per row, so rows missing a field hold None. Sorting only builds
+    a row order and never touches the server or the column lists.
+    """
+
+    MAX_CELL_LENGTH = 200
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self.data: Dict[str, List[Any]] = {}
+        self.row_count = 0
+        self.order: Optional[List[int]] = None
+        self.sort_column: Optional[str] = None
+        self.sort_descending = False
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict]) -> 'ColumnarResultBuffer':
+        buffer = cls()
+        buffer.append_documents(documents)
+        return buffer
+
+    def __len__(self):
+        return self.row_count
+
+    def append_documents(self, documents: Iterable[Dict]):
+        """Flatten documents into the column lists"""
+        for doc in documents:
+            row = self.row_count
+            for path, value in self.flatten(doc):
+                column = self.data.get(path)
+                if column is None:
+                    column = [MISSING] * row
+                    self.data[path] = column
+                    self.columns.append(path)
+                if len(column) > row:
+                    # "a.b" key colliding with a nested {"a": {"b": ...}}
+                    column[row] = value
+                    continue
+                if len(column) < row:
+                    column.extend([MISSING] * (row - len(column)))
+                column.append(value)
+            self.row_count += 1
+
+        for column in self.data.values():
+            if len(column) < self.row_count:
+                column.extend([MISSING] * (self.row_count - len(column)))
+
+        if self.sort_column:
+            self.sort(self.sort_column, self.sort_descending)
+
+    @staticmethod
+    def flatten(doc: Dict, prefix: str = ''):
+        """Yield (dotted path, value) pairs; nested documents are expanded"""
+        for key, value in doc.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, Mapping) and value:
+                yield from ColumnarResultBuffer.flatten(value, path + '.')
+            else:
+                yield path, value
+
+    def sort(self, column: str, descending: bool = False):
+        """Order rows by column; rows without a value go last"""
+        values = self.data[column]
+        present = [i for i in range(self.row_count) if values[i] is not MISSING]
+        absent = [i for i in range(self.row_count) if values[i] is MISSING]
+        present.sort(key=lambda i: self._sort_key(values[i]), reverse=descending)
+
+        self.order = present + absent
+        self.sort_column = column
+        self.sort_descending = descending
+
+    def clear_sort(self):
+        self.order = None
+        self.sort_column = None
+        self.sort_descending = False
+
+    @staticmethod
+    def _sort_key(value):
+        # Mixed-type columns: numbers, then strings, then everything else by text
+        if isinstance(value, (int, float)):
+            return (0, value, '')
+        if isinstance(value, str):
+            return (1, 0, value)
+        return (2, 0, str(value))
+
+    def row_index(self, position: int) -> int:
+        """Row stored at display position, taking the current sort into account"""
+        return self.order[position] if self.order is not None else position
+
+    def row_values(self, position: int, columns: List[str]) -> List[str]:
+        """Display strings of one row for the given columns"""
+        row = self.row_index(position)
+        return [self.format_cell(self.data[column][row]) for column in columns]
+
+    def format_cell(self, value) -> str:
+        if value is MISSING:
+            return ''
+        if isinstance(value, (list, Mapping)):
+            text = dumps(value, ensure_ascii=False)
+        else:
+            text = str(value)
+        if len(text) > self.MAX_CELL_LENGTH:
+            text = text[:self.MAX_CELL_LENGTH] + '...'
+        return text.replace('\n', ' ')
@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from bson import encode
+from bson.json_util import dumps
+from bson.raw_bson import RawBSONDocument
+
+
+class ResultCache:
+    """In-process LRU cache of Mongo result pages.
+
+    Entries are keyed by (profile, db, collection, query type, filter,
+    options) and evicted by total byte size, optionally expiring after a TTL.
+    When a change stream can be opened on a cached collection (replica sets
+    and sharded clusters), any change to it drops that collection's entries.
+    A result only counts as watched if the stream was already open when its
+    query started (see begin()); other results, including every result on
+    a standalone server, expire after at most UNWATCHED_TTL seconds.
+    """
+
+    MAX_WATCHERS = 16
+    UNWATCHED_TTL = 60
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._watchers: Dict[Tuple[str, str], threading.Event] = {}
+        self._unwatchable = set()
+        # Namespaces whose change stream is open, and how often each was invalidated
+        self._open = set()
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._epoch = 0
+
+    def configure(self, max_bytes: int, ttl: float):
+        """Apply new size and TTL limits to the live cache"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.ttl = ttl
+            while self.total_bytes > self.max_bytes and self.entries:
+                self._remove(next(iter(self.entries)))
+
+    @staticmethod
+    def make_key(profile: str, database: str, collection: str, query_type: str,
+                 query, options: Optional[Dict] = None, page_size: int = 0) -> Tuple:
+        return (profile, database, collection, query_type,
+                dumps(query), dumps(options or {}), page_size)
+
+    def get(self, key) -> Optional[Tuple[object, float]]:
+        """Return (value, age in seconds) or None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, created, limit = entry
+            age = time.time() - created
+            ttl = self.ttl
+            if limit:
+                # Not covered by a change stream: never kept longer than limit
+                ttl = min(ttl, limit) if ttl else limit
+            if ttl and age > ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value, age
+
+    def begin(self, client, database: str, collection: str) -> Tuple:
+        """Call before running a query whose result may be cached; put() needs the returned token.
+
+        Starts watching the collection. Changes made from now on either
+        invalidate the collection before put() (which then stores nothing)
+        or are seen by a stream that is already open.
+        """
+        namespace = (database, collection)
+        self.watch(client, database, collection)
+        with self._lock:
+            return namespace, self._epoch, self._generations.get(namespace, 0), namespace in self._open
+
+    def put(self, key, value, documents, token: Optional[Tuple] = None) -> bool:
+        """Cache value; documents are the BSON documents it holds, used for sizing.
+
+        With the token from begin(), nothing is stored if the collection
+        changed since, and a result that no open stream covered gets the
+        short UNWATCHED_TTL.
+        """
+        size = self.estimate_size(documents)
+        if size > self.max_bytes // 4:
+            return False
+
+        with self._lock:
+            limit = self.UNWATCHED_TTL
+            if token is not None:
+                namespace, epoch, generation, watched = token
+                if epoch != self._epoch or self._generations.get(namespace, 0) != generation:
+                    return False
+                if watched and namespace in self._open:
+                    limit = 0
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (value, size, time.time(), limit)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and self.entries:
+                self._remove(next(iter(self.entries)))
+        return True
+
+    def invalidate(self, database: str, collection: str):
+        """Drop every entry for a collection"""
+        with self._lock:
+            namespace = (database, collection)
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [k for k in self.entries if k[1] == database and k[2] == collection]:
+                self._remove(key)
+
+    def clear(self):
+        """Drop all entries and stop the change stream watchers"""
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            watchers = list(self._watchers.values())
+            self._watchers.clear()
+            self._unwatchable.clear()
+            self._open.clear()
+            self._epoch += 1
+        for stop in watchers:
+            stop.set()
+
+    def watch(self, client, database: str, collection: str):
+        """Invalidate the collection's entries on change, if a change stream is available"""
+        namespace = (database, collection)
+        with self._lock:
+            if (namespace in self._watchers or namespace in self._unwatchable
+                    or len(self._watchers) >= self.MAX_WATCHERS):
+                return
+            stop = threading.Event()
+            self._watchers[namespace] = stop
+
+        threading.Thread(target=self._watch, args=(client, namespace, stop), daemon=True).start()
+
+    def _watch(self, client, namespace, stop):
+        database, collection = namespace
+        opened = False
+        try:
+            with client[database][collection].watch(max_await_time_ms=1000) as stream:
+                opened = True
+                with self._lock:
+                    if self._watchers.get(namespace) is stop:
+                        self._open.add(namespace)
+                while not stop.is_set() and stream.alive:
+                    if stream.try_next() is not None:
+                        self.invalidate(database, collection)
+        except Exception:
+            if opened:
+                # Lost the stream, so changes may have been missed
+                self.invalidate(database, collection)
+            else:
+                # Standalone servers have no change streams; rely on the TTL
+                with self._lock:
+                    self._unwatchable.add(namespace)
+        finally:
+            with self._lock:
+                if self._watchers.get(namespace) is stop:
+                    del self._watchers[namespace]
+                    self._open.discard(namespace)
+
+    def _remove(self, key):
+        _, size, _, _ = self.entries.pop(key)
+        self.total_bytes -= size
+
+    @staticmethod
+    def estimate_size(documents) -> int:
+        size = 0
+        for doc in documents:
+            if isinstance(doc, RawBSONDocument):
+                size += len(doc.raw)
+            else:
+                try:
+                    size += len(encode(doc))
+                except Exception:
+                    size += 1024
+        return size
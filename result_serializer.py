@@ -0,0 +1,76 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List
+
+from bson import decode_all
+from bson.codec_options import CodecOptions
+from bson.json_util import RELAXED_JSON_OPTIONS, dumps
+from bson.raw_bson import RawBSONDocument
+
+
+logger = logging.getLogger(__name__)
+
+
+# Query cursors return undecoded documents; fields are decoded on first access
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+def to_extended_json(value, indent=2) -> str:
+    """Dump any BSON-compatible value as relaxed Extended JSON"""
+    return dumps(value, indent=indent, ensure_ascii=False, json_options=RELAXED_JSON_OPTIONS)
+
+
+def raw_to_extended_json(raw: bytes, indent=2) -> str:
+    """Decode concatenated BSON documents and dump them as a JSON array.
+
+    Module-level so it can run in a worker process.
+    """
+    return to_extended_json(decode_all(raw), indent)
+
+
+class ResultSerializer:
+    """Serializes query results to Extended JSON away from the UI thread.
+
+    Callers run serialize() on a worker thread. Large batches of raw BSON are
+    shipped as bytes to a process pool so decoding does not hold the GIL the
+    Tk thread needs; small batches are cheaper to handle in-thread.
+    """
+
+    PROCESS_THRESHOLD = 1024 * 1024
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._pool = None
+        # serialize() runs on several worker threads; only one may create the pool
+        self._pool_lock = threading.Lock()
+
+    def serialize(self, documents: List, indent=2) -> str:
+        if documents and all(isinstance(doc, RawBSONDocument) for doc in documents):
+            raw = b''.join(doc.raw for doc in documents)
+            if len(raw) >= self.PROCESS_THRESHOLD:
+                pool = self._get_pool()
+                try:
+                    return pool.submit(raw_to_extended_json, raw, indent).result()
+                except (BrokenProcessPool, OSError):
+                    logger.warning("Serializer process failed, falling back to thread", exc_info=True)
+                    with self._pool_lock:
+                        # Another thread may already have replaced the broken pool
+                        if self._pool is pool:
+                            self._pool = None
+                    pool.shutdown(wait=False)
+            return raw_to_extended_json(raw, indent)
+        return to_extended_json(documents, indent)
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
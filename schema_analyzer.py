@@ -0,0 +1,158 @@
+import datetime
+import re
+import time
+from collections import Counter
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+from bson import Binary, Code, DBRef, Decimal128, Int64, MaxKey, MinKey, ObjectId, Regex, Timestamp
+
+
+# Python types of decoded BSON values -> BSON type names as used by $type
+BSON_TYPE_NAMES = (
+    (bool, 'bool'),
+    (Int64, 'long'),
+    (int, 'int'),
+    (float, 'double'),
+    (str, 'string'),
+    (ObjectId, 'objectId'),
+    (datetime.datetime, 'date'),
+    (Decimal128, 'decimal'),
+    (Timestamp, 'timestamp'),
+    (bytes, 'binData'),
+    (Binary, 'binData'),
+    (Regex, 'regex'),
+    (re.Pattern, 'regex'),
+    (Code, 'javascript'),
+    # A DBRef is stored as an embedded {$ref, $id} document
+    (DBRef, 'object'),
+    (MinKey, 'minKey'),
+    (MaxKey, 'maxKey'),
+)
+
+
+def bson_type_name(value) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, Mapping):
+        return 'object'
+    if isinstance(value, list):
+        return 'array'
+    for python_type, name in BSON_TYPE_NAMES:
+        if isinstance(value, python_type):
+            if name == 'int' and not -2 ** 31 <= value < 2 ** 31:
+                return 'long'
+            return name
+    return type(value).__name__
+
+
+def sample_pipeline(sample_size: int, query: Optional[Dict] = None) -> List[Dict]:
+    """Pipeline drawing a random sample, optionally restricted to query"""
+    pipeline = [{'$match': query}] if query else []
+    pipeline.append({'$sample': {'size': sample_size}})
+    return pipeline
+
+
+class SchemaAnalyzer:
+    """Accumulates per-path type statistics over sampled documents.
+
+    Nested documents are walked into dotted paths; array elements are
+    recorded under the array's path with a "[]" suffix (so documents in an
+    array show up as "items[].name"). Only the first MAX_ARRAY_ITEMS elements
+    of an array are inspected.
+    """
+
+    MAX_DEPTH = 20
+    MAX_ARRAY_ITEMS = 100
+
+    def __init__(self):
+        self.documents = 0
+        self.paths: Dict[str, Dict] = {}
+
+    def add_document(self, doc: Mapping):
+        self.documents += 1
+        seen = set()
+        for key, value in doc.items():
+            self._add_value(key, value, seen, 0)
+
+    def _add_value(self, path: str, value, seen: set, depth: int):
+        stats = self.paths.get(path)
+        if stats is None:
+            stats = self.paths[path] = {'occurrences': 0, 'documents': 0, 'types': Counter()}
+        stats['occurrences'] += 1
+        if path not in seen:
+            seen.add(path)
+            stats['documents'] += 1
+        stats['types'][bson_type_name(value)] += 1
+
+        if depth >= self.MAX_DEPTH:
+            return
+        if isinstance(value, Mapping):
+            for key, child in value.items():
+                self._add_value(f"{path}.{key}", child, seen, depth + 1)
+        elif isinstance(value, list):
+            for item in value[:self.MAX_ARRAY_ITEMS]:
+                self._add_value(f"{path}[]", item, seen, depth + 1)
+
+    def report(self) -> Dict:
+        """Per-path presence %, null ratio and type frequencies, sorted by path"""
+        fields = {}
+        for path in sorted(self.paths):
+            stats = self.paths[path]
+            occurrences = stats['occurrences']
+            fields[path] = {
+                'presence_pct': round(100.0 * stats['documents'] / max(self.documents, 1), 2),
+                'null_ratio': round(stats['types'].get('null', 0) / occurrences, 4),
+                'types': {
+                    name: {'count': count, 'pct': round(100.0 * count / occurrences, 2)}
+                    for name, count in stats['types'].most_common()
+                }
+            }
+        return fields
+
+
+def analyze_collection(coll, sample_size: int = 1000, query: Optional[Dict] = None, job=None,
+                       batch_size: int = 200, progress_interval: float = 0.5) -> Dict:
+    """Sample coll with $sample and infer its schema.
+
+    Partial reports are passed to job.report_progress() at most every
+    progress_interval seconds while the sample streams in.
+    """
+    comment = job.comment if job is not None else None
+    try:
+        estimated = coll.estimated_document_count(comment=comment)
+    except Exception:
+        # Views do not support the count fast path
+        estimated = None
+
+    analyzer = SchemaAnalyzer()
+
+    def build_report(complete):
+        return {
+            'database': coll.database.name,
+            'collection': coll.name,
+            'estimated_document_count': estimated,
+            'sample_size': sample_size,
+            'sampled_documents': analyzer.documents,
+            'complete': complete,
+            'fields': analyzer.report()
+        }
+
+    cursor = coll.aggregate(sample_pipeline(sample_size, query), batchSize=batch_size,
+                            comment=comment, allowDiskUse=True)
+    if job is not None:
+        job.attach_cursor(cursor)
+
+    last_report = time.time()
+    with cursor:
+        for doc in cursor:
+            if job is not None:
+                job.check_cancelled()
+            analyzer.add_document(doc)
+            if job is not None and time.time() - last_report >= progress_interval:
+                job.report_progress(build_report(False))
+                last_report = time.time()
+
+    if job is not None:
+        job.check_cancelled()
+    return build_report(True)